@@ -0,0 +1,44 @@
+"""Compares parsing a file from a cold start with loading its AST from the cache directory."""
+
+import tempfile
+from pathlib import Path
+
+from common import ast_structure, generate_state_machine, measure
+from server.LRP import ParseArguments
+from server.ServiceHandler import ServiceHandler
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'states':>8} {'cold parse (ms)':>16} {'cache load (ms)':>16} {'speedup':>8}")
+
+        for states in (200, 500, 1000):
+            source_file: Path = Path(directory) / f"generated_{states}.sm"
+            source_file.write_text(generate_state_machine(states))
+            cache_dir: Path = Path(directory) / f"cache_{states}"
+
+            cold_parse: float = measure(
+                lambda: ServiceHandler().parse(ParseArguments(str(source_file))), 1
+            )
+
+            # Populates the cache directory, then simulates restarts of the runtime.
+            reference_handler: ServiceHandler = ServiceHandler(str(cache_dir))
+            reference_handler.parse(ParseArguments(str(source_file)))
+            cache_load: float = measure(
+                lambda: ServiceHandler(str(cache_dir)).parse(
+                    ParseArguments(str(source_file))
+                ),
+                3,
+            )
+
+            restarted_handler: ServiceHandler = ServiceHandler(str(cache_dir))
+            restarted_handler.parse(ParseArguments(str(source_file)))
+            assert restarted_handler.registry.disk_cache_hits == 1
+            assert ast_structure(
+                restarted_handler.registry.loaded_sources[str(source_file)]
+            ) == ast_structure(
+                reference_handler.registry.loaded_sources[str(source_file)]
+            ), "AST loaded from the cache differs from the parsed AST."
+
+            print(
+                f"{states:>8} {cold_parse:>16.1f} {cache_load:>16.1f} {cold_parse / cache_load:>7.1f}x"
+            )
@@ -0,0 +1,39 @@
+"""Reports the memory retained by an AST, with and without its parse tree."""
+
+import gc
+import tracemalloc
+
+from antlr4 import InputStream
+from common import generate_state_machine
+from statemachine_ast.SourceParser import parse_source
+from statemachine_ast.StateMachine import StateMachine
+
+
+def retained_memory(source: str, compact: bool) -> int:
+    """Returns the memory still allocated once the AST is built, in bytes."""
+
+    gc.collect()
+    tracemalloc.start()
+    state_machine: StateMachine = parse_source(InputStream(source), compact=compact)
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del state_machine
+
+    return retained
+
+
+if __name__ == "__main__":
+    print(f"{'states':>8} {'with parse tree (MB)':>21} {'compact (MB)':>13} {'saved':>7}")
+
+    for states in (1000, 2000):
+        source: str = generate_state_machine(states)
+        # Builds an AST once so that the memory of ANTLR's shared caches is not counted.
+        parse_source(InputStream(source))
+
+        full: int = retained_memory(source, False)
+        compact: int = retained_memory(source, True)
+
+        print(
+            f"{states:>8} {full / 2**20:>21.1f} {compact / 2**20:>13.1f} {1 - compact / full:>6.0%}"
+        )
@@ -0,0 +1,210 @@
+"""Helpers shared by the benchmarks.
+
+Benchmarks are run from the root of the project, e.g. `python3 benchmarks/ast_cache.py`.
+"""
+
+from __future__ import annotations
+
+import random
+import string
+import sys
+import time
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from server.DictBuilder import from_model_element  # noqa: E402
+from statemachine_ast.StateMachine import (  # noqa: E402
+    Expression,
+    InitialState,
+    State,
+    StateMachine,
+    Transition,
+    iter_postfix,
+)
+
+
+def generate_state_machine(
+    states: int,
+    transitions_per_state: int = 4,
+    composite_size: int = 10,
+    assignments_per_transition: int = 2,
+    seed: int = 0,
+) -> str:
+    """Generates the source of a state machine.
+
+    Simple states are grouped into top-level composite states of `composite_size` states.
+    Every state has `transitions_per_state` outgoing transitions to random states, some of
+    them guarded, and each transition executes `assignments_per_transition` assignments.
+
+    Args:
+        states (int): number of simple states.
+        transitions_per_state (int): number of outgoing transitions per simple state.
+        composite_size (int): number of simple states per composite state.
+        assignments_per_transition (int): number of assignments per transition.
+        seed (int): seed of the random generator.
+
+    Returns:
+        str: source of the state machine.
+    """
+
+    rng: random.Random = random.Random(seed)
+    names: list[str] = [f"S{_letters(i)}" for i in range(states)]
+    variables: list[str] = [f"v{_letters(i).lower()}" for i in range(8)]
+    triggers: list[str] = [f"ev{_letters(i).lower()}" for i in range(12)]
+
+    def transition(indent: str) -> str:
+        target: str = "FINAL" if rng.random() < 0.02 else rng.choice(names)
+        guard: str = ""
+        if rng.random() < 0.3:
+            guard = f" [{rng.choice(variables)} {rng.choice(['<', '>=', '!='])} {rng.randint(0, 9)}]"
+
+        assignments: list[str] = [
+            f"{rng.choice(variables)} = {rng.choice(variables)} {rng.choice('+-*')} {rng.randint(1, 9)} * ({rng.choice(variables)} - {rng.randint(1, 9)});"
+            for _ in range(assignments_per_transition)
+        ]
+        effect: str = "" if len(assignments) == 0 else f" / {{ {' '.join(assignments)} }}"
+
+        return f"{indent}-> {target} : '{rng.choice(triggers)}'{guard}{effect};"
+
+    lines: list[str] = [f"StateMachine Generated {{", f"    INITIAL -> {names[0]}Group;"]
+    for group_start in range(0, states, composite_size):
+        group: list[str] = names[group_start : group_start + composite_size]
+        lines.append(f"    composite state {group[0]}Group {{")
+        lines.append(transition("        "))
+        lines.append(f"        INITIAL -> {group[0]};")
+        for name in group:
+            lines.append(f"        state {name} {{")
+            lines.extend(transition("            ") for _ in range(transitions_per_state))
+            lines.append("        }")
+        lines.append("    }")
+    lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def ast_signature(state_machine: StateMachine) -> Any:
+    """Returns a representation of a state machine that does not depend on element ids,
+    so that ASTs built by different parses can be compared."""
+
+    return model_element_signature(from_model_element(state_machine.to_model_element()))
+
+
+def model_element_signature(model_element: dict) -> Any:
+    """Returns a representation of a model element, as sent in LRP responses, that does
+    not depend on element ids."""
+
+    renamed_ids: dict[str, str] = {}
+
+    def rename(element_id: str) -> str:
+        return renamed_ids.setdefault(element_id, f"#{len(renamed_ids)}")
+
+    def canonicalize(value: Any, key: str | None = None) -> Any:
+        if isinstance(value, dict):
+            return {k: canonicalize(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [canonicalize(v, key) for v in value]
+        if isinstance(value, str) and (key == "id" or key in _REF_KEYS):
+            return rename(value)
+        return value
+
+    return canonicalize(model_element)
+
+
+_REF_KEYS: set[str] = {"target", "initialState"}
+
+
+def ast_structure(state_machine: StateMachine) -> Any:
+    """Returns a representation of a state machine that does not depend on element ids,
+    and that, unlike ast_signature, also describes the structure of expressions, the
+    parents of states and the order of incoming transitions."""
+
+    def expression(value: Expression | None) -> Any:
+        if value is None:
+            return None
+
+        # Flattened in postfix order, since long expressions make deep trees.
+        return [
+            (type(current).__name__,)
+            + tuple(
+                getattr(current, field.name)
+                for field in fields(current)
+                if not isinstance(getattr(current, field.name), Expression)
+            )
+            for current in iter_postfix(value)
+        ]
+
+    def name(state: State | None) -> str | None:
+        if state is None:
+            return None
+
+        return "FINAL" if state.is_final else state.name
+
+    def transition(value: Transition) -> Any:
+        return (
+            name(value.source),
+            name(value.target),
+            name(value.target.parent_state),
+            value.label,
+            value.trigger,
+            value.location,
+            value.full_location,
+            None
+            if value.guard is None
+            else (
+                value.guard.variable,
+                value.guard.comparator,
+                expression(value.guard.expression),
+            ),
+            [
+                (assignment.variable, assignment.location, expression(assignment.expression))
+                for assignment in value.assignments
+            ],
+        )
+
+    def initial_state(value: InitialState | None) -> Any:
+        if value is None:
+            return None
+
+        return name(value.target), name(value.parent_state)
+
+    def state(value: State) -> Any:
+        return (
+            type(value).__name__,
+            value.name,
+            value.location,
+            name(value.parent_state),
+            initial_state(getattr(value, "initial_state", None)),
+            [transition(outgoing) for outgoing in value.outgoing_transitions],
+            [transition(incoming) for incoming in value.incoming_transitions],
+            [state(contained) for contained in value.states],
+        )
+
+    return (
+        state_machine.name,
+        initial_state(state_machine.initial_state),
+        [state(contained) for contained in state_machine.states],
+    )
+
+
+def measure(function: Callable[[], Any], repeat: int = 5) -> float:
+    """Returns the best wall-clock time of several runs of a function, in milliseconds."""
+
+    best: float = float("inf")
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+
+    return best * 1000
+
+
+def _letters(index: int) -> str:
+    result: str = ""
+    while True:
+        result = string.ascii_lowercase[index % 26] + result
+        index = index // 26
+        if index == 0:
+            return result
@@ -0,0 +1,127 @@
+"""Checks that elements get the same ids whatever the way their AST is built, then compares
+the time taken to derive ids from the paths of AST elements and to number steps with the
+time taken to generate random UUIDs for them, as was done before."""
+
+import uuid
+
+from antlr4 import InputStream
+from common import generate_state_machine, measure
+from server.DictBuilder import from_model_element
+from server.ModelElementIndex import ModelElementIndex
+from server.Runtime import Runtime
+from statemachine_ast import ASTSerializer
+from statemachine_ast.IncrementalParser import reparse_incrementally
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from state_hierarchy import transitions_of
+from statemachine_ast.StateMachine import StateMachine, Transition
+from trigger_index import generate_wide_state_machine, run
+
+
+class UUIDRuntime(Runtime):
+    """Runtime identifying steps with random UUIDs, as before steps were numbered."""
+
+    def new_step_id(self) -> str:
+        return str(uuid.uuid4())
+
+
+def model_element(state_machine: StateMachine) -> dict:
+    return from_model_element(state_machine.to_model_element())
+
+
+def transition_labels(state_machine: StateMachine) -> dict[str, tuple]:
+    """Returns the source, trigger, target and guard of each transition, by id."""
+
+    return {
+        transition.id: (
+            transition.source.name,
+            transition.trigger,
+            transition.target.name,
+            None if transition.guard is None else transition.guard.id,
+        )
+        for transition in transitions_of(state_machine)
+    }
+
+
+def count_elements(element: dict) -> int:
+    count: int = 0
+    pending: list[dict] = [element]
+    while len(pending) > 0:
+        current: dict = pending.pop()
+        count += 1
+        for children in current["children"].values():
+            pending.extend(children if isinstance(children, list) else [children])
+
+    return count
+
+
+if __name__ == "__main__":
+    source: str = generate_state_machine(200)
+    expected: dict = model_element(parse_source(InputStream(source), ParsingStrategy.FAST))
+    for strategy in ParsingStrategy:
+        state_machine: StateMachine = parse_source(InputStream(source), strategy)
+        assert model_element(state_machine) == expected, f"Ids differ with {strategy}."
+
+    assert (
+        model_element(ASTSerializer.loads(ASTSerializer.dumps(state_machine))) == expected
+    ), "Ids differ after deserialization."
+    assert len(ModelElementIndex(state_machine.to_model_element()).elements) == (
+        count_elements(expected)
+    ), "Ids are not unique."
+
+    edited_source: str = source.replace("'evb'", "'edited'", 5)
+    assert reparse_incrementally(state_machine, source, edited_source)
+    assert model_element(state_machine) == model_element(
+        parse_source(InputStream(edited_source), ParsingStrategy.FAST)
+    ), "Ids differ after incremental parsing."
+
+    # Inserting transitions before others, one of them with the same trigger and target
+    # as a later transition, keeps the ids of all other transitions.
+    state_machine = parse_source(InputStream(source), ParsingStrategy.FAST)
+    duplicated: Transition = state_machine.states[0].states[0].outgoing_transitions[0]
+    inserted_source: str = source.replace(
+        "        state Sa {\n",
+        "        state Sa {\n            -> Sa : 'inserted';\n"
+        f"            -> {duplicated.target.name} : '{duplicated.trigger}' [va < 0];\n",
+        1,
+    )
+    labels: dict[str, tuple] = transition_labels(state_machine)
+    inserted_labels: dict[str, tuple] = transition_labels(
+        parse_source(InputStream(inserted_source), ParsingStrategy.FAST)
+    )
+    assert len(inserted_labels) == len(labels) + 2, "Transition ids are not unique."
+    moved: list[str] = [
+        transition_id
+        for transition_id, label in labels.items()
+        if inserted_labels.get(transition_id) != label
+    ]
+    assert moved == [duplicated.id], f"Transition ids moved: {moved}."
+
+    print("Elements got the same ids from all builders.")
+    print(f"{'states':>7} {'elements':>9} {'UUIDs (ms)':>11} {'path ids (ms)':>14}")
+
+    for states in (1000, 3000):
+        state_machine = parse_source(
+            InputStream(generate_state_machine(states)), ParsingStrategy.FAST
+        )
+        # Final pseudo states also got UUIDs, although they are not model elements.
+        elements: int = count_elements(model_element(state_machine))
+        uuids: float = measure(lambda: [str(uuid.uuid4()) for _ in range(elements)])
+        path_ids: float = measure(state_machine.assign_ids)
+
+        print(f"{states:>7} {elements:>9} {uuids:>11.1f} {path_ids:>14.1f}")
+
+    print(f"{'transitions per state':>22} {'UUIDs (steps/s)':>16} {'numbers (steps/s)':>18}")
+
+    steps: int = 2000
+    for transitions_per_state in (10, 100, 300):
+        state_machine = parse_source(
+            InputStream(generate_wide_state_machine(20, transitions_per_state)),
+            ParsingStrategy.FAST,
+        )
+        with_uuids: float = measure(lambda: run(UUIDRuntime, state_machine, steps), 3)
+        numbered: float = measure(lambda: run(Runtime, state_machine, steps), 3)
+
+        print(
+            f"{transitions_per_state:>22} {steps / with_uuids * 1000:>16.0f}"
+            f" {steps / numbered * 1000:>18.0f}"
+        )
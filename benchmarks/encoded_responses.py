@@ -0,0 +1,127 @@
+"""Measures the reuse of encoded parse responses by clients parsing the same file, first
+through the service handler and then through a runtime started on a local port, which
+must send the same response as when results were encoded for each request."""
+
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from common import generate_state_machine, measure, model_element_signature
+from server.DictBuilder import from_parse_response
+from server.LRP import ParseArguments
+from server.ResponseCodec import EncodedResult
+from server.ServiceHandler import ServiceHandler
+from statemachine_ast.SourceParser import ParsingStrategy
+
+CLIENTS: int = 10
+
+
+def connect(port: int) -> socket.socket:
+    """Connects to the runtime, waiting for it to listen."""
+
+    for _ in range(100):
+        try:
+            return socket.create_connection(("localhost", port))
+        except ConnectionRefusedError:
+            time.sleep(0.1)
+
+    raise ConnectionRefusedError(f"No runtime listening at port {port}.")
+
+
+def call(connection: socket.socket, method: str, params: dict) -> tuple[Any, int]:
+    """Sends a request to the runtime and returns its result along with the size of the
+    response. Responses are read directly from the socket, since the JSON-RPC client
+    takes time quadratic in their size to split them."""
+
+    connection.sendall(
+        json.dumps(
+            {"jsonrpc": "2.0", "id": 1, "method": method, "params": [params]}
+        ).encode()
+    )
+
+    chunks: list[bytes] = []
+    while True:
+        chunks.append(connection.recv(1 << 20))
+        if chunks[-1].endswith(b"}"):
+            try:
+                response: dict = json.loads(b"".join(chunks))
+            except json.JSONDecodeError:
+                continue
+
+            return response["result"], sum(len(chunk) for chunk in chunks)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        print(
+            f"{'states':>7} {'size (KB)':>10} {'encoding (ms)':>14} {'reuse (ms)':>11}"
+            f" {'saved (MB)':>11} {'saved (ms)':>11}"
+        )
+        print(f"(saved by {CLIENTS} clients parsing the same file)")
+
+        for states in (1000, 3000):
+            source_file: str = str(Path(directory) / f"generated_{states}.sm")
+            Path(source_file).write_text(generate_state_machine(states))
+
+            handler: ServiceHandler = ServiceHandler(
+                parsing_strategy=ParsingStrategy.FAST
+            )
+            encoded: EncodedResult = handler.parse_encoded(ParseArguments(source_file))
+            assert json.loads(encoded.text) == json.loads(
+                json.dumps(from_parse_response(handler.parse(ParseArguments(source_file))))
+            ), "Encoded response differs."
+
+            def encode() -> str:
+                return json.dumps(
+                    from_parse_response(handler.parse(ParseArguments(source_file))),
+                    separators=(",", ":"),
+                    sort_keys=True,
+                )
+
+            def reuse() -> EncodedResult:
+                return handler.parse_encoded(ParseArguments(source_file))
+
+            # One parse per client, the first one encoding the response.
+            for _ in range(CLIENTS - 1):
+                assert reuse() is encoded, "Encoded response not reused."
+
+            bytes_saved: int = handler.encoded_response_metrics.bytes_saved
+            time_saved: float = handler.encoded_response_metrics.encoding_time_saved
+            print(
+                f"{states:>7} {len(encoded.text) / 1024:>10.0f} {measure(encode):>14.1f}"
+                f" {measure(reuse):>11.2f} {bytes_saved / 2**20:>11.1f}"
+                f" {time_saved * 1000:>11.1f}"
+            )
+
+        # Responses sent by the runtime to several clients.
+        port: int = 50000 + int(time.time()) % 10000
+        server: subprocess.Popen = subprocess.Popen(
+            [sys.executable, "src/__main__.py", str(port), "--parsing-strategy", "fast"],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            expected: Any = model_element_signature(json.loads(encode())["astRoot"])
+            responses: list[dict] = []
+            for client in range(3):
+                with connect(port) as connection:
+                    start: float = time.perf_counter()
+                    result, size = call(connection, "parse", {"sourceFile": source_file})
+                    print(
+                        f"Client {client + 1}: {size / 1024:.0f} KB response received in"
+                        f" {(time.perf_counter() - start) * 1000:.1f} ms"
+                    )
+                    responses.append(result)
+
+            # Element ids differ from the ones of the ASTs built by the benchmark.
+            assert all(response == responses[0] for response in responses)
+            assert (
+                model_element_signature(responses[0]["astRoot"]) == expected
+            ), "Runtime sent a different response."
+        finally:
+            server.terminate()
+            server.wait()
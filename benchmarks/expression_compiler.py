@@ -0,0 +1,91 @@
+"""Compares the evaluations per second of expressions and guards compiled into Python
+functions and interpreted, and reports the compilation time. Compiled functions are
+checked to behave as the interpreter by tests/test_expression_compiler.py."""
+
+import time
+from typing import Any, Callable
+
+from antlr4 import InputStream
+from common import generate_state_machine, measure
+from server.Runtime import ExpressionEvaluator, GuardEvaluator
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import State, StateMachine, Transition, iter_postfix
+
+VARIABLES: list[str] = ["va", "vb", "vc", "vd", "ve"]
+
+
+def transitions(state_machine: StateMachine) -> list[Transition]:
+    result: list[Transition] = []
+    pending: list[State] = list(state_machine.states)
+    while len(pending) > 0:
+        state: State = pending.pop()
+        result.extend(state.outgoing_transitions)
+        pending.extend(state.states)
+
+    return result
+
+
+def parse(source: str) -> StateMachine:
+    return parse_source(InputStream(source), ParsingStrategy.FAST)
+
+
+if __name__ == "__main__":
+    print(
+        f"{'expressions':>22} {'count':>6} {'compile (us each)':>18}"
+        f" {'interpreted (evals/s)':>22} {'compiled (evals/s)':>19} {'speedup':>8}"
+    )
+
+    variables: dict[str, float] = {f"v{letter}": 1.5 for letter in "abcdefgh"}
+    expression_evaluator: ExpressionEvaluator = ExpressionEvaluator(variables)
+    guard_evaluator: GuardEvaluator = GuardEvaluator(expression_evaluator, variables)
+    generated: list[Transition] = transitions(parse(generate_state_machine(200)))
+    chain_source: str = (
+        "StateMachine Chain { INITIAL -> A; state A { -> A : 'step' / {"
+        f" va = {' + '.join(['vb * 2'] * 1000)}; }}; }} }}"
+    )
+
+    for name, elements, interpret, compile_element in (
+        (
+            "generated assignments",
+            [a.expression for t in generated for a in t.assignments],
+            expression_evaluator.evaluate,
+            lambda expression: expression.compile(),
+        ),
+        (
+            "generated guards",
+            [t.guard for t in generated if t.guard is not None],
+            guard_evaluator.evaluate,
+            lambda guard: guard.compile(),
+        ),
+        (
+            "1000-term chain",
+            [a.expression for t in transitions(parse(chain_source)) for a in t.assignments],
+            expression_evaluator.evaluate,
+            lambda expression: expression.compile(),
+        ),
+    ):
+        start: float = time.perf_counter()
+        functions: list[Callable[[dict[str, float]], Any]] = [
+            compile_element(element) for element in elements
+        ]
+        compilation: float = (time.perf_counter() - start) / len(elements) * 1e6
+
+        # Evaluations are repeated in proportion to the size of expressions.
+        size: int = sum(
+            len(list(iter_postfix(getattr(element, "expression", element))))
+            for element in elements
+        )
+        repeat: int = max(1, 100000 // size)
+        interpreted: float = measure(
+            lambda: [interpret(element) for _ in range(repeat) for element in elements], 3
+        )
+        compiled: float = measure(
+            lambda: [function(variables) for _ in range(repeat) for function in functions], 3
+        )
+        evaluations: int = repeat * len(elements)
+
+        print(
+            f"{name:>22} {len(elements):>6} {compilation:>18.0f}"
+            f" {evaluations / interpreted * 1000:>22.0f}"
+            f" {evaluations / compiled * 1000:>19.0f} {interpreted / compiled:>7.1f}x"
+        )
@@ -0,0 +1,48 @@
+"""Parses state machines whose transitions execute many assignments with the ANTLR parser,
+whose expression rule is a flat list of operands and operators, and checks that it builds
+the same ASTs as the hand-written parser, which follows the precedence of the former
+left-recursive rule."""
+
+from antlr4 import InputStream
+from common import ast_structure, generate_state_machine, measure
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+
+EXPRESSION_SOURCES: list[str] = [
+    "x = a - b * c ^ d / e + f; x = a ^ b ^ c * d; x = a / b / c - d - e;",
+    "x = ((a)) / (b - (c + d)); x = -a * +2.5 - -c; x = (a + b) ^ (c - d) ^ 2;",
+    "x = 1 + 2 * 3 - 4 / 2; x = x -1; x = (((((a + 1) * 2) - 3) / 4) ^ 5);",
+]
+
+
+if __name__ == "__main__":
+    sources: list[str] = [
+        "StateMachine Expressions { INITIAL -> A; state A {"
+        f" -> A : 'step' [x >= a * (b - c)] / {{ {assignments} }}; }} }}"
+        for assignments in EXPRESSION_SOURCES
+    ] + [
+        generate_state_machine(50, seed=seed, assignments_per_transition=8)
+        for seed in range(3)
+    ]
+    for source in sources:
+        assert ast_structure(
+            parse_source(InputStream(source), ParsingStrategy.LL, True)
+        ) == ast_structure(
+            parse_source(InputStream(source), ParsingStrategy.FAST)
+        ), f"Parsers built different ASTs for:\n{source}"
+
+    print(f"{len(sources)} sources parsed identically by both parsers.")
+    print(f"{'states':>7} {'assignments':>12} {'SLL then LL (ms)':>17} {'LL (ms)':>9}")
+
+    for states, assignments in ((100, 2), (100, 8), (300, 8)):
+        source: str = generate_state_machine(
+            states, assignments_per_transition=assignments
+        )
+        sll_then_ll: float = measure(
+            lambda: parse_source(InputStream(source), ParsingStrategy.SLL_THEN_LL, True),
+            3,
+        )
+        ll: float = measure(
+            lambda: parse_source(InputStream(source), ParsingStrategy.LL, True), 3
+        )
+
+        print(f"{states:>7} {assignments:>12} {sll_then_ll:>17.0f} {ll:>9.0f}")
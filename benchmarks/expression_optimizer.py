@@ -0,0 +1,186 @@
+"""Reports the expressions saved by folding constants and sharing identical
+subexpressions and the time taken by the optimization pass, and compares compiling and
+evaluating expressions and running steps with and without optimization. Optimized
+expressions are checked to behave as the original ones by
+tests/test_expression_optimizer.py."""
+
+import random
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+from antlr4 import InputStream
+from common import generate_state_machine, measure
+from expression_compiler import VARIABLES, transitions
+from server.Runtime import Runtime
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import (
+    BinaryExpression,
+    Expression,
+    ParenthesizedExpression,
+    StateMachine,
+)
+from trigger_index import letters, run
+
+
+@contextmanager
+def unoptimized() -> Iterator[None]:
+    """Builds state machines whose expressions are evaluated as written, as before
+    expressions were optimized."""
+
+    optimize_expressions: Callable[[StateMachine], None] = StateMachine.optimize_expressions
+    StateMachine.optimize_expressions = lambda state_machine: None
+    try:
+        yield
+    finally:
+        StateMachine.optimize_expressions = optimize_expressions
+
+
+def parse(source: str) -> StateMachine:
+    return parse_source(InputStream(source), ParsingStrategy.FAST)
+
+
+def generate_constant_state_machine(
+    states: int, transitions_per_state: int = 10, seed: int = 0
+) -> str:
+    """Generates a state machine whose assignments contain constant subexpressions, such
+    as `va = va + 2 * 3 - 1`, and repeat subexpressions, and whose guards are drawn from
+    a few guards shared by many transitions."""
+
+    rng: random.Random = random.Random(seed)
+    names: list[str] = ["S" + letters(i) for i in range(states)]
+    variables: list[str] = ["v" + letters(i) for i in range(6)]
+    guards: list[str] = [
+        f"{rng.choice(variables)} {rng.choice(['<', '>=', '!='])}"
+        f" {rng.choice(variables)} * {rng.randint(1, 9)} / {rng.randint(1, 9)}"
+        f" + {rng.randint(1, 9)} * {rng.randint(1, 9)} - {rng.randint(1, 9)}"
+        for _ in range(5)
+    ]
+
+    def assignment() -> str:
+        variable: str = rng.choice(variables)
+        if rng.random() < 0.5:
+            return (
+                f"{variable} = {rng.choice(variables)} + {rng.randint(1, 9)}"
+                f" * {rng.randint(1, 9)} - {rng.randint(1, 9)};"
+            )
+
+        repeated: str = f"({rng.choice(variables)} - {rng.randint(1, 9)} / {rng.randint(1, 9)})"
+        return f"{variable} = {repeated} * {repeated} / {rng.randint(10, 99)};"
+
+    def transition() -> str:
+        guard: str = f" [{rng.choice(guards)}]" if rng.random() < 0.7 else ""
+        return (
+            f"        -> {rng.choice(names)} : '{rng.choice(['go', 'tick', 'reset'])}'"
+            f"{guard} / {{ {assignment()} {assignment()} }};"
+        )
+
+    initialization: str = " ".join(f"{variable} = {i + 1};" for i, variable in enumerate(variables))
+    lines: list[str] = [
+        "StateMachine Constants {",
+        "    INITIAL -> Start;",
+        f"    state Start {{ -> {names[0]} : 'start' / {{ {initialization} }}; }}",
+    ]
+    for name in names:
+        lines.append(f"    state {name} {{")
+        lines.extend(transition() for _ in range(transitions_per_state))
+        lines.append("    }")
+    lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def expressions(state_machine: StateMachine, optimized: bool) -> list[Expression]:
+    result: list[Expression] = []
+    for transition in transitions(state_machine):
+        if transition.guard is not None:
+            result.append(
+                transition.guard.optimized_expression if optimized else transition.guard.expression
+            )
+        result.extend(
+            assignment.optimized_expression if optimized else assignment.expression
+            for assignment in transition.assignments
+        )
+
+    return result
+
+
+def count_expressions(roots: list[Expression]) -> int:
+    """Returns the number of distinct expressions contained in the given expressions."""
+
+    counted: set[int] = set()
+    pending: list[Expression] = list(roots)
+    while len(pending) > 0:
+        current: Expression = pending.pop()
+        if id(current) in counted:
+            continue
+
+        counted.add(id(current))
+        if isinstance(current, BinaryExpression):
+            pending.extend((current.left, current.right))
+        elif isinstance(current, ParenthesizedExpression):
+            pending.append(current.contained_expression)
+
+    return len(counted)
+
+
+def compile_all(state_machine: StateMachine) -> None:
+    for transition in transitions(state_machine):
+        if transition.guard is not None:
+            transition.guard.compile()
+        for assignment in transition.assignments:
+            assignment.compile()
+
+
+def evaluate_all(state_machine: StateMachine, variables: dict[str, float]) -> Any:
+    functions: list[Callable[[dict[str, float]], Any]] = []
+    for transition in transitions(state_machine):
+        if transition.guard is not None:
+            functions.append(transition.guard.compile())
+        functions.extend(
+            assignment.compile() for assignment in transition.assignments
+        )
+
+    return lambda: [function(variables) for function in functions]
+
+
+if __name__ == "__main__":
+    print(
+        f"{'state machine':>14} {'expressions':>12} {'optimized':>10} {'parse (ms)':>11}"
+        f" {'pass (ms)':>10} {'compile (ms)':>13} {'optimized':>10}"
+        f" {'evals (ms)':>11} {'optimized':>10} {'steps/s':>8} {'optimized':>10}"
+    )
+
+    variables: dict[str, float] = {variable: 1.5 for variable in VARIABLES}
+    variables.update({"v" + letters(i): 1.5 for i in range(8)})
+    for name, source in (
+        ("generated", generate_state_machine(1000)),
+        ("constants", generate_constant_state_machine(1000)),
+    ):
+        parse_time: float = measure(lambda: parse(source), 3)
+        optimized_machine = parse(source)
+        with unoptimized():
+            unoptimized_machine = parse(source)
+
+        pass_time: float = measure(optimized_machine.optimize_expressions, 3)
+        compile_times: list[float] = []
+        evaluation_times: list[float] = []
+        steps_per_second: list[str] = []
+        for state_machine in (unoptimized_machine, optimized_machine):
+            # Compilation is measured once, since compiled functions are cached.
+            compile_times.append(measure(lambda: compile_all(state_machine), 1))
+            evaluation_times.append(measure(evaluate_all(state_machine, variables), 3))
+            # Generated state machines read variables before assigning them.
+            if name == "constants":
+                steps: float = measure(lambda: run(Runtime, state_machine, 2000), 3)
+                steps_per_second.append(f"{2000 / steps * 1000:.0f}")
+            else:
+                steps_per_second.append("-")
+
+        print(
+            f"{name:>14} {count_expressions(expressions(unoptimized_machine, False)):>12}"
+            f" {count_expressions(expressions(optimized_machine, True)):>10}"
+            f" {parse_time:>11.1f} {pass_time:>10.1f}"
+            f" {compile_times[0]:>13.1f} {compile_times[1]:>10.1f}"
+            f" {evaluation_times[0]:>11.2f} {evaluation_times[1]:>10.2f}"
+            f" {steps_per_second[0]:>8} {steps_per_second[1]:>10}"
+        )
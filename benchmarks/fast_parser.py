@@ -0,0 +1,116 @@
+"""Checks that the hand-written parser builds the same ASTs and reports the same errors
+as the ANTLR parser, then compares their parse times on large generated state machines."""
+
+from typing import Any
+
+from antlr4 import InputStream
+from common import ast_structure, generate_state_machine, measure
+from statemachine_ast.FastParser import parse_text
+from statemachine_ast.SourceParser import ParsingStrategy, SyntaxErrorCollector, parse_source
+
+VALID_SOURCES: list[str] = [
+    """StateMachine Test {
+    INITIAL -> Idle;
+    state Idle {
+        -> Run : 'go' / { x = 1 + 2 * 3 - 4 / 2; y = -x * 2; };
+        -> FINAL : 'stop';
+    }
+    composite state Run {
+        -> Idle : 'back' [x >= 3];
+        -> FINAL : 'abort';
+        INITIAL -> Inner;
+        state Inner {
+            -> Other : 'next' / { x = x - (1 + y); };
+        }
+        composite state Other {
+            -> FINAL : 'done';
+            INITIAL -> Deep;
+            state Deep {
+                -> Inner : 'next' [y < 0];
+                -> FINAL : 'done';
+            }
+        }
+    }
+}
+""",
+    # Precedence, associativity and signs.
+    """StateMachine Expressions { INITIAL -> A;
+    state A {
+        -> A : 'a' / { x = a - b - c; x = a ^ b ^ c; x = a - b * c ^ d / e + f; };
+        -> A : 'b' / { x = x -1; x = x - -1; x = +x * -2.5; x = ((a)) / (b - (c + d)); };
+        -> A : 'c' [v_1 = 007] / { _x = a * b / c * d; x = 1.5^2; };
+        -> A : 'd' [x != 1]; -> A : 'e' [x < -1]; -> A : 'f' [x <= 1];
+        -> A : 'g' [x > 1]; -> A : 'h' [x >= (1)];
+    }
+}""",
+    # Names that start with keywords, tabs, carriage returns and forward references.
+    "StateMachine StateMachines {\r\n\tINITIAL -> FINALx;\r\n"
+    "\tcomposite state Composite { INITIAL -> Later; state Later { -> Stateful : 'INITIAL'; } }\r\n"
+    "\tstate FINALx { -> Composite : 'state'; -> Later : 'x' / { }; }\r\n"
+    "\tstate Stateful { }\r\n}",
+]
+
+INVALID_SOURCES: list[str] = [
+    "",
+    "StateMachine M { INITIAL -> A; state A { -> A : 'x' } }",
+    "StateMachine M { INITIAL -> A; state A { -> A : 'x' [x ! 1]; } }",
+    "StateMachine M { INITIAL -> A; state A { -> A : 'x' / { x = 1.; }; } }",
+    "StateMachine M { INITIAL -> A; state A { -> A : 'x' / { x = -(1); }; } }",
+    "StateMachine M { INITIAL -> A; composite  state B { INITIAL -> A; state A { } } }",
+    "StateMachine M { INITIAL -> A; state A { } state A { } }",
+    "StateMachine M { INITIAL -> A; state A { -> B : 'x'; } }",
+    "StateMachine M { INITIAL -> B; state A { } }",
+    "StateMachine M { INITIAL -> A; composite state A { } }",
+    "StateMachine M { INITIAL -> A; state A { } } state B { }",
+    "StateMachine M { INITIAL -> A; state A { -> A : 'é'; } }",
+]
+
+
+def parse_result(source: str, strategy: ParsingStrategy) -> Any:
+    """Returns the structure of the AST built from a source text, or the raised error,
+    along with the reported syntax errors."""
+
+    error_collector: SyntaxErrorCollector = SyntaxErrorCollector()
+    try:
+        result: Any = ast_structure(
+            parse_source(InputStream(source), strategy, True, error_collector)
+        )
+    except Exception as error:
+        result = (type(error), str(error))
+
+    return result, error_collector.errors
+
+
+if __name__ == "__main__":
+    generated_sources: list[str] = [
+        generate_state_machine(100, seed=seed, assignments_per_transition=seed % 3)
+        for seed in range(5)
+    ] + [generate_state_machine(60, composite_size=1), generate_state_machine(60, 4, 60)]
+
+    for source in VALID_SOURCES + INVALID_SOURCES + generated_sources:
+        assert parse_result(source, ParsingStrategy.LL) == parse_result(
+            source, ParsingStrategy.FAST
+        ), f"Parsers disagree on:\n{source}"
+
+    # Valid sources must not be handed over to the ANTLR parser.
+    for source in VALID_SOURCES + generated_sources:
+        parse_text(source)
+
+    print(
+        f"{len(VALID_SOURCES) + len(generated_sources)} valid and {len(INVALID_SOURCES)}"
+        " invalid sources parsed identically by both parsers."
+    )
+    print(f"{'states':>8} {'ANTLR (ms)':>11} {'hand-written (ms)':>18} {'speedup':>8}")
+
+    for states in (200, 500, 1000):
+        source: str = generate_state_machine(states)
+
+        antlr: float = measure(
+            lambda: parse_source(InputStream(source), ParsingStrategy.SLL_THEN_LL, True),
+            1,
+        )
+        fast: float = measure(
+            lambda: parse_source(InputStream(source), ParsingStrategy.FAST)
+        )
+
+        print(f"{states:>8} {antlr:>11.1f} {fast:>18.1f} {antlr / fast:>7.1f}x")
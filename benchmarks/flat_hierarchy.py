@@ -0,0 +1,109 @@
+"""Compares resolving events from the effective transitions of simple states, which the
+trigger index of each state flattens from the state and its parent states, with climbing
+from the current state to its parent states on every lookup, on deeply nested composite
+states. Effective transitions are checked to be those found by climbing, on randomized
+hierarchies of states, by tests/test_effective_transitions.py."""
+
+import random
+
+from antlr4 import InputStream
+from common import measure
+from server.Runtime import Runtime
+from state_hierarchy import all_states, generate_nested_state_machine, link_composite_parents
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import SimpleState, State, StateMachine, Transition
+from trigger_index import ScanningRuntime, letters
+
+
+def generate_random_state_machine(states: int, seed: int = 0) -> str:
+    """Generates a state machine whose states are nested at random in composite states,
+    every state having a few outgoing transitions, some of them guarded, to random states
+    at any level. Triggers are shared by the transitions of different states."""
+
+    rng: random.Random = random.Random(seed)
+    names: list[str] = ["N" + letters(i) for i in range(states)]
+    triggers: list[str] = ["ev" + letters(i) for i in range(6)]
+    children: dict[str | None, list[str]] = {None: [names[0]]}
+    for name in names[1:]:
+        parent: str | None = rng.choice([None, *[n for n in children if n is not None]])
+        children.setdefault(parent, []).append(name)
+        if rng.random() < 0.4:
+            children[name] = []
+
+    def transitions(indent: str) -> list[str]:
+        lines: list[str] = []
+        for _ in range(rng.randint(0, 4)):
+            guard: str = ""
+            if rng.random() < 0.4:
+                guard = f" [x {rng.choice(['<', '>='])} {rng.randint(0, 30)}]"
+            target: str = "FINAL" if rng.random() < 0.02 else rng.choice(names)
+            lines.append(
+                f"{indent}-> {target} : '{rng.choice(triggers)}'{guard} / {{ x = x + 1; }};"
+            )
+        return lines
+
+    def state(name: str, indent: str) -> list[str]:
+        if len(children.get(name, [])) == 0:
+            return [f"{indent}state {name} {{", *transitions(indent + "    "), f"{indent}}}"]
+
+        return [
+            f"{indent}composite state {name} {{",
+            *transitions(indent + "    "),
+            f"{indent}    INITIAL -> {rng.choice(children[name])};",
+            *[line for child in children[name] for line in state(child, indent + "    ")],
+            f"{indent}}}",
+        ]
+
+    lines: list[str] = [
+        "StateMachine Random {",
+        "    INITIAL -> Start;",
+        f"    state Start {{ -> {names[0]} : 'start' / {{ x = 0; }}; }}",
+    ]
+    for name in children[None]:
+        lines.extend(state(name, "    "))
+    lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def look_up(runtime_class: type, state_machine: StateMachine, states: list[State]) -> None:
+    """Resolves, from each of the given states, the events that can be activated and the
+    transitions that each of these events can fire."""
+
+    runtime: Runtime = runtime_class(state_machine)
+    for state in states:
+        runtime.current_state = state
+        for event in runtime._find_possible_events():
+            runtime._find_possible_transitions(event)
+
+
+def parse(source: str) -> StateMachine:
+    return parse_source(InputStream(source), ParsingStrategy.FAST)
+
+
+if __name__ == "__main__":
+    print(
+        f"{'depth':>6} {'entries':>8} {'effective':>10} {'indexing (ms)':>14}"
+        f" {'climbing (ms)':>14} {'flattened (ms)':>15}"
+    )
+
+    for depth in (10, 50, 200):
+        state_machine: StateMachine = parse(generate_nested_state_machine(depth))
+        link_composite_parents(state_machine)
+        simple_states: list[State] = [
+            state for state in all_states(state_machine) if isinstance(state, SimpleState)
+        ]
+        times: list[float] = [
+            measure(lambda: look_up(runtime_class, state_machine, simple_states), 3)
+            for runtime_class in (ScanningRuntime, Runtime)
+        ]
+        entries: list[list[Transition]] = [
+            transitions
+            for state in simple_states
+            for transitions in state.transitions_by_trigger.values()
+        ]
+        print(
+            f"{depth:>6} {len(entries):>8} {sum(len(t) for t in entries):>10}"
+            f" {measure(state_machine.index_triggers, 3):>14.2f}"
+            f" {times[0]:>14.2f} {times[1]:>15.2f}"
+        )
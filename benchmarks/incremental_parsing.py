@@ -0,0 +1,145 @@
+"""Compares incremental parsing with full parsing after typical edits of a large state machine,
+and checks that both build the same AST."""
+
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from antlr4 import InputStream
+from common import ast_signature, generate_state_machine
+from server.LRP import ParseArguments
+from server.ServiceHandler import ServiceHandler
+from statemachine_ast.IncrementalParser import reparse_incrementally
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import CompositeState, State, StateMachine
+
+
+def edit_line(text: str, predicate: Callable[[str], bool], edit: Callable[[str], str]) -> str:
+    """Edits the line closest to the middle of the text that satisfies a predicate."""
+
+    lines: list[str] = text.split("\n")
+    middle: int = len(lines) // 2
+    index: int = next(i for i in range(middle, len(lines)) if predicate(lines[i]))
+    lines[index] = edit(lines[index])
+    return "\n".join(lines)
+
+
+EDITS: dict[str, Callable[[str], str]] = {
+    "change a number": lambda text: edit_line(
+        text, lambda line: "* (" in line, lambda line: line.replace("* (", "* (1 + ", 1)
+    ),
+    "change a trigger": lambda text: edit_line(
+        text, lambda line: ": 'ev" in line, lambda line: line.replace(": 'ev", ": 'new", 1)
+    ),
+    "add a transition": lambda text: edit_line(
+        text, lambda line: line.strip().startswith("state "), lambda line: line + " -> Sa : 'added';"
+    ),
+    "add line breaks": lambda text: edit_line(
+        text, lambda line: "->" in line, lambda line: line.replace(" / ", "\n\n / ", 1)
+    ),
+    "add a state": lambda text: text[: text.rindex("}")] + "    state Added { -> Sa : 'added'; }\n}\n",
+    "rename the machine": lambda text: text.replace("Generated", "Renamed", 1),
+}
+
+
+def state_ids(state_machine: StateMachine) -> dict[str, str]:
+    def walk(states: list[State]):
+        for state in states:
+            yield state
+            yield from walk(state.states)
+
+    return {state.name: state.id for state in walk(state_machine.states)}
+
+
+def check_references(state_machine: StateMachine) -> None:
+    """Checks that the states referenced by the elements of a state machine are states
+    reachable from the state machine, and not states discarded by incremental parsing."""
+
+    def walk(states: list[State]):
+        for state in states:
+            yield state
+            yield from walk(state.states)
+
+    states: list[State] = list(walk(state_machine.states))
+    reachable: set[int] = {id(state) for state in states}
+    reachable.update(
+        id(transition.target)
+        for state in states
+        for transition in state.outgoing_transitions
+        if transition.target.is_final
+    )
+
+    referenced: list[State] = []
+    if state_machine.initial_state is not None:
+        referenced.append(state_machine.initial_state.target)
+    for state in states:
+        if isinstance(state, CompositeState) and state.initial_state is not None:
+            referenced.append(state.initial_state.target)
+        for transition in state.outgoing_transitions + state.incoming_transitions:
+            referenced.extend((transition.source, transition.target))
+    for state in referenced:
+        assert id(state) in reachable, f"State {state.name} is not reachable."
+
+
+# Composite state whose initial state targets a top-level state, edited on its own.
+INITIAL_TARGET_SOURCE: str = """StateMachine Outside {
+    INITIAL -> A;
+    composite state A {
+        INITIAL -> X;
+        state Y { -> X : 'b'; }
+    }
+    state X { -> Y : 'a'; }
+}
+"""
+
+
+if __name__ == "__main__":
+    state_machine: StateMachine = parse_source(
+        InputStream(INITIAL_TARGET_SOURCE), ParsingStrategy.FAST
+    )
+    edited: str = INITIAL_TARGET_SOURCE.replace("'a'", "'c'")
+    assert reparse_incrementally(state_machine, INITIAL_TARGET_SOURCE, edited)
+    check_references(state_machine)
+    assert ast_signature(state_machine) == ast_signature(
+        parse_source(InputStream(edited), ParsingStrategy.FAST)
+    ), "Incremental parsing built a different AST after editing an initial target."
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_file: Path = Path(directory) / "generated.sm"
+        original: str = generate_state_machine(300)
+
+        print(f"{'edit':>20} {'full (ms)':>10} {'incremental (ms)':>17} {'kept ids':>9}")
+
+        for name, edit in EDITS.items():
+            source_file.write_text(original)
+            handler: ServiceHandler = ServiceHandler()
+            handler.parse(ParseArguments(str(source_file)))
+            state_machine: StateMachine = handler.registry.loaded_sources[str(source_file)]
+            ids_before: dict[str, str] = state_ids(state_machine)
+
+            source_file.write_text(edit(original))
+            start: float = time.perf_counter()
+            handler.parse(ParseArguments(str(source_file)))
+            incremental: float = (time.perf_counter() - start) * 1000
+
+            full_handler: ServiceHandler = ServiceHandler(incremental_parsing=False)
+            start = time.perf_counter()
+            full_handler.parse(ParseArguments(str(source_file)))
+            full: float = (time.perf_counter() - start) * 1000
+
+            assert ast_signature(
+                handler.registry.loaded_sources[str(source_file)]
+            ) == ast_signature(
+                full_handler.registry.loaded_sources[str(source_file)]
+            ), f"Incremental parsing built a different AST after edit '{name}'."
+            check_references(handler.registry.loaded_sources[str(source_file)])
+
+            ids_after: dict[str, str] = state_ids(
+                handler.registry.loaded_sources[str(source_file)]
+            )
+            kept_ids: int = sum(
+                1 for state, state_id in ids_before.items() if ids_after.get(state) == state_id
+            )
+
+            print(f"{name:>20} {full:>10.1f} {incremental:>17.1f} {kept_ids / len(ids_before):>8.0%}")
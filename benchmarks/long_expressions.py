@@ -0,0 +1,181 @@
+"""Parses and evaluates expressions made of long chains of operations, and compares the
+evaluation with the former recursive evaluator, which needs a raised recursion limit."""
+
+import sys
+import threading
+from typing import Any, Callable
+
+from antlr4 import InputStream
+from common import ast_structure, measure
+from server.Runtime import ExpressionEvaluator
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import (
+    BinaryExpression,
+    Expression,
+    NumberAtomicExpression,
+    Operand,
+    ParenthesizedExpression,
+    Sign,
+    StateMachine,
+    VariableAtomicExpression,
+)
+
+VARIABLES: dict[str, float] = {"va": 1.5, "vb": -2.0, "vc": 3.25}
+
+
+class RecursiveExpressionEvaluator:
+    """Evaluator of expressions as implemented before evaluation became iterative."""
+
+    def evaluate(self, expression: Expression) -> float:
+        if isinstance(expression, BinaryExpression):
+            left: float = self.evaluate(expression.left)
+            right: float = self.evaluate(expression.right)
+            match expression.operand:
+                case Operand.TIMES:
+                    return left * right
+                case Operand.DIV:
+                    return left / right
+                case Operand.PLUS:
+                    return left + right
+                case Operand.MINUS:
+                    return left - right
+
+        if isinstance(expression, ParenthesizedExpression):
+            result: float = self.evaluate(expression.contained_expression)
+        elif isinstance(expression, VariableAtomicExpression):
+            result = VARIABLES[expression.variable]
+        else:
+            result = expression.number
+
+        return -result if expression.sign is Sign.MINUS else result
+
+
+def recursive_value(expression: Expression) -> str:
+    """Formats an expression as Expression.value() did before it became iterative."""
+
+    sign_value: str = "" if getattr(expression, "sign", None) is None else expression.sign
+    if isinstance(expression, BinaryExpression):
+        return f"{recursive_value(expression.left)} {expression.operand.value} {recursive_value(expression.right)}"
+    if isinstance(expression, ParenthesizedExpression):
+        return f"{sign_value}({recursive_value(expression.contained_expression)})"
+    if isinstance(expression, VariableAtomicExpression):
+        return f"{sign_value}{expression.variable}"
+
+    return f"{sign_value}{expression.number}"
+
+
+def generate_expression(terms: int) -> str:
+    """Generates an expression of `terms` terms chained by operations of every precedence."""
+
+    operators: str = "+-*+/-"
+    pieces: list[str] = []
+    for index in range(terms):
+        if index > 0:
+            pieces.append(f" {operators[index % len(operators)]} ")
+
+        match index % 4:
+            case 0:
+                pieces.append(list(VARIABLES)[index % len(VARIABLES)])
+            case 1:
+                pieces.append(str(index % 7 + 1))
+            case 2:
+                pieces.append(f"(-vc + {index % 5 + 1})")
+            case 3:
+                pieces.append("-va")
+
+    return "".join(pieces)
+
+
+def run_with_deep_stack(function: Callable[[], Any]) -> Any:
+    """Runs a function with a raised recursion limit, in a thread with a large stack."""
+
+    results: list[Any] = []
+    recursion_limit: int = sys.getrecursionlimit()
+    sys.setrecursionlimit(10**6)
+    threading.stack_size(1 << 29)
+    thread: threading.Thread = threading.Thread(target=lambda: results.append(function()))
+    thread.start()
+    thread.join()
+    threading.stack_size(0)
+    sys.setrecursionlimit(recursion_limit)
+
+    return results[0]
+
+
+if __name__ == "__main__":
+    print(
+        f"{'terms':>7} {'ANTLR parse (ms)':>17} {'fast parse (ms)':>16}"
+        f" {'evaluation (ms)':>16} {'recursive evaluation (ms)':>26}"
+    )
+
+    for terms in (1_000, 10_000, 50_000):
+        expression_source: str = generate_expression(terms)
+        source: str = (
+            "StateMachine Long { INITIAL -> A; state A {"
+            f" -> A : 'step' [va < {expression_source}] / {{ va = {expression_source}; }};"
+            " } }"
+        )
+
+        fast_parse: float = measure(
+            lambda: parse_source(InputStream(source), ParsingStrategy.FAST), 3
+        )
+        state_machine: StateMachine = parse_source(
+            InputStream(source), ParsingStrategy.FAST
+        )
+        if terms <= 10_000:
+            antlr_parse: str = f"{measure(lambda: parse_source(InputStream(source), compact=True), 1):.1f}"
+            assert ast_structure(
+                parse_source(InputStream(source), compact=True)
+            ) == ast_structure(state_machine), "Parsers built different ASTs."
+        else:
+            antlr_parse = "-"
+
+        expression: Expression = (
+            state_machine.states[0].outgoing_transitions[0].assignments[0].expression
+        )
+        assert expression.value() == run_with_deep_stack(
+            lambda: recursive_value(expression)
+        ), "Expression values differ."
+
+        evaluator: ExpressionEvaluator = ExpressionEvaluator(dict(VARIABLES))
+        evaluation: float = measure(lambda: evaluator.evaluate(expression))
+        recursive_evaluation: float = run_with_deep_stack(
+            lambda: measure(lambda: RecursiveExpressionEvaluator().evaluate(expression))
+        )
+        assert evaluator.evaluate(expression) == run_with_deep_stack(
+            lambda: RecursiveExpressionEvaluator().evaluate(expression)
+        ), "Evaluators computed different values."
+
+        print(
+            f"{terms:>7} {antlr_parse:>17} {fast_parse:>16.1f}"
+            f" {evaluation:>16.2f} {recursive_evaluation:>26.2f}"
+        )
+
+    # Evaluation of the small expressions found in typical state machines.
+    small_expression: Expression = (
+        parse_source(
+            InputStream(
+                "StateMachine Small { INITIAL -> A; state A {"
+                f" -> A : 'step' / {{ va = {generate_expression(5)}; }}; }} }}"
+            ),
+            ParsingStrategy.FAST,
+        )
+        .states[0]
+        .outgoing_transitions[0]
+        .assignments[0]
+        .expression
+    )
+    evaluator = ExpressionEvaluator(dict(VARIABLES))
+    iterative_small: float = measure(
+        lambda: [evaluator.evaluate(small_expression) for _ in range(10_000)]
+    )
+    recursive_small: float = measure(
+        lambda: [
+            RecursiveExpressionEvaluator().evaluate(small_expression)
+            for _ in range(10_000)
+        ]
+    )
+    print(
+        f"10k evaluations of a 5-term expression: {iterative_small:.1f} ms,"
+        f" {recursive_small:.1f} ms with the recursive evaluator"
+    )
@@ -0,0 +1,130 @@
+"""Compares sending the whole AST in the response to a parse request with sending only
+its root and shallow children, the rest being fetched by pages on demand. Also checks
+that the whole AST can be rebuilt from the pages."""
+
+import json
+import tempfile
+from pathlib import Path
+
+from common import generate_state_machine, measure
+from server.DictBuilder import (
+    from_get_children_response,
+    from_get_model_element_response,
+    from_model_element,
+    from_parse_response,
+)
+from server.LRP import (
+    GetChildrenArguments,
+    GetModelElementArguments,
+    ModelElement,
+    ParseArguments,
+)
+from server.ModelElementIndex import ModelElementIndex
+from server.ServiceHandler import ServiceHandler
+from statemachine_ast.SourceParser import ParsingStrategy
+
+PAGE_SIZE: int = 50
+
+
+def fetch_subtree(handler: ServiceHandler, source_file: str, element: dict) -> dict:
+    """Rebuilds the whole subtree of a shallow element, fetching children by pages."""
+
+    if "childCounts" in element:
+        element = from_get_model_element_response(
+            handler.get_model_element(
+                GetModelElementArguments(source_file, element["id"], 1)
+            )
+        )["element"]
+
+    for relation, children in element["children"].items():
+        if not isinstance(children, list):
+            element["children"][relation] = fetch_subtree(handler, source_file, children)
+            continue
+
+        fetched_children: list[dict] = []
+        while len(fetched_children) < len(children):
+            page: dict = from_get_children_response(
+                handler.get_children(
+                    GetChildrenArguments(
+                        source_file,
+                        element["id"],
+                        relation,
+                        len(fetched_children),
+                        PAGE_SIZE,
+                    )
+                )
+            )
+            assert page["total"] == len(children), "Wrong number of children."
+            fetched_children.extend(
+                fetch_subtree(handler, source_file, child) for child in page["children"]
+            )
+
+        element["children"][relation] = fetched_children
+
+    return element
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        print(
+            f"{'states':>7} {'full (KB)':>10} {'shallow (KB)':>13} {'page (KB)':>10}"
+            f" {'full (ms)':>10} {'shallow (ms)':>13} {'page (ms)':>10}"
+        )
+
+        for states in (1000, 3000, 10000):
+            source_file: str = str(Path(directory) / f"generated_{states}.sm")
+            Path(source_file).write_text(generate_state_machine(states))
+
+            handler: ServiceHandler = ServiceHandler(
+                parsing_strategy=ParsingStrategy.FAST
+            )
+            full_response: dict = from_parse_response(
+                handler.parse(ParseArguments(source_file))
+            )
+            shallow_response: dict = from_parse_response(
+                handler.parse(ParseArguments(source_file, depth=1))
+            )
+
+            assert fetch_subtree(
+                handler, source_file, json.loads(json.dumps(shallow_response["astRoot"]))
+            ) == json.loads(json.dumps(full_response["astRoot"])), "Paged AST differs."
+
+            composite_id: str = shallow_response["astRoot"]["children"]["states"][0]["id"]
+
+            def full() -> str:
+                return json.dumps(
+                    from_parse_response(handler.parse(ParseArguments(source_file)))
+                )
+
+            def shallow() -> str:
+                return json.dumps(
+                    from_parse_response(
+                        handler.parse(ParseArguments(source_file, depth=1))
+                    )
+                )
+
+            def page() -> str:
+                return json.dumps(
+                    from_get_children_response(
+                        handler.get_children(
+                            GetChildrenArguments(
+                                source_file, composite_id, "states", 0, PAGE_SIZE
+                            )
+                        )
+                    )
+                )
+
+            print(
+                f"{states:>7} {len(full()) / 1024:>10.0f} {len(shallow()) / 1024:>13.1f}"
+                f" {len(page()) / 1024:>10.1f} {measure(full):>10.1f}"
+                f" {measure(shallow):>13.2f} {measure(page):>10.2f}"
+            )
+
+        # The index is built once per AST, on the first lookup.
+        root: ModelElement = handler.registry.loaded_asts[source_file].response.astRoot
+        conversion: float = measure(lambda: from_model_element(root), 1)
+        indexing: float = measure(lambda: ModelElementIndex(root), 3)
+        print(
+            f"{states} states: {conversion:.1f} ms to convert the whole AST,"
+            f" {indexing:.1f} ms to index it"
+        )
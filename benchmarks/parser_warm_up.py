@@ -0,0 +1,83 @@
+"""Compares the latency of the first parse in a new process with the latency of later
+parses, with and without warming up parsers on the bundled corpus beforehand. Each
+measurement runs in a new process, whose parser caches are cold."""
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+from antlr4 import InputStream
+from common import generate_state_machine
+from statemachine_ast.ParserWarmUp import warm_up
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+
+PROCESSES: int = 5
+
+
+def parse_time(source: str, strategy: ParsingStrategy) -> float:
+    """Returns the time spent parsing a source text, in milliseconds."""
+
+    start: float = time.perf_counter()
+    parse_source(InputStream(source), strategy, True)
+
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_in_process(states: int, strategy: ParsingStrategy, warm: bool) -> dict:
+    """Measures the latency of the first parse and of later parses in this process."""
+
+    sources: list[str] = [generate_state_machine(states, seed=seed) for seed in range(6)]
+    warm_up_time: float = 0.0
+    if warm:
+        start: float = time.perf_counter()
+        warm_up(strategy)
+        warm_up_time = (time.perf_counter() - start) * 1000
+
+    first: float = parse_time(sources[0], strategy)
+    steady: float = statistics.median(
+        parse_time(source, strategy) for source in sources[1:]
+    )
+
+    return {"warm_up": warm_up_time, "first": first, "steady": steady}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        print(
+            json.dumps(
+                measure_in_process(
+                    int(sys.argv[1]), ParsingStrategy(sys.argv[2]), sys.argv[3] == "warm"
+                )
+            )
+        )
+        sys.exit()
+
+    print(
+        f"{'strategy':>9} {'states':>7} {'warm-up':>8} {'warm-up (ms)':>13}"
+        f" {'first parse (ms)':>17} {'steady state (ms)':>18}"
+    )
+    for strategy in (ParsingStrategy.SLL_THEN_LL, ParsingStrategy.FAST):
+        for states in (5, 50):
+            for mode in ("cold", "warm"):
+                results: list[dict] = [
+                    json.loads(
+                        subprocess.run(
+                            [sys.executable, __file__, str(states), strategy.value, mode],
+                            capture_output=True,
+                            check=True,
+                            text=True,
+                        ).stdout
+                    )
+                    for _ in range(PROCESSES)
+                ]
+
+                def median(key: str) -> float:
+                    return statistics.median(result[key] for result in results)
+
+                print(
+                    f"{strategy.value:>9} {states:>7} {'yes' if mode == 'warm' else 'no':>8}"
+                    f" {median('warm_up'):>13.1f} {median('first'):>17.1f}"
+                    f" {median('steady'):>18.1f}"
+                )
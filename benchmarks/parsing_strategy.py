@@ -0,0 +1,26 @@
+"""Compares the parsing strategies of the ANTLR parser on large generated state machines."""
+
+from antlr4 import InputStream
+from common import ast_signature, generate_state_machine, measure
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+
+if __name__ == "__main__":
+    print(f"{'states':>8} {'LL (ms)':>10} {'SLL then LL (ms)':>17} {'speedup':>8}")
+
+    for states in (200, 500, 1000):
+        source: str = generate_state_machine(states)
+
+        ll: float = measure(
+            lambda: parse_source(InputStream(source), ParsingStrategy.LL), 1
+        )
+        sll_then_ll: float = measure(
+            lambda: parse_source(InputStream(source), ParsingStrategy.SLL_THEN_LL), 1
+        )
+
+        assert ast_signature(
+            parse_source(InputStream(source), ParsingStrategy.LL)
+        ) == ast_signature(
+            parse_source(InputStream(source), ParsingStrategy.SLL_THEN_LL)
+        ), "Parsing strategies built different ASTs."
+
+        print(f"{states:>8} {ll:>10.1f} {sll_then_ll:>17.1f} {ll / sll_then_ll:>7.1f}x")
@@ -0,0 +1,85 @@
+"""Checks that the regex lexer emits the same tokens and reports the same errors as the
+ANTLR lexer, then compares their lexing times and the resulting parse times on large
+generated state machines."""
+
+from typing import Any
+
+from antlr4 import CommonTokenStream, InputStream
+from common import generate_state_machine, measure
+from fast_parser import INVALID_SOURCES, VALID_SOURCES
+from parser.StateMachineLexer import StateMachineLexer
+from parser.StateMachineParser import StateMachineParser
+from statemachine_ast.RegexLexer import RegexLexer
+from statemachine_ast.SourceParser import SyntaxErrorCollector
+
+LEXER_SOURCES: list[str] = [
+    "'abc",
+    "x = 1.; 'a b' 'c'",
+    "é -> A",
+    "composite  state\n\n  composite state composite statex",
+    "A é\n  b # c\n -> B",
+    "  \n\t",
+    "x1.2.3 1..2 ->-> !!= <<= >>= StateMachines stateful INITIALS",
+]
+
+
+def tokens(lexer_class: type, source: str) -> Any:
+    """Returns the tokens emitted by a lexer for a source text, with the reported errors."""
+
+    error_collector: SyntaxErrorCollector = SyntaxErrorCollector()
+    lexer = lexer_class(InputStream(source))
+    lexer.removeErrorListeners()
+    lexer.addErrorListener(error_collector)
+    stream: CommonTokenStream = CommonTokenStream(lexer)
+    stream.fill()
+
+    return [
+        (token.type, token.text, token.line, token.column, token.start, token.stop)
+        for token in stream.tokens
+    ], error_collector.errors
+
+
+def lex(lexer_class: type, source: str) -> None:
+    CommonTokenStream(lexer_class(InputStream(source))).fill()
+
+
+def parse(lexer_class: type, source: str) -> None:
+    parser: StateMachineParser = StateMachineParser(
+        CommonTokenStream(lexer_class(InputStream(source)))
+    )
+    parser.removeErrorListeners()
+    parser.statemachine()
+
+
+if __name__ == "__main__":
+    sources: list[str] = (
+        VALID_SOURCES
+        + INVALID_SOURCES
+        + LEXER_SOURCES
+        + [generate_state_machine(200, seed=seed) for seed in range(5)]
+    )
+    for source in sources:
+        assert tokens(StateMachineLexer, source) == tokens(
+            RegexLexer, source
+        ), f"Lexers disagree on:\n{source}"
+
+    print(f"{len(sources)} sources lexed identically by both lexers.")
+    print(
+        f"{'size (MB)':>10} {'ANTLR lexer (ms)':>17} {'regex lexer (ms)':>17}"
+        f" {'speedup':>8} {'parse with ANTLR lexer (ms)':>28} {'with regex lexer (ms)':>22}"
+    )
+
+    for states in (3000, 10000):
+        source: str = generate_state_machine(states)
+        antlr_lexing: float = measure(lambda: lex(StateMachineLexer, source), 1)
+        regex_lexing: float = measure(lambda: lex(RegexLexer, source), 3)
+        if states <= 3000:
+            antlr_parse: str = f"{measure(lambda: parse(StateMachineLexer, source), 1):.0f}"
+            regex_parse: str = f"{measure(lambda: parse(RegexLexer, source), 1):.0f}"
+        else:
+            antlr_parse = regex_parse = "-"
+
+        print(
+            f"{len(source) / 2**20:>10.1f} {antlr_lexing:>17.0f} {regex_lexing:>17.0f}"
+            f" {antlr_lexing / regex_lexing:>7.1f}x {antlr_parse:>28} {regex_parse:>22}"
+        )
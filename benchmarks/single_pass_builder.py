@@ -0,0 +1,88 @@
+"""Compares building ASTs with the two-pass builder and with the single-pass builder."""
+
+import gc
+import tracemalloc
+from typing import Callable
+
+from antlr4 import CommonTokenStream, InputStream
+from common import ast_signature, generate_state_machine, measure
+from parser.StateMachineLexer import StateMachineLexer
+from parser.StateMachineParser import StateMachineParser
+from statemachine_ast.BuildASTVisitor import (
+    BasicBuildEmptyStatesVisitor,
+    BuildASTVisitor,
+    SinglePassBuildASTVisitor,
+)
+from statemachine_ast.StateMachine import State, StateMachine
+
+
+def allocated_memory(build: Callable[[], StateMachine]) -> int:
+    """Returns the peak memory allocated while building an AST, in bytes."""
+
+    gc.collect()
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+def incoming_transitions(state_machine: StateMachine) -> list[list[str]]:
+    """Returns the labels of the incoming transitions of every state, in order."""
+
+    states: list[State] = []
+    pending: list[State] = list(reversed(state_machine.states))
+    while len(pending) > 0:
+        state: State = pending.pop()
+        states.append(state)
+        pending.extend(reversed(state.states))
+
+    return [
+        [f"{transition.label} : {transition.trigger}" for transition in state.incoming_transitions]
+        for state in states
+    ]
+
+
+if __name__ == "__main__":
+    print(
+        f"{'states':>8} {'first pass (ms)':>16} {'two-pass (ms)':>14} {'single-pass (ms)':>17} {'speedup':>8}"
+        f" {'two-pass (MB)':>14} {'single-pass (MB)':>17}"
+    )
+
+    for states in (1000, 2000):
+        source: str = generate_state_machine(states)
+        tree: StateMachineParser.StatemachineContext = StateMachineParser(
+            CommonTokenStream(StateMachineLexer(InputStream(source)))
+        ).statemachine()
+
+        two_pass_ast: StateMachine = BuildASTVisitor(True).visitStatemachine(tree)
+        single_pass_ast: StateMachine = SinglePassBuildASTVisitor(True).visitStatemachine(tree)
+        assert ast_signature(two_pass_ast) == ast_signature(
+            single_pass_ast
+        ), "Builders built different ASTs."
+        assert incoming_transitions(two_pass_ast) == incoming_transitions(
+            single_pass_ast
+        ), "Builders listed incoming transitions in a different order."
+
+        # Collections triggered by the parse tree would otherwise dominate the timings.
+        gc.disable()
+        two_pass: float = measure(lambda: BuildASTVisitor(True).visitStatemachine(tree))
+        single_pass: float = measure(
+            lambda: SinglePassBuildASTVisitor(True).visitStatemachine(tree)
+        )
+        first_pass: float = measure(
+            lambda: BasicBuildEmptyStatesVisitor().visitStatemachine(tree)
+        )
+        gc.enable()
+        two_pass_memory: int = allocated_memory(
+            lambda: BuildASTVisitor(True).visitStatemachine(tree)
+        )
+        single_pass_memory: int = allocated_memory(
+            lambda: SinglePassBuildASTVisitor(True).visitStatemachine(tree)
+        )
+
+        print(
+            f"{states:>8} {first_pass:>16.1f} {two_pass:>14.1f} {single_pass:>17.1f} {two_pass / single_pass:>7.2f}x"
+            f" {two_pass_memory / 2**20:>14.1f} {single_pass_memory / 2**20:>17.1f}"
+        )
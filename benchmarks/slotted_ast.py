@@ -0,0 +1,166 @@
+"""Reports the memory taken by the elements of a large AST, whose classes declare slots,
+and compares it with the memory taken by the same elements with a dictionary of attributes,
+as they had before. Reading the attributes of transitions and expressions is also compared
+with both layouts."""
+
+import gc
+import sys
+import tracemalloc
+from typing import Any, Iterator
+
+from antlr4 import InputStream
+from common import generate_state_machine, measure
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import (
+    BinaryExpression,
+    Expression,
+    ParenthesizedExpression,
+    State,
+    StateMachine,
+    Transition,
+)
+
+
+def walk(state_machine: StateMachine) -> Iterator[Any]:
+    """Iterates over the elements of a state machine, including expressions and initial
+    pseudo states."""
+
+    yield state_machine
+    if state_machine.initial_state is not None:
+        yield state_machine.initial_state
+
+    pending_states: list[State] = list(state_machine.states)
+    while len(pending_states) > 0:
+        state: State = pending_states.pop()
+        yield state
+        if getattr(state, "initial_state", None) is not None:
+            yield state.initial_state
+
+        pending_states.extend(state.states)
+        for transition in state.outgoing_transitions:
+            yield transition
+            if transition.target.is_final:
+                yield transition.target
+
+            expressions: list[Expression] = [a.expression for a in transition.assignments]
+            if transition.guard is not None:
+                yield transition.guard
+                expressions.append(transition.guard.expression)
+
+            yield from transition.assignments
+            while len(expressions) > 0:
+                expression: Expression = expressions.pop()
+                yield expression
+                if isinstance(expression, BinaryExpression):
+                    expressions.extend((expression.left, expression.right))
+                elif isinstance(expression, ParenthesizedExpression):
+                    expressions.append(expression.contained_expression)
+
+
+def slot_names(element_class: type) -> list[str]:
+    return [
+        name
+        for cls in element_class.__mro__
+        for name in getattr(cls, "__slots__", ())
+    ]
+
+
+def copies(elements: list[Any], slotted: bool) -> list[Any]:
+    """Copies elements into new instances of their class if slotted is True, or else into
+    instances of classes without slots, which have a dictionary of attributes. Copies
+    share the attribute values of the elements."""
+
+    copy_classes: dict[type, type] = {}
+    element_copies: list[Any] = [None] * len(elements)
+
+    for index, element in enumerate(elements):
+        element_class: type = type(element)
+        if element_class not in copy_classes:
+            copy_classes[element_class] = (
+                element_class if slotted else type(element_class.__name__, (), {})
+            )
+
+        copy: Any = object.__new__(copy_classes[element_class])
+        for name in slot_names(element_class):
+            if hasattr(element, name):
+                setattr(copy, name, getattr(element, name))
+
+        element_copies[index] = copy
+
+    return element_copies
+
+
+def copies_memory(elements: list[Any], slotted: bool) -> int:
+    """Returns the memory taken by the copies of elements, in bytes."""
+
+    gc.collect()
+    tracemalloc.start()
+    element_copies: list[Any] = copies(elements, slotted)
+    memory: int = tracemalloc.get_traced_memory()[0] - sys.getsizeof(element_copies)
+    tracemalloc.stop()
+
+    return memory
+
+
+def read_transitions(transitions: list[Transition]) -> None:
+    for transition in transitions:
+        transition.source
+        transition.target
+        transition.trigger
+        transition.guard
+        transition.assignments
+
+
+def read_binary_expressions(expressions: list[BinaryExpression]) -> None:
+    for expression in expressions:
+        expression.left
+        expression.right
+        expression.operand
+
+
+if __name__ == "__main__":
+    source: str = generate_state_machine(12500)
+    state_machine: StateMachine = parse_source(InputStream(source), ParsingStrategy.FAST)
+    elements: list[Any] = list(walk(state_machine))
+    assert all(not hasattr(element, "__dict__") for element in elements), (
+        "Some elements have a dictionary of attributes."
+    )
+
+    elements_by_class: dict[type, list[Any]] = {}
+    for element in elements:
+        elements_by_class.setdefault(type(element), []).append(element)
+
+    print(f"{len(elements)} elements, including {len(elements_by_class[Transition])} transitions")
+    print(f"{'class':>25} {'count':>8} {'slots (B)':>10} {'dictionary (B)':>15}")
+
+    slotted_total: int = 0
+    unslotted_total: int = 0
+    for element_class, class_elements in sorted(
+        elements_by_class.items(), key=lambda item: -len(item[1])
+    ):
+        slotted: int = copies_memory(class_elements, True)
+        unslotted: int = copies_memory(class_elements, False)
+        slotted_total += slotted
+        unslotted_total += unslotted
+        print(
+            f"{element_class.__name__:>25} {len(class_elements):>8}"
+            f" {slotted / len(class_elements):>10.0f}"
+            f" {unslotted / len(class_elements):>15.0f}"
+        )
+
+    print(
+        f"{'total (MB)':>25} {len(elements):>8} {slotted_total / 2**20:>10.1f}"
+        f" {unslotted_total / 2**20:>15.1f}"
+    )
+
+    print(f"{'reads':>25} {'slots (ms)':>11} {'dictionary (ms)':>16}")
+    for name, read, class_elements in (
+        ("transitions", read_transitions, elements_by_class[Transition]),
+        ("binary expressions", read_binary_expressions, elements_by_class[BinaryExpression]),
+    ):
+        slotted_copies: list[Any] = copies(class_elements, True)
+        unslotted_copies: list[Any] = copies(class_elements, False)
+        print(
+            f"{name:>25} {measure(lambda: read(slotted_copies)):>11.1f}"
+            f" {measure(lambda: read(unslotted_copies)):>16.1f}"
+        )
@@ -0,0 +1,66 @@
+"""Compares the ways a parse request can get the text of a source file: reading the file
+in a buffer, memory-mapping it, or receiving the text in the request. ASTs are cached
+beforehand, so that only the cost of getting and hashing the text is measured."""
+
+import gc
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from common import generate_state_machine, measure
+import server.ServiceHandler as serviceHandlerModule
+from server.LRP import ParseArguments
+from server.ServiceHandler import ServiceHandler
+from statemachine_ast.SourceParser import ParsingStrategy
+
+
+def allocated_memory(function: Callable[[], object]) -> int:
+    """Returns the peak memory allocated while running a function, in bytes."""
+
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as directory:
+        print(
+            f"{'size (MB)':>10} {'read (ms)':>10} {'mmap (ms)':>10} {'text (ms)':>10}"
+            f" {'read (MB)':>10} {'mmap (MB)':>10} {'text (MB)':>10}"
+        )
+
+        for states in (3000, 10000):
+            source_file: Path = Path(directory) / f"generated_{states}.sm"
+            source_file.write_text(generate_state_machine(states))
+            source_text: str = source_file.read_text()
+
+            handler: ServiceHandler = ServiceHandler(
+                parsing_strategy=ParsingStrategy.FAST
+            )
+            response = handler.parse(ParseArguments(str(source_file)))
+
+            def read_file() -> None:
+                serviceHandlerModule.MMAP_THRESHOLD = source_file.stat().st_size + 1
+                assert handler.parse(ParseArguments(str(source_file))) is response
+
+            def map_file() -> None:
+                serviceHandlerModule.MMAP_THRESHOLD = 0
+                assert handler.parse(ParseArguments(str(source_file))) is response
+
+            def text() -> None:
+                assert (
+                    handler.parse(ParseArguments(str(source_file), source_text))
+                    is response
+                )
+
+            print(
+                f"{len(source_text) / 2**20:>10.1f}"
+                f" {measure(read_file, 20):>10.2f} {measure(map_file, 20):>10.2f} {measure(text, 20):>10.2f}"
+                f" {allocated_memory(read_file) / 2**20:>10.1f} {allocated_memory(map_file) / 2**20:>10.1f}"
+                f" {allocated_memory(text) / 2**20:>10.1f}"
+            )
@@ -0,0 +1,211 @@
+"""Checks that the states exited and entered by transitions, resolved when building ASTs,
+give the same stateExited and stateReached breakpoint checks as walking the state machine
+from the least common ancestor of the source and the target of transitions on every check,
+then compares both with dozens of state breakpoints on deeply nested composite states."""
+
+import random
+
+from antlr4 import InputStream
+from common import measure
+from server.Runtime import Runtime, StateChangeStep, TransitionStep
+from state_hierarchy import (
+    all_states,
+    find_containers,
+    generate_nested_state_machine,
+    link_composite_parents,
+    state_change_steps,
+    transitions_of,
+    walk_nested_initial_state,
+)
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import State, StateMachine
+from trigger_index import generate_wide_state_machine
+
+
+def walk_parents(state: State | None, containers: dict[int, State | None]) -> list[State]:
+    """Returns a state and the states containing it, walking the state machine."""
+
+    states: list[State] = []
+    while state is not None:
+        states.append(state)
+        state = containers[id(state)]
+
+    return states
+
+
+def walk_common_ancestor(
+    source: State, target: State, containers: dict[int, State | None]
+) -> State | None:
+    """Returns the least common proper ancestor of two states, walking the state machine."""
+
+    target_ancestors: list[State] = walk_parents(containers[id(target)], containers)
+    for ancestor in walk_parents(containers[id(source)], containers):
+        if any(ancestor is target_ancestor for target_ancestor in target_ancestors):
+            return ancestor
+
+    return None
+
+
+class WalkingStateChangeStep(StateChangeStep):
+    """State change walking the state machine from the least common ancestor of the source
+    and the target of its transition on every breakpoint check."""
+
+    def __init__(self, parent_step: TransitionStep, runtime: Runtime) -> None:
+        super().__init__(parent_step, runtime)
+        self.containers: dict[int, State | None] = find_containers(runtime.state_machine)
+
+    def _find_reached_state(self, state_id_to_match: str) -> State | None:
+        common_ancestor: State | None = walk_common_ancestor(
+            self.source, self.target, self.containers
+        )
+        state: State | None = self.target
+        while state is not None and state is not common_ancestor:
+            if state.id == state_id_to_match:
+                return state
+            state = self.containers[id(state)]
+
+        state = walk_nested_initial_state(self.target)
+        while state is not None and state is not self.target:
+            if state.id == state_id_to_match:
+                return state
+            state = self.containers[id(state)]
+
+        return None
+
+    def _find_exited_state(self, state_id_to_match: str) -> State | None:
+        # States contained by the source are exited from the current state, if the
+        # source contains it.
+        state: State | None = self.runtime.current_state
+        if any(parent is self.source for parent in walk_parents(state, self.containers)):
+            while state is not self.source:
+                if state.id == state_id_to_match:
+                    return state
+                state = self.containers[id(state)]
+
+        common_ancestor: State | None = walk_common_ancestor(
+            self.source, self.target, self.containers
+        )
+        state = self.source
+        while state is not None and state is not common_ancestor:
+            if state.id == state_id_to_match:
+                return state
+            state = self.containers[id(state)]
+
+        return None
+
+
+def check_breakpoints(steps: list[StateChangeStep], state_ids: list[str]) -> list:
+    return [
+        step.check_breakpoint(breakpoint_type, {"s": state_id})
+        for step in steps
+        for breakpoint_type in ("stateReached", "stateExited")
+        for state_id in state_ids
+    ]
+
+
+def fired_state_changes(
+    step_class: type, state_machine: StateMachine, states: list[State]
+) -> list[StateChangeStep]:
+    """Creates the state changes of transitions, fired from a random simple state among
+    their source and the states it contains."""
+
+    steps: list[StateChangeStep] = state_change_steps(
+        step_class, state_machine, transitions_of(state_machine)
+    )
+    containers: dict[int, State | None] = find_containers(state_machine)
+    for step in steps:
+        simple_states: list[State] = [
+            state
+            for state in states
+            if walk_nested_initial_state(state) is state
+            and any(parent is step.source for parent in walk_parents(state, containers))
+        ]
+        if len(simple_states) > 0:
+            step.runtime.current_state = random.Random(step.transition.id).choice(
+                simple_states
+            )
+
+    return steps
+
+
+def parse(source: str) -> StateMachine:
+    return parse_source(InputStream(source), ParsingStrategy.FAST)
+
+
+# Transition leaving a nested composite state for a state of the composite state containing
+# both, which is neither exited nor reached.
+NESTED_COMPOSITES_SOURCE: str = """StateMachine Nested {
+    INITIAL -> A;
+    composite state A {
+        INITIAL -> B;
+        composite state B {
+            INITIAL -> S;
+            state S { -> T : 'go'; }
+        }
+        state T { }
+    }
+}
+"""
+
+
+if __name__ == "__main__":
+    state_machines: list[StateMachine] = [
+        parse(generate_nested_state_machine(depth, seed))
+        for depth in (1, 5, 30)
+        for seed in range(3)
+    ] + [parse(generate_wide_state_machine(20, 10, seed)) for seed in range(3)]
+
+    checks: int = 0
+    for state_machine in state_machines:
+        for linked in (False, True):
+            if linked:
+                link_composite_parents(state_machine)
+
+            states: list[State] = all_states(state_machine)
+            state_ids: list[str] = [state.id for state in states] + ["/Unknown"]
+            expected: list = check_breakpoints(
+                fired_state_changes(StateChangeStep, state_machine, states), state_ids
+            )
+            assert check_breakpoints(
+                fired_state_changes(WalkingStateChangeStep, state_machine, states), state_ids
+            ) == expected, "Breakpoint checks differ."
+            checks += len(expected)
+
+    state_machine = parse(NESTED_COMPOSITES_SOURCE)
+    step: StateChangeStep = fired_state_changes(
+        StateChangeStep, state_machine, all_states(state_machine)
+    )[0]
+    assert step.transition.exited_state_ids == {"/A/B", "/A/B/S"}, "Exited states differ."
+    assert step.transition.entered_state_ids == {"/A/T"}, "Entered states differ."
+    assert check_breakpoints([step], ["/A"]) == [None, None], "Common ancestor reported."
+
+    print(f"{checks} breakpoint checks gave the same result resolved and walked.")
+    print(
+        f"{'depth':>6} {'linked':>7} {'breakpoints':>12} {'walked (us/step)':>17}"
+        f" {'resolved (us/step)':>19}"
+    )
+
+    for depth in (10, 50, 200):
+        state_machine = parse(generate_nested_state_machine(depth))
+        for linked in (False, True):
+            if linked:
+                link_composite_parents(state_machine)
+
+            state_ids = random.Random(0).sample(
+                [state.id for state in all_states(state_machine)], 30
+            )
+            times: list[float] = []
+            for step_class in (WalkingStateChangeStep, StateChangeStep):
+                state_changes: list[StateChangeStep] = state_change_steps(
+                    step_class, state_machine, transitions_of(state_machine)
+                )
+                times.append(
+                    measure(lambda: check_breakpoints(state_changes, state_ids), 3)
+                    / len(state_changes)
+                    * 1000
+                )
+
+            print(
+                f"{depth:>6} {str(linked):>7} {len(state_ids):>12}"
+                f" {times[0]:>17.1f} {times[1]:>19.1f}"
+            )
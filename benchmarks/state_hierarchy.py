@@ -0,0 +1,213 @@
+"""Checks that the ancestors, depths and nested initial states resolved when building ASTs
+give the same states as walking the state machine, then compares state changes with both
+on deeply nested composite states. Since composite states have no parent state in parsed
+ASTs, ancestors are walked through the states containing them, and the checks are also run
+with composite states linked to their parents."""
+
+import random
+
+from antlr4 import InputStream
+from common import measure
+from server.Runtime import Runtime, StateChangeStep
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import CompositeState, State, StateMachine, Transition
+from trigger_index import letters
+
+
+def walk_nested_initial_state(state: State) -> State:
+    """Returns the nested initial state of a state, as before it was resolved."""
+
+    if isinstance(state, CompositeState):
+        if state.initial_state is None:
+            raise ValueError("No initial state.")
+
+        return walk_nested_initial_state(state.initial_state.target)
+
+    return state
+
+
+def find_containers(state_machine: StateMachine) -> dict[int, State | None]:
+    """Returns the states containing each state, by id of the state, final pseudo states
+    being contained by the state containing the source of their transition."""
+
+    containers: dict[int, State | None] = {}
+    pending: list[tuple[State, State | None]] = [(state, None) for state in state_machine.states]
+    while len(pending) > 0:
+        state, container = pending.pop()
+        containers[id(state)] = container
+        for transition in state.outgoing_transitions:
+            if transition.target.is_final:
+                containers[id(transition.target)] = container
+        pending.extend((contained, state) for contained in state.states)
+
+    return containers
+
+
+def walk_ancestors(state: State, containers: dict[int, State | None]) -> list[State]:
+    """Returns the ancestors of a state, as before they were resolved."""
+
+    ancestors: list[State] = []
+    container: State | None = containers[id(state)]
+    while container is not None:
+        ancestors.append(container)
+        container = containers[id(container)]
+
+    return ancestors
+
+
+def walk_depth(state: State, containers: dict[int, State | None]) -> int:
+    """Returns the depth of a state, as before it was resolved."""
+
+    return len(walk_ancestors(state, containers))
+
+
+class WalkingStateChangeStep(StateChangeStep):
+    """State change walking the state machine, as before states were resolved."""
+
+    def execute(self) -> None:
+        self.runtime.current_state = walk_nested_initial_state(self.target)
+        self.runtime.current_event = None
+        self.runtime.current_transition = None
+        self.runtime.executed_assignments = 0
+        self.runtime.transitions_fired += 1
+
+        self._is_completed = True
+
+
+def generate_nested_state_machine(depth: int, seed: int = 0) -> str:
+    """Generates a state machine made of `depth` nested composite states, entered through
+    initial states leading to the innermost one. Each composite state contains two simple
+    states, whose transitions target random states at any level."""
+
+    rng: random.Random = random.Random(seed)
+    composites: list[str] = ["C" + letters(i) for i in range(depth)]
+    leaves: list[str] = [f"L{letters(i)}{side}" for i in range(depth) for side in "ab"]
+    targets: list[str] = composites + leaves + ["FINAL"]
+
+    def transition(indent: str) -> str:
+        return f"{indent}-> {rng.choice(targets)} : '{rng.choice(['go', 'up', 'down'])}';"
+
+    lines: list[str] = ["StateMachine Nested {", f"INITIAL -> {composites[0]};"]
+    for level, name in enumerate(composites):
+        lines.append(f"composite state {name} {{")
+        lines.append(transition(""))
+        initial: str = composites[level + 1] if level + 1 < depth else f"L{letters(level)}a"
+        lines.append(f"INITIAL -> {initial};")
+        for side in "ab":
+            lines.append(f"state L{letters(level)}{side} {{")
+            lines.extend(transition("") for _ in range(3))
+            lines.append("}")
+    lines.extend("}" for _ in composites)
+    lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def all_states(state_machine: StateMachine) -> list[State]:
+    states: list[State] = []
+    pending: list[State] = list(state_machine.states)
+    while len(pending) > 0:
+        state: State = pending.pop()
+        states.append(state)
+        pending.extend(state.states)
+
+    return states
+
+
+def link_composite_parents(state_machine: StateMachine) -> None:
+    """Links composite states to the composite states containing them, and resolves the
+    state machine again."""
+
+    for state in all_states(state_machine):
+        for contained in state.states:
+            contained.parent_state = state
+            for transition in contained.outgoing_transitions:
+                if transition.target.is_final:
+                    transition.target.parent_state = state
+
+    state_machine.complete()
+
+
+def state_change_steps(
+    step_class: type, state_machine: StateMachine, transitions: list[Transition]
+) -> list[StateChangeStep]:
+    """Creates the state changes of transitions, fired from the nested initial states of
+    their sources."""
+
+    steps: list[StateChangeStep] = []
+    for transition in transitions:
+        runtime: Runtime = Runtime(state_machine)
+        runtime.current_state = walk_nested_initial_state(transition.source)
+        runtime.current_transition = transition
+        steps.append(step_class(None, runtime))
+
+    return steps
+
+
+def reached_states(steps: list[StateChangeStep]) -> list[State]:
+    states: list[State] = []
+    for step in steps:
+        step.execute()
+        states.append(step.runtime.current_state)
+
+    return states
+
+
+def transitions_of(state_machine: StateMachine) -> list[Transition]:
+    return [t for state in all_states(state_machine) for t in state.outgoing_transitions]
+
+
+if __name__ == "__main__":
+    for depth in (1, 5, 30):
+        for seed in range(3):
+            source: str = generate_nested_state_machine(depth, seed)
+            state_machine: StateMachine = parse_source(InputStream(source), ParsingStrategy.FAST)
+
+            for linked in (False, True):
+                if linked:
+                    link_composite_parents(state_machine)
+
+                states: list[State] = all_states(state_machine)
+                transitions: list[Transition] = transitions_of(state_machine)
+                containers: dict[int, State | None] = find_containers(state_machine)
+                assert [list(state.ancestors) for state in states] == [
+                    walk_ancestors(state, containers) for state in states
+                ], "Ancestors differ."
+                assert [state.get_depth() for state in states] == [
+                    walk_depth(state, containers) for state in states
+                ], "Depths differ."
+                assert [state.get_nested_initial_state() for state in states] == [
+                    walk_nested_initial_state(state) for state in states
+                ], "Nested initial states differ."
+                assert reached_states(
+                    state_change_steps(StateChangeStep, state_machine, transitions)
+                ) == reached_states(
+                    state_change_steps(WalkingStateChangeStep, state_machine, transitions)
+                ), "Reached states differ."
+
+    print("Resolved and walked states gave the same states.")
+    print(
+        f"{'depth':>6} {'linked':>7} {'resolve (ms)':>13} {'walk changes (ms)':>18}"
+        f" {'resolved changes (ms)':>22}"
+    )
+
+    for depth in (10, 50, 200):
+        state_machine = parse_source(
+            InputStream(generate_nested_state_machine(depth)), ParsingStrategy.FAST
+        )
+        for linked in (False, True):
+            if linked:
+                link_composite_parents(state_machine)
+
+            transitions = transitions_of(state_machine)
+            times: list[float] = []
+            for step_class in (WalkingStateChangeStep, StateChangeStep):
+                steps: list[StateChangeStep] = state_change_steps(
+                    step_class, state_machine, transitions
+                )
+                times.append(measure(lambda: reached_states(steps), 3))
+
+            print(
+                f"{depth:>6} {str(linked):>7} {measure(state_machine.resolve_states, 3):>13.2f}"
+                f" {times[0]:>18.2f} {times[1]:>22.2f}"
+            )
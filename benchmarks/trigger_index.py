@@ -0,0 +1,153 @@
+"""Runs state machines whose states have hundreds of outgoing transitions, looking up
+transitions by trigger in the index built with the AST, and compares the lookup time and
+the step throughput with the former lookup, which scanned the transitions of the current
+state and its parents. Both lookups are checked to offer the same steps by
+tests/test_trigger_index.py."""
+
+import random
+
+from antlr4 import InputStream
+from common import measure
+from server.Runtime import Runtime, Step
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import State, StateMachine, Transition
+
+
+class ScanningRuntime(Runtime):
+    """Runtime looking up transitions as implemented before transitions were indexed."""
+
+    def _find_possible_events(self) -> list[str]:
+        return list({t.trigger for t in self._find_possible_transitions()})
+
+    def _find_possible_transitions(self, event: str | None = None) -> list[Transition]:
+        available_transitions: list[Transition] = []
+        state: State | None = self.current_state
+
+        while state is not None:
+            for transition in state.outgoing_transitions:
+                if event is None or event == transition.trigger:
+                    if transition.guard is None or self.guard_evaluator.evaluate(
+                        transition.guard
+                    ):
+                        available_transitions.append(transition)
+
+            state = state.parent_state
+
+        return available_transitions
+
+
+def letters(number: int) -> str:
+    """Spells a number with letters, since names and triggers cannot contain digits."""
+
+    return "".join(chr(ord("a") + int(digit)) for digit in str(number))
+
+
+def generate_wide_state_machine(states: int, transitions_per_state: int, seed: int = 0) -> str:
+    """Generates a state machine whose simple states are contained in a single composite
+    state, every state having `transitions_per_state` outgoing transitions, some of them
+    guarded. Triggers are shared by the transitions of different states, and some of them
+    by several transitions of the same state."""
+
+    rng: random.Random = random.Random(seed)
+    names: list[str] = ["S" + letters(i) for i in range(states)]
+    triggers: list[str] = ["ev" + letters(i) for i in range(transitions_per_state)]
+
+    def transition(indent: str) -> str:
+        guard: str = ""
+        if rng.random() < 0.25:
+            guard = f" [x {rng.choice(['<', '>='])} {rng.randint(0, 50)}]"
+
+        return (
+            f"{indent}-> {rng.choice(names)} : '{rng.choice(triggers)}'{guard}"
+            " / { x = x + 1; };"
+        )
+
+    lines: list[str] = [
+        "StateMachine Wide {",
+        "    INITIAL -> Start;",
+        "    state Start { -> Hub : 'start' / { x = 0; }; }",
+        "    composite state Hub {",
+    ]
+    lines.extend(transition("        ") for _ in range(transitions_per_state))
+    lines.append(f"        INITIAL -> {names[0]};")
+    for name in names:
+        lines.append(f"        state {name} {{")
+        lines.extend(transition("            ") for _ in range(transitions_per_state))
+        lines.append("        }")
+    lines.append("    }")
+    lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def run(
+    runtime_class: type, state_machine: StateMachine, steps: int, seed: int = 0
+) -> list[list[str]]:
+    """Executes steps chosen at random, and returns the names of the steps available
+    before each of them."""
+
+    rng: random.Random = random.Random(seed)
+    runtime: Runtime = runtime_class(state_machine)
+    offered_steps: list[list[str]] = []
+
+    for _ in range(steps):
+        available_steps: list[Step] = sorted(
+            runtime.available_steps.values(), key=lambda step: step.name
+        )
+        offered_steps.append([step.name for step in available_steps])
+        if len(available_steps) == 0:
+            break
+
+        step: Step = rng.choice(available_steps)
+        if step.is_composite:
+            runtime.enter_composite_step(step.id)
+        else:
+            runtime.execute_atomic_step(step.id)
+
+    return offered_steps
+
+
+def look_up(
+    runtime_class: type, state_machine: StateMachine, states: list[State]
+) -> None:
+    """Looks up, from each of the given states, the events that can be activated and the
+    transitions that each of these events can fire."""
+
+    runtime: Runtime = runtime_class(state_machine)
+    runtime.variables["x"] = 0
+
+    for state in states:
+        runtime.current_state = state
+        for event in runtime._find_possible_events():
+            runtime._find_possible_transitions(event)
+
+
+if __name__ == "__main__":
+    print(
+        f"{'transitions per state':>22} {'scan (us/state)':>16} {'index (us/state)':>17}"
+        f" {'scan (steps/s)':>15} {'index (steps/s)':>16} {'indexing (ms)':>14}"
+    )
+
+    steps: int = 2000
+    for transitions_per_state in (10, 100, 300, 1000):
+        state_machine: StateMachine = parse_source(
+            InputStream(generate_wide_state_machine(20, transitions_per_state)),
+            ParsingStrategy.FAST,
+        )
+        leaf_states: list[State] = state_machine.states[1].states
+        scanning_lookups: float = measure(
+            lambda: look_up(ScanningRuntime, state_machine, leaf_states), 3
+        )
+        indexed_lookups: float = measure(
+            lambda: look_up(Runtime, state_machine, leaf_states), 3
+        )
+        scanning: float = measure(lambda: run(ScanningRuntime, state_machine, steps), 3)
+        indexed: float = measure(lambda: run(Runtime, state_machine, steps), 3)
+        indexing: float = measure(state_machine.index_triggers, 3)
+
+        print(
+            f"{transitions_per_state:>22} {scanning_lookups / len(leaf_states) * 1000:>16.0f}"
+            f" {indexed_lookups / len(leaf_states) * 1000:>17.0f}"
+            f" {steps / scanning * 1000:>15.0f} {steps / indexed * 1000:>16.0f}"
+            f" {indexing:>14.1f}"
+        )
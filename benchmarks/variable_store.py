@@ -0,0 +1,166 @@
+"""Compares runtimes storing variables by slot with runtimes storing them by name on
+guard-heavy state machines, and reports the memory taken by the variables of thousands of
+runtimes. Runtimes storing variables by slot are checked to behave and raise the same
+errors as runtimes storing them by name by tests/test_variable_store.py."""
+
+import random
+import tracemalloc
+from typing import Callable
+
+from antlr4 import InputStream
+from common import measure
+from expression_optimizer import generate_constant_state_machine
+from server.Runtime import Runtime, Step
+from server.VariableStore import VariableStore
+from state_hierarchy import all_states
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import Assignment, StateMachine, Transition
+from trigger_index import letters
+
+
+class NameRuntime(Runtime):
+    """Runtime storing variables by name in a dictionary, and evaluating guards and
+    assignments by name, as before variables were stored by slot."""
+
+    def __init__(self, state_machine: StateMachine) -> None:
+        super().__init__(state_machine)
+        self.variables: dict[str, float] = {}
+
+    def assign(self, assignment: Assignment) -> None:
+        self.variables[assignment.variable] = assignment.compile()(self.variables)
+
+    def _is_enabled(self, transition: Transition) -> bool:
+        return transition.guard is None or transition.guard.compile()(self.variables)
+
+
+def parse(source: str) -> StateMachine:
+    return parse_source(InputStream(source), ParsingStrategy.FAST)
+
+
+def run_steps(
+    state_machine: StateMachine, transitions: int, seed: int = 0, runtime_class: type = Runtime
+) -> tuple:
+    """Fires transitions chosen at random through the steps of a runtime, and returns the
+    events and transitions offered before each of them, the variables and the current
+    state."""
+
+    rng: random.Random = random.Random(seed)
+    runtime: Runtime = runtime_class(state_machine)
+    offered: list[tuple[list, list]] = []
+
+    for _ in range(transitions):
+        events: list[Step] = list(runtime.available_steps.values())
+        if len(events) == 0:
+            break
+
+        runtime.execute_atomic_step(rng.choice(events).id)
+        transition_steps: list[Step] = list(runtime.available_steps.values())
+        offered.append(
+            (
+                [step.event for step in events],
+                [step.transition.id for step in transition_steps],
+            )
+        )
+
+        runtime.enter_composite_step(rng.choice(transition_steps).id)
+        while runtime.ongoing_composite_step is not None:
+            runtime.execute_atomic_step(next(iter(runtime.available_steps)))
+
+    return offered, runtime.variables, runtime.current_state.id
+
+
+def generate_guarded_state_machine(
+    states: int, transitions_per_state: int = 20, variables: int = 8, seed: int = 0
+) -> str:
+    """Generates a state machine whose transitions are all guarded, each guard comparing
+    a variable with an expression of other variables, so that most of the time spent
+    looking up transitions goes to evaluating guards."""
+
+    rng: random.Random = random.Random(seed)
+    names: list[str] = ["S" + letters(i) for i in range(states)]
+    variable_names: list[str] = ["v" + letters(i) for i in range(variables)]
+
+    def transition() -> str:
+        guard: str = (
+            f"{rng.choice(variable_names)} {rng.choice(['<', '>=', '!='])}"
+            f" {rng.choice(variable_names)} * {rng.randint(1, 3)} - {rng.choice(variable_names)}"
+        )
+        variable: str = rng.choice(variable_names)
+        return (
+            f"        -> {rng.choice(names)} : 'ev{letters(rng.randrange(4))}' [{guard}]"
+            f" / {{ {variable} = {variable} + {rng.choice(variable_names)} / {rng.randint(5, 9)}"
+            f" - {rng.randint(1, 3)}; }};"
+        )
+
+    initialization: str = " ".join(
+        f"{variable} = {i + 1};" for i, variable in enumerate(variable_names)
+    )
+    # The start state offers a transition whatever the values of variables.
+    lines: list[str] = [
+        "StateMachine Guarded {",
+        "    INITIAL -> Start;",
+        f"    state Start {{ -> {names[0]} : 'start' / {{ {initialization} }}; }}",
+    ]
+    for name in names:
+        lines.append(f"    state {name} {{")
+        lines.extend(transition() for _ in range(transitions_per_state))
+        lines.append(f"        -> Start : 'reset';")
+        lines.append("    }")
+    lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def variables_memory(count: int, names: tuple[str, ...], slotted: bool) -> float:
+    """Returns the memory in bytes taken by the variables of `count` runtimes, once all
+    their variables are assigned."""
+
+    slots: dict[str, int] = {name: slot for slot, name in enumerate(names)}
+    tracemalloc.start()
+    before: int = tracemalloc.get_traced_memory()[0]
+    stores: list = []
+    for index in range(count):
+        store: VariableStore | dict[str, float] = (
+            VariableStore(names, slots) if slotted else {}
+        )
+        for slot, name in enumerate(names):
+            store[name] = index * 0.5 + slot
+        stores.append(store)
+    memory: int = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return memory / count
+
+
+if __name__ == "__main__":
+    print(
+        f"{'state machine':>14} {'guards':>7} {'by name (transitions/s)':>24} {'by slot':>8}"
+    )
+
+    for name, source in (
+        ("guarded", generate_guarded_state_machine(100)),
+        ("guarded wide", generate_guarded_state_machine(20, 200)),
+        ("constants", generate_constant_state_machine(1000)),
+    ):
+        state_machine = parse(source)
+        guards: int = sum(
+            transition.guard is not None
+            for state in all_states(state_machine)
+            for transition in state.outgoing_transitions
+        )
+        rates: list[float] = []
+        for runtime_class in (NameRuntime, Runtime):
+            run: Callable[[], tuple] = lambda: run_steps(state_machine, 1000, 0, runtime_class)
+            # Functions are compiled on first use, outside of measures.
+            run()
+            rates.append(1000 / measure(run, 3) * 1000)
+
+        print(f"{name:>14} {guards:>7} {rates[0]:>24.0f} {rates[1]:>8.0f}")
+
+    print(f"{'variables':>10} {'dict (bytes/runtime)':>21} {'slots (bytes/runtime)':>22}")
+    for count in (6, 20, 100):
+        names: tuple[str, ...] = tuple("v" + letters(i) for i in range(count))
+        print(
+            f"{count:>10} {variables_memory(5000, names, False):>21.0f}"
+            f" {variables_memory(5000, names, True):>22.0f}"
+        )
@@ -0,0 +1,60 @@
+"""Compares parsing the files of a workspace one after the other with parsing them
+across a pool of processes.
+
+With source files as arguments, parses these files across a pool of processes and
+reports the result for each file instead:
+`python3 benchmarks/workspace_parsing.py <file> [<file> ...]`
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from common import ast_signature, generate_state_machine
+from server.LRP import ParseArguments, ParseWorkspaceArguments, ParseWorkspaceResponse
+from server.ServiceHandler import ServiceHandler
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        start: float = time.perf_counter()
+        response: ParseWorkspaceResponse = ServiceHandler().parse_workspace(
+            ParseWorkspaceArguments(sys.argv[1:])
+        )
+        total: float = (time.perf_counter() - start) * 1000
+
+        for result in response.results:
+            status: str = "ok" if len(result.errors) == 0 else "; ".join(result.errors)
+            print(f"{result.sourceFile}: {result.parseTime:.1f} ms, {status}")
+        print(f"Total: {total:.1f} ms")
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        source_files: list[str] = []
+        for i in range(16):
+            source_file: Path = Path(directory) / f"generated_{i}.sm"
+            source_file.write_text(generate_state_machine(100, seed=i))
+            source_files.append(str(source_file))
+
+        sequential_handler: ServiceHandler = ServiceHandler()
+        start = time.perf_counter()
+        for source_file in source_files:
+            sequential_handler.parse(ParseArguments(source_file))
+        sequential: float = (time.perf_counter() - start) * 1000
+
+        workspace_handler: ServiceHandler = ServiceHandler()
+        start = time.perf_counter()
+        response = workspace_handler.parse_workspace(ParseWorkspaceArguments(source_files))
+        workspace: float = (time.perf_counter() - start) * 1000
+
+        for source_file, result in zip(source_files, response.results):
+            assert len(result.errors) == 0, result.errors
+            assert ast_signature(
+                sequential_handler.registry.loaded_sources[source_file]
+            ) == ast_signature(
+                workspace_handler.registry.loaded_sources[source_file]
+            ), f"Parsing {source_file} in a worker process built a different AST."
+
+        print(f"{len(source_files)} files of 100 states")
+        print(f"{'sequential (ms)':>16} {'process pool (ms)':>18} {'speedup':>8}")
+        print(f"{sequential:>16.1f} {workspace:>18.1f} {sequential / workspace:>7.1f}x")
@@ -29,12 +29,17 @@ file_: assignment* EOF;
 
 assignment: variable EQ expression;
 
+// Expressions are flat lists of operands and operators, precedence being applied when
+// building ASTs: POW binds tighter than TIMES and DIV, which bind tighter than PLUS and
+// MINUS, all of them being left-associative. A left-recursive rule would be rewritten by
+// ANTLR with precedence predicates, and one rule per precedence level would add rule
+// invocations for every operand, both being slow in the Python runtime.
 expression:
-	expression POW expression
-	| expression (TIMES | DIV) expression
-	| expression (PLUS | MINUS) expression
-	| LPAREN expression RPAREN
-	| (PLUS | MINUS)? atom;
+	operands += primary_expression (
+		operators += (PLUS | MINUS | TIMES | DIV | POW) operands += primary_expression
+	)*;
+
+primary_expression: LPAREN expression RPAREN | sign = (PLUS | MINUS)? atom;
 
 atom: number | variable;
 
@@ -1,9 +1,13 @@
 import argparse
+import time
 
 import bsonrpc
 import gevent.socket as gsocket
 from bsonrpc import JSONRpc, ThreadingModel
+from server.ResponseCodec import ResponseCodec
 from server.ServerFacade import ServerFacade
+from statemachine_ast.ParserWarmUp import warm_up
+from statemachine_ast.SourceParser import ParsingStrategy
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
@@ -12,8 +16,29 @@ if __name__ == '__main__':
 
     parser.add_argument(
         'port', type=int, help='port at which the server should listen')
+    parser.add_argument(
+        '--cache-dir', help='directory in which parsed ASTs are persisted across restarts')
+    parser.add_argument(
+        '--parsing-strategy', choices=[strategy.value for strategy in ParsingStrategy],
+        default=ParsingStrategy.SLL_THEN_LL.value, help='strategy used to parse source files')
+    parser.add_argument(
+        '--keep-parse-trees', action='store_true', help='keep ANTLR parse trees in memory along with the ASTs built from them')
+    parser.add_argument(
+        '--no-incremental-parsing', action='store_true', help='always parse source files as a whole')
+    parser.add_argument(
+        '--workers', type=int, help='maximum number of processes used to parse workspaces (default: one per processor)')
+    parser.add_argument(
+        '--warm-up-corpus', help='directory of the source files parsed at startup to warm up parsers (default: bundled corpus)')
+    parser.add_argument(
+        '--no-warm-up', action='store_true', help='do not parse any source file at startup')
     args = parser.parse_args()
 
+    # Fill parser caches before the first parse request
+    if not args.no_warm_up:
+        start = time.perf_counter()
+        warmed_up_files = warm_up(ParsingStrategy(args.parsing_strategy), args.warm_up_corpus)
+        print(f"Parsers warmed up with {warmed_up_files} source files in {(time.perf_counter() - start) * 1000:.0f} ms")
+
     # Bind JSON-RPC server to the given port
     ss = gsocket.socket(gsocket.AF_INET, gsocket.SOCK_STREAM)
     ss.bind(('localhost', args.port))
@@ -21,8 +46,12 @@ if __name__ == '__main__':
 
     # Start JSON-RPC server
     print("Server running at port " + str(args.port) + "...")
-    server_facade: ServerFacade = ServerFacade()
+    server_facade: ServerFacade = ServerFacade(
+        args.cache_dir, ParsingStrategy(args.parsing_strategy),
+        not args.keep_parse_trees, not args.no_incremental_parsing, args.workers)
+    response_codec: ResponseCodec = ResponseCodec()
     while True:
         s, _ = ss.accept()
         JSONRpc(s, server_facade, framing_cls=bsonrpc.JSONFramingNone,
-                threading_model=ThreadingModel.GEVENT, concurrent_request_handling=ThreadingModel.GEVENT)
+                threading_model=ThreadingModel.GEVENT, concurrent_request_handling=ThreadingModel.GEVENT,
+                custom_codec_implementation=response_codec)
@@ -1,4 +1,4 @@
-# Generated from StateMachine.g4 by ANTLR 4.10.1
+# Generated from StateMachine.g4 by ANTLR 4.13.2
 # encoding: utf-8
 from antlr4 import *
 from io import StringIO
@@ -10,57 +10,54 @@ else:
 
 def serializedATN():
     return [
-        4,1,31,155,2,0,7,0,2,1,7,1,2,2,7,2,2,3,7,3,2,4,7,4,2,5,7,5,2,6,7,
+        4,1,31,150,2,0,7,0,2,1,7,1,2,2,7,2,2,3,7,3,2,4,7,4,2,5,7,5,2,6,7,
         6,2,7,7,7,2,8,7,8,2,9,7,9,2,10,7,10,2,11,7,11,2,12,7,12,2,13,7,13,
-        1,0,1,0,1,0,1,0,1,0,4,0,34,8,0,11,0,12,0,35,1,0,1,0,1,0,1,1,1,1,
-        1,1,1,1,5,1,45,8,1,10,1,12,1,48,9,1,1,1,1,1,4,1,52,8,1,11,1,12,1,
-        53,3,1,56,8,1,1,1,1,1,1,2,1,2,1,2,1,2,5,2,64,8,2,10,2,12,2,67,9,
-        2,1,2,1,2,1,3,1,3,3,3,73,8,3,1,4,1,4,1,4,1,4,1,4,1,5,1,5,1,5,1,5,
-        1,5,1,5,1,5,1,5,3,5,88,8,5,1,5,1,5,1,5,5,5,93,8,5,10,5,12,5,96,9,
-        5,1,5,3,5,99,8,5,1,5,1,5,1,6,1,6,1,6,1,6,1,7,1,7,1,7,1,8,5,8,111,
-        8,8,10,8,12,8,114,9,8,1,8,1,8,1,9,1,9,1,9,1,9,1,10,1,10,1,10,1,10,
-        1,10,1,10,3,10,128,8,10,1,10,3,10,131,8,10,1,10,1,10,1,10,1,10,1,
-        10,1,10,1,10,1,10,1,10,5,10,142,8,10,10,10,12,10,145,9,10,1,11,1,
-        11,3,11,149,8,11,1,12,1,12,1,13,1,13,1,13,0,1,20,14,0,2,4,6,8,10,
-        12,14,16,18,20,22,24,26,0,4,2,0,12,12,14,14,2,0,15,19,29,29,1,0,
-        25,26,1,0,27,28,156,0,28,1,0,0,0,2,40,1,0,0,0,4,59,1,0,0,0,6,72,
-        1,0,0,0,8,74,1,0,0,0,10,79,1,0,0,0,12,102,1,0,0,0,14,106,1,0,0,0,
-        16,112,1,0,0,0,18,117,1,0,0,0,20,130,1,0,0,0,22,148,1,0,0,0,24,150,
-        1,0,0,0,26,152,1,0,0,0,28,29,5,7,0,0,29,30,5,14,0,0,30,31,5,1,0,
-        0,31,33,3,8,4,0,32,34,3,6,3,0,33,32,1,0,0,0,34,35,1,0,0,0,35,33,
-        1,0,0,0,35,36,1,0,0,0,36,37,1,0,0,0,37,38,5,2,0,0,38,39,5,0,0,1,
-        39,1,1,0,0,0,40,41,5,9,0,0,41,42,5,14,0,0,42,46,5,1,0,0,43,45,3,
-        10,5,0,44,43,1,0,0,0,45,48,1,0,0,0,46,44,1,0,0,0,46,47,1,0,0,0,47,
-        55,1,0,0,0,48,46,1,0,0,0,49,51,3,8,4,0,50,52,3,6,3,0,51,50,1,0,0,
-        0,52,53,1,0,0,0,53,51,1,0,0,0,53,54,1,0,0,0,54,56,1,0,0,0,55,49,
-        1,0,0,0,55,56,1,0,0,0,56,57,1,0,0,0,57,58,5,2,0,0,58,3,1,0,0,0,59,
-        60,5,8,0,0,60,61,5,14,0,0,61,65,5,1,0,0,62,64,3,10,5,0,63,62,1,0,
-        0,0,64,67,1,0,0,0,65,63,1,0,0,0,65,66,1,0,0,0,66,68,1,0,0,0,67,65,
-        1,0,0,0,68,69,5,2,0,0,69,5,1,0,0,0,70,73,3,4,2,0,71,73,3,2,1,0,72,
-        70,1,0,0,0,72,71,1,0,0,0,73,7,1,0,0,0,74,75,5,11,0,0,75,76,5,10,
-        0,0,76,77,5,14,0,0,77,78,5,3,0,0,78,9,1,0,0,0,79,80,5,10,0,0,80,
-        81,7,0,0,0,81,82,5,4,0,0,82,87,5,13,0,0,83,84,5,5,0,0,84,85,3,12,
-        6,0,85,86,5,6,0,0,86,88,1,0,0,0,87,83,1,0,0,0,87,88,1,0,0,0,88,98,
-        1,0,0,0,89,90,5,28,0,0,90,94,5,1,0,0,91,93,3,14,7,0,92,91,1,0,0,
-        0,93,96,1,0,0,0,94,92,1,0,0,0,94,95,1,0,0,0,95,97,1,0,0,0,96,94,
-        1,0,0,0,97,99,5,2,0,0,98,89,1,0,0,0,98,99,1,0,0,0,99,100,1,0,0,0,
-        100,101,5,3,0,0,101,11,1,0,0,0,102,103,3,26,13,0,103,104,7,1,0,0,
-        104,105,3,20,10,0,105,13,1,0,0,0,106,107,3,18,9,0,107,108,5,3,0,
-        0,108,15,1,0,0,0,109,111,3,18,9,0,110,109,1,0,0,0,111,114,1,0,0,
-        0,112,110,1,0,0,0,112,113,1,0,0,0,113,115,1,0,0,0,114,112,1,0,0,
-        0,115,116,5,0,0,1,116,17,1,0,0,0,117,118,3,26,13,0,118,119,5,29,
-        0,0,119,120,3,20,10,0,120,19,1,0,0,0,121,122,6,10,-1,0,122,123,5,
-        23,0,0,123,124,3,20,10,0,124,125,5,24,0,0,125,131,1,0,0,0,126,128,
-        7,2,0,0,127,126,1,0,0,0,127,128,1,0,0,0,128,129,1,0,0,0,129,131,
-        3,22,11,0,130,121,1,0,0,0,130,127,1,0,0,0,131,143,1,0,0,0,132,133,
-        10,5,0,0,133,134,5,31,0,0,134,142,3,20,10,6,135,136,10,4,0,0,136,
-        137,7,3,0,0,137,142,3,20,10,5,138,139,10,3,0,0,139,140,7,2,0,0,140,
-        142,3,20,10,4,141,132,1,0,0,0,141,135,1,0,0,0,141,138,1,0,0,0,142,
-        145,1,0,0,0,143,141,1,0,0,0,143,144,1,0,0,0,144,21,1,0,0,0,145,143,
-        1,0,0,0,146,149,3,24,12,0,147,149,3,26,13,0,148,146,1,0,0,0,148,
-        147,1,0,0,0,149,23,1,0,0,0,150,151,5,22,0,0,151,25,1,0,0,0,152,153,
-        5,21,0,0,153,27,1,0,0,0,15,35,46,53,55,65,72,87,94,98,112,127,130,
-        141,143,148
+        2,14,7,14,1,0,1,0,1,0,1,0,1,0,4,0,36,8,0,11,0,12,0,37,1,0,1,0,1,
+        0,1,1,1,1,1,1,1,1,5,1,47,8,1,10,1,12,1,50,9,1,1,1,1,1,4,1,54,8,1,
+        11,1,12,1,55,3,1,58,8,1,1,1,1,1,1,2,1,2,1,2,1,2,5,2,66,8,2,10,2,
+        12,2,69,9,2,1,2,1,2,1,3,1,3,3,3,75,8,3,1,4,1,4,1,4,1,4,1,4,1,5,1,
+        5,1,5,1,5,1,5,1,5,1,5,1,5,3,5,90,8,5,1,5,1,5,1,5,5,5,95,8,5,10,5,
+        12,5,98,9,5,1,5,3,5,101,8,5,1,5,1,5,1,6,1,6,1,6,1,6,1,7,1,7,1,7,
+        1,8,5,8,113,8,8,10,8,12,8,116,9,8,1,8,1,8,1,9,1,9,1,9,1,9,1,10,1,
+        10,1,10,5,10,127,8,10,10,10,12,10,130,9,10,1,11,1,11,1,11,1,11,1,
+        11,3,11,137,8,11,1,11,3,11,140,8,11,1,12,1,12,3,12,144,8,12,1,13,
+        1,13,1,14,1,14,1,14,0,0,15,0,2,4,6,8,10,12,14,16,18,20,22,24,26,
+        28,0,4,2,0,12,12,14,14,2,0,15,19,29,29,2,0,25,28,31,31,1,0,25,26,
+        148,0,30,1,0,0,0,2,42,1,0,0,0,4,61,1,0,0,0,6,74,1,0,0,0,8,76,1,0,
+        0,0,10,81,1,0,0,0,12,104,1,0,0,0,14,108,1,0,0,0,16,114,1,0,0,0,18,
+        119,1,0,0,0,20,123,1,0,0,0,22,139,1,0,0,0,24,143,1,0,0,0,26,145,
+        1,0,0,0,28,147,1,0,0,0,30,31,5,7,0,0,31,32,5,14,0,0,32,33,5,1,0,
+        0,33,35,3,8,4,0,34,36,3,6,3,0,35,34,1,0,0,0,36,37,1,0,0,0,37,35,
+        1,0,0,0,37,38,1,0,0,0,38,39,1,0,0,0,39,40,5,2,0,0,40,41,5,0,0,1,
+        41,1,1,0,0,0,42,43,5,9,0,0,43,44,5,14,0,0,44,48,5,1,0,0,45,47,3,
+        10,5,0,46,45,1,0,0,0,47,50,1,0,0,0,48,46,1,0,0,0,48,49,1,0,0,0,49,
+        57,1,0,0,0,50,48,1,0,0,0,51,53,3,8,4,0,52,54,3,6,3,0,53,52,1,0,0,
+        0,54,55,1,0,0,0,55,53,1,0,0,0,55,56,1,0,0,0,56,58,1,0,0,0,57,51,
+        1,0,0,0,57,58,1,0,0,0,58,59,1,0,0,0,59,60,5,2,0,0,60,3,1,0,0,0,61,
+        62,5,8,0,0,62,63,5,14,0,0,63,67,5,1,0,0,64,66,3,10,5,0,65,64,1,0,
+        0,0,66,69,1,0,0,0,67,65,1,0,0,0,67,68,1,0,0,0,68,70,1,0,0,0,69,67,
+        1,0,0,0,70,71,5,2,0,0,71,5,1,0,0,0,72,75,3,4,2,0,73,75,3,2,1,0,74,
+        72,1,0,0,0,74,73,1,0,0,0,75,7,1,0,0,0,76,77,5,11,0,0,77,78,5,10,
+        0,0,78,79,5,14,0,0,79,80,5,3,0,0,80,9,1,0,0,0,81,82,5,10,0,0,82,
+        83,7,0,0,0,83,84,5,4,0,0,84,89,5,13,0,0,85,86,5,5,0,0,86,87,3,12,
+        6,0,87,88,5,6,0,0,88,90,1,0,0,0,89,85,1,0,0,0,89,90,1,0,0,0,90,100,
+        1,0,0,0,91,92,5,28,0,0,92,96,5,1,0,0,93,95,3,14,7,0,94,93,1,0,0,
+        0,95,98,1,0,0,0,96,94,1,0,0,0,96,97,1,0,0,0,97,99,1,0,0,0,98,96,
+        1,0,0,0,99,101,5,2,0,0,100,91,1,0,0,0,100,101,1,0,0,0,101,102,1,
+        0,0,0,102,103,5,3,0,0,103,11,1,0,0,0,104,105,3,28,14,0,105,106,7,
+        1,0,0,106,107,3,20,10,0,107,13,1,0,0,0,108,109,3,18,9,0,109,110,
+        5,3,0,0,110,15,1,0,0,0,111,113,3,18,9,0,112,111,1,0,0,0,113,116,
+        1,0,0,0,114,112,1,0,0,0,114,115,1,0,0,0,115,117,1,0,0,0,116,114,
+        1,0,0,0,117,118,5,0,0,1,118,17,1,0,0,0,119,120,3,28,14,0,120,121,
+        5,29,0,0,121,122,3,20,10,0,122,19,1,0,0,0,123,128,3,22,11,0,124,
+        125,7,2,0,0,125,127,3,22,11,0,126,124,1,0,0,0,127,130,1,0,0,0,128,
+        126,1,0,0,0,128,129,1,0,0,0,129,21,1,0,0,0,130,128,1,0,0,0,131,132,
+        5,23,0,0,132,133,3,20,10,0,133,134,5,24,0,0,134,140,1,0,0,0,135,
+        137,7,3,0,0,136,135,1,0,0,0,136,137,1,0,0,0,137,138,1,0,0,0,138,
+        140,3,24,12,0,139,131,1,0,0,0,139,136,1,0,0,0,140,23,1,0,0,0,141,
+        144,3,26,13,0,142,144,3,28,14,0,143,141,1,0,0,0,143,142,1,0,0,0,
+        144,25,1,0,0,0,145,146,5,22,0,0,146,27,1,0,0,0,147,148,5,21,0,0,
+        148,29,1,0,0,0,14,37,48,55,57,67,74,89,96,100,114,128,136,139,143
     ]
 
 class StateMachineParser ( Parser ):
@@ -99,14 +96,15 @@ class StateMachineParser ( Parser ):
     RULE_file_ = 8
     RULE_assignment = 9
     RULE_expression = 10
-    RULE_atom = 11
-    RULE_number = 12
-    RULE_variable = 13
+    RULE_primary_expression = 11
+    RULE_atom = 12
+    RULE_number = 13
+    RULE_variable = 14
 
     ruleNames =  [ "statemachine", "composite_state", "simple_state", "state_rule", 
                    "initial_state", "transition", "guard", "separated_assignment", 
-                   "file_", "assignment", "expression", "atom", "number", 
-                   "variable" ]
+                   "file_", "assignment", "expression", "primary_expression", 
+                   "atom", "number", "variable" ]
 
     EOF = Token.EOF
     T__0=1
@@ -143,7 +141,7 @@ class StateMachineParser ( Parser ):
 
     def __init__(self, input:TokenStream, output:TextIO = sys.stdout):
         super().__init__(input, output)
-        self.checkVersion("4.10.1")
+        self.checkVersion("4.13.2")
         self._interp = ParserATNSimulator(self, self.atn, self.decisionsToDFA, self.sharedContextCache)
         self._predicates = None
 
@@ -198,30 +196,30 @@ class StateMachineParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 28
+            self.state = 30
             self.match(StateMachineParser.STATEMACHINE)
-            self.state = 29
+            self.state = 31
             self.match(StateMachineParser.NAME)
-            self.state = 30
+            self.state = 32
             self.match(StateMachineParser.T__0)
-            self.state = 31
+            self.state = 33
             self.initial_state()
-            self.state = 33 
+            self.state = 35 
             self._errHandler.sync(self)
             _la = self._input.LA(1)
             while True:
-                self.state = 32
+                self.state = 34
                 localctx._state_rule = self.state_rule()
                 localctx.states.append(localctx._state_rule)
-                self.state = 35 
+                self.state = 37 
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
-                if not (_la==StateMachineParser.STATE or _la==StateMachineParser.COMPOSITE_STATE):
+                if not (_la==8 or _la==9):
                     break
 
-            self.state = 37
+            self.state = 39
             self.match(StateMachineParser.T__1)
-            self.state = 38
+            self.state = 40
             self.match(StateMachineParser.EOF)
         except RecognitionException as re:
             localctx.exception = re
@@ -286,45 +284,45 @@ class StateMachineParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 40
+            self.state = 42
             self.match(StateMachineParser.COMPOSITE_STATE)
-            self.state = 41
+            self.state = 43
             self.match(StateMachineParser.NAME)
-            self.state = 42
+            self.state = 44
             self.match(StateMachineParser.T__0)
-            self.state = 46
+            self.state = 48
             self._errHandler.sync(self)
             _la = self._input.LA(1)
-            while _la==StateMachineParser.TRANSITION_SYMBOL:
-                self.state = 43
+            while _la==10:
+                self.state = 45
                 localctx._transition = self.transition()
                 localctx.transitions.append(localctx._transition)
-                self.state = 48
+                self.state = 50
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
-            self.state = 55
+            self.state = 57
             self._errHandler.sync(self)
             _la = self._input.LA(1)
-            if _la==StateMachineParser.INITIAL:
-                self.state = 49
+            if _la==11:
+                self.state = 51
                 self.initial_state()
-                self.state = 51 
+                self.state = 53 
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
                 while True:
-                    self.state = 50
+                    self.state = 52
                     localctx._state_rule = self.state_rule()
                     localctx.states.append(localctx._state_rule)
-                    self.state = 53 
+                    self.state = 55 
                     self._errHandler.sync(self)
                     _la = self._input.LA(1)
-                    if not (_la==StateMachineParser.STATE or _la==StateMachineParser.COMPOSITE_STATE):
+                    if not (_la==8 or _la==9):
                         break
 
 
 
-            self.state = 57
+            self.state = 59
             self.match(StateMachineParser.T__1)
         except RecognitionException as re:
             localctx.exception = re
@@ -376,24 +374,24 @@ class StateMachineParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 59
+            self.state = 61
             self.match(StateMachineParser.STATE)
-            self.state = 60
+            self.state = 62
             self.match(StateMachineParser.NAME)
-            self.state = 61
+            self.state = 63
             self.match(StateMachineParser.T__0)
-            self.state = 65
+            self.state = 67
             self._errHandler.sync(self)
             _la = self._input.LA(1)
-            while _la==StateMachineParser.TRANSITION_SYMBOL:
-                self.state = 62
+            while _la==10:
+                self.state = 64
                 localctx._transition = self.transition()
                 localctx.transitions.append(localctx._transition)
-                self.state = 67
+                self.state = 69
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
-            self.state = 68
+            self.state = 70
             self.match(StateMachineParser.T__1)
         except RecognitionException as re:
             localctx.exception = re
@@ -437,15 +435,15 @@ class StateMachineParser ( Parser ):
         self.enterRule(localctx, 6, self.RULE_state_rule)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 72
+            self.state = 74
             self._errHandler.sync(self)
             token = self._input.LA(1)
-            if token in [StateMachineParser.STATE]:
-                self.state = 70
+            if token in [8]:
+                self.state = 72
                 self.simple_state()
                 pass
-            elif token in [StateMachineParser.COMPOSITE_STATE]:
-                self.state = 71
+            elif token in [9]:
+                self.state = 73
                 self.composite_state()
                 pass
             else:
@@ -495,13 +493,13 @@ class StateMachineParser ( Parser ):
         self.enterRule(localctx, 8, self.RULE_initial_state)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 74
+            self.state = 76
             self.match(StateMachineParser.INITIAL)
-            self.state = 75
+            self.state = 77
             self.match(StateMachineParser.TRANSITION_SYMBOL)
-            self.state = 76
+            self.state = 78
             localctx.target = self.match(StateMachineParser.NAME)
-            self.state = 77
+            self.state = 79
             self.match(StateMachineParser.T__2)
         except RecognitionException as re:
             localctx.exception = re
@@ -568,56 +566,56 @@ class StateMachineParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 79
+            self.state = 81
             self.match(StateMachineParser.TRANSITION_SYMBOL)
-            self.state = 80
+            self.state = 82
             localctx.target = self._input.LT(1)
             _la = self._input.LA(1)
-            if not(_la==StateMachineParser.FINAL or _la==StateMachineParser.NAME):
+            if not(_la==12 or _la==14):
                 localctx.target = self._errHandler.recoverInline(self)
             else:
                 self._errHandler.reportMatch(self)
                 self.consume()
-            self.state = 81
+            self.state = 83
             self.match(StateMachineParser.T__3)
-            self.state = 82
+            self.state = 84
             localctx.input_ = self.match(StateMachineParser.TEXT)
-            self.state = 87
+            self.state = 89
             self._errHandler.sync(self)
             _la = self._input.LA(1)
-            if _la==StateMachineParser.T__4:
-                self.state = 83
+            if _la==5:
+                self.state = 85
                 self.match(StateMachineParser.T__4)
-                self.state = 84
+                self.state = 86
                 self.guard()
-                self.state = 85
+                self.state = 87
                 self.match(StateMachineParser.T__5)
 
 
-            self.state = 98
+            self.state = 100
             self._errHandler.sync(self)
             _la = self._input.LA(1)
-            if _la==StateMachineParser.DIV:
-                self.state = 89
+            if _la==28:
+                self.state = 91
                 self.match(StateMachineParser.DIV)
-                self.state = 90
+                self.state = 92
                 self.match(StateMachineParser.T__0)
-                self.state = 94
+                self.state = 96
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
-                while _la==StateMachineParser.VARIABLE:
-                    self.state = 91
+                while _la==21:
+                    self.state = 93
                     localctx._separated_assignment = self.separated_assignment()
                     localctx.assignments.append(localctx._separated_assignment)
-                    self.state = 96
+                    self.state = 98
                     self._errHandler.sync(self)
                     _la = self._input.LA(1)
 
-                self.state = 97
+                self.state = 99
                 self.match(StateMachineParser.T__1)
 
 
-            self.state = 100
+            self.state = 102
             self.match(StateMachineParser.T__2)
         except RecognitionException as re:
             localctx.exception = re
@@ -680,17 +678,17 @@ class StateMachineParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 102
+            self.state = 104
             self.variable()
-            self.state = 103
+            self.state = 105
             _la = self._input.LA(1)
-            if not((((_la) & ~0x3f) == 0 and ((1 << _la) & ((1 << StateMachineParser.NOT_EQ) | (1 << StateMachineParser.INF) | (1 << StateMachineParser.INF_EQ) | (1 << StateMachineParser.SUP) | (1 << StateMachineParser.SUP_EQ) | (1 << StateMachineParser.EQ))) != 0)):
+            if not((((_la) & ~0x3f) == 0 and ((1 << _la) & 537886720) != 0)):
                 self._errHandler.recoverInline(self)
             else:
                 self._errHandler.reportMatch(self)
                 self.consume()
-            self.state = 104
-            self.expression(0)
+            self.state = 106
+            self.expression()
         except RecognitionException as re:
             localctx.exception = re
             self._errHandler.reportError(self, re)
@@ -729,9 +727,9 @@ class StateMachineParser ( Parser ):
         self.enterRule(localctx, 14, self.RULE_separated_assignment)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 106
+            self.state = 108
             self.assignment()
-            self.state = 107
+            self.state = 109
             self.match(StateMachineParser.T__2)
         except RecognitionException as re:
             localctx.exception = re
@@ -778,17 +776,17 @@ class StateMachineParser ( Parser ):
         self._la = 0 # Token type
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 112
+            self.state = 114
             self._errHandler.sync(self)
             _la = self._input.LA(1)
-            while _la==StateMachineParser.VARIABLE:
-                self.state = 109
+            while _la==21:
+                self.state = 111
                 self.assignment()
-                self.state = 114
+                self.state = 116
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
 
-            self.state = 115
+            self.state = 117
             self.match(StateMachineParser.EOF)
         except RecognitionException as re:
             localctx.exception = re
@@ -835,12 +833,12 @@ class StateMachineParser ( Parser ):
         self.enterRule(localctx, 18, self.RULE_assignment)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 117
+            self.state = 119
             self.variable()
-            self.state = 118
+            self.state = 120
             self.match(StateMachineParser.EQ)
-            self.state = 119
-            self.expression(0)
+            self.state = 121
+            self.expression()
         except RecognitionException as re:
             localctx.exception = re
             self._errHandler.reportError(self, re)
@@ -856,15 +854,117 @@ class StateMachineParser ( Parser ):
         def __init__(self, parser, parent:ParserRuleContext=None, invokingState:int=-1):
             super().__init__(parent, invokingState)
             self.parser = parser
+            self._primary_expression = None # Primary_expressionContext
+            self.operands = list() # of Primary_expressionContexts
+            self._PLUS = None # Token
+            self.operators = list() # of Tokens
+            self._MINUS = None # Token
+            self._TIMES = None # Token
+            self._DIV = None # Token
+            self._POW = None # Token
+            self._tset51 = None # Token
+
+        def primary_expression(self, i:int=None):
+            if i is None:
+                return self.getTypedRuleContexts(StateMachineParser.Primary_expressionContext)
+            else:
+                return self.getTypedRuleContext(StateMachineParser.Primary_expressionContext,i)
 
-        def LPAREN(self):
-            return self.getToken(StateMachineParser.LPAREN, 0)
 
-        def expression(self, i:int=None):
+        def PLUS(self, i:int=None):
             if i is None:
-                return self.getTypedRuleContexts(StateMachineParser.ExpressionContext)
+                return self.getTokens(StateMachineParser.PLUS)
+            else:
+                return self.getToken(StateMachineParser.PLUS, i)
+
+        def MINUS(self, i:int=None):
+            if i is None:
+                return self.getTokens(StateMachineParser.MINUS)
+            else:
+                return self.getToken(StateMachineParser.MINUS, i)
+
+        def TIMES(self, i:int=None):
+            if i is None:
+                return self.getTokens(StateMachineParser.TIMES)
+            else:
+                return self.getToken(StateMachineParser.TIMES, i)
+
+        def DIV(self, i:int=None):
+            if i is None:
+                return self.getTokens(StateMachineParser.DIV)
+            else:
+                return self.getToken(StateMachineParser.DIV, i)
+
+        def POW(self, i:int=None):
+            if i is None:
+                return self.getTokens(StateMachineParser.POW)
+            else:
+                return self.getToken(StateMachineParser.POW, i)
+
+        def getRuleIndex(self):
+            return StateMachineParser.RULE_expression
+
+        def accept(self, visitor:ParseTreeVisitor):
+            if hasattr( visitor, "visitExpression" ):
+                return visitor.visitExpression(self)
             else:
-                return self.getTypedRuleContext(StateMachineParser.ExpressionContext,i)
+                return visitor.visitChildren(self)
+
+
+
+
+    def expression(self):
+
+        localctx = StateMachineParser.ExpressionContext(self, self._ctx, self.state)
+        self.enterRule(localctx, 20, self.RULE_expression)
+        self._la = 0 # Token type
+        try:
+            self.enterOuterAlt(localctx, 1)
+            self.state = 123
+            localctx._primary_expression = self.primary_expression()
+            localctx.operands.append(localctx._primary_expression)
+            self.state = 128
+            self._errHandler.sync(self)
+            _la = self._input.LA(1)
+            while (((_la) & ~0x3f) == 0 and ((1 << _la) & 2650800128) != 0):
+                self.state = 124
+                localctx._tset51 = self._input.LT(1)
+                _la = self._input.LA(1)
+                if not((((_la) & ~0x3f) == 0 and ((1 << _la) & 2650800128) != 0)):
+                    localctx._tset51 = self._errHandler.recoverInline(self)
+                else:
+                    self._errHandler.reportMatch(self)
+                    self.consume()
+                localctx.operators.append(localctx._tset51)
+                self.state = 125
+                localctx._primary_expression = self.primary_expression()
+                localctx.operands.append(localctx._primary_expression)
+                self.state = 130
+                self._errHandler.sync(self)
+                _la = self._input.LA(1)
+
+        except RecognitionException as re:
+            localctx.exception = re
+            self._errHandler.reportError(self, re)
+            self._errHandler.recover(self, re)
+        finally:
+            self.exitRule()
+        return localctx
+
+
+    class Primary_expressionContext(ParserRuleContext):
+        __slots__ = 'parser'
+
+        def __init__(self, parser, parent:ParserRuleContext=None, invokingState:int=-1):
+            super().__init__(parent, invokingState)
+            self.parser = parser
+            self.sign = None # Token
+
+        def LPAREN(self):
+            return self.getToken(StateMachineParser.LPAREN, 0)
+
+        def expression(self):
+            return self.getTypedRuleContext(StateMachineParser.ExpressionContext,0)
 
 
         def RPAREN(self):
@@ -880,139 +980,64 @@ class StateMachineParser ( Parser ):
         def MINUS(self):
             return self.getToken(StateMachineParser.MINUS, 0)
 
-        def POW(self):
-            return self.getToken(StateMachineParser.POW, 0)
-
-        def TIMES(self):
-            return self.getToken(StateMachineParser.TIMES, 0)
-
-        def DIV(self):
-            return self.getToken(StateMachineParser.DIV, 0)
-
         def getRuleIndex(self):
-            return StateMachineParser.RULE_expression
+            return StateMachineParser.RULE_primary_expression
 
         def accept(self, visitor:ParseTreeVisitor):
-            if hasattr( visitor, "visitExpression" ):
-                return visitor.visitExpression(self)
+            if hasattr( visitor, "visitPrimary_expression" ):
+                return visitor.visitPrimary_expression(self)
             else:
                 return visitor.visitChildren(self)
 
 
 
-    def expression(self, _p:int=0):
-        _parentctx = self._ctx
-        _parentState = self.state
-        localctx = StateMachineParser.ExpressionContext(self, self._ctx, _parentState)
-        _prevctx = localctx
-        _startState = 20
-        self.enterRecursionRule(localctx, 20, self.RULE_expression, _p)
+
+    def primary_expression(self):
+
+        localctx = StateMachineParser.Primary_expressionContext(self, self._ctx, self.state)
+        self.enterRule(localctx, 22, self.RULE_primary_expression)
         self._la = 0 # Token type
         try:
-            self.enterOuterAlt(localctx, 1)
-            self.state = 130
+            self.state = 139
             self._errHandler.sync(self)
             token = self._input.LA(1)
-            if token in [StateMachineParser.LPAREN]:
-                self.state = 122
+            if token in [23]:
+                self.enterOuterAlt(localctx, 1)
+                self.state = 131
                 self.match(StateMachineParser.LPAREN)
-                self.state = 123
-                self.expression(0)
-                self.state = 124
+                self.state = 132
+                self.expression()
+                self.state = 133
                 self.match(StateMachineParser.RPAREN)
                 pass
-            elif token in [StateMachineParser.VARIABLE, StateMachineParser.NUMBER, StateMachineParser.PLUS, StateMachineParser.MINUS]:
-                self.state = 127
+            elif token in [21, 22, 25, 26]:
+                self.enterOuterAlt(localctx, 2)
+                self.state = 136
                 self._errHandler.sync(self)
                 _la = self._input.LA(1)
-                if _la==StateMachineParser.PLUS or _la==StateMachineParser.MINUS:
-                    self.state = 126
+                if _la==25 or _la==26:
+                    self.state = 135
+                    localctx.sign = self._input.LT(1)
                     _la = self._input.LA(1)
-                    if not(_la==StateMachineParser.PLUS or _la==StateMachineParser.MINUS):
-                        self._errHandler.recoverInline(self)
+                    if not(_la==25 or _la==26):
+                        localctx.sign = self._errHandler.recoverInline(self)
                     else:
                         self._errHandler.reportMatch(self)
                         self.consume()
 
 
-                self.state = 129
+                self.state = 138
                 self.atom()
                 pass
             else:
                 raise NoViableAltException(self)
 
-            self._ctx.stop = self._input.LT(-1)
-            self.state = 143
-            self._errHandler.sync(self)
-            _alt = self._interp.adaptivePredict(self._input,13,self._ctx)
-            while _alt!=2 and _alt!=ATN.INVALID_ALT_NUMBER:
-                if _alt==1:
-                    if self._parseListeners is not None:
-                        self.triggerExitRuleEvent()
-                    _prevctx = localctx
-                    self.state = 141
-                    self._errHandler.sync(self)
-                    la_ = self._interp.adaptivePredict(self._input,12,self._ctx)
-                    if la_ == 1:
-                        localctx = StateMachineParser.ExpressionContext(self, _parentctx, _parentState)
-                        self.pushNewRecursionContext(localctx, _startState, self.RULE_expression)
-                        self.state = 132
-                        if not self.precpred(self._ctx, 5):
-                            from antlr4.error.Errors import FailedPredicateException
-                            raise FailedPredicateException(self, "self.precpred(self._ctx, 5)")
-                        self.state = 133
-                        self.match(StateMachineParser.POW)
-                        self.state = 134
-                        self.expression(6)
-                        pass
-
-                    elif la_ == 2:
-                        localctx = StateMachineParser.ExpressionContext(self, _parentctx, _parentState)
-                        self.pushNewRecursionContext(localctx, _startState, self.RULE_expression)
-                        self.state = 135
-                        if not self.precpred(self._ctx, 4):
-                            from antlr4.error.Errors import FailedPredicateException
-                            raise FailedPredicateException(self, "self.precpred(self._ctx, 4)")
-                        self.state = 136
-                        _la = self._input.LA(1)
-                        if not(_la==StateMachineParser.TIMES or _la==StateMachineParser.DIV):
-                            self._errHandler.recoverInline(self)
-                        else:
-                            self._errHandler.reportMatch(self)
-                            self.consume()
-                        self.state = 137
-                        self.expression(5)
-                        pass
-
-                    elif la_ == 3:
-                        localctx = StateMachineParser.ExpressionContext(self, _parentctx, _parentState)
-                        self.pushNewRecursionContext(localctx, _startState, self.RULE_expression)
-                        self.state = 138
-                        if not self.precpred(self._ctx, 3):
-                            from antlr4.error.Errors import FailedPredicateException
-                            raise FailedPredicateException(self, "self.precpred(self._ctx, 3)")
-                        self.state = 139
-                        _la = self._input.LA(1)
-                        if not(_la==StateMachineParser.PLUS or _la==StateMachineParser.MINUS):
-                            self._errHandler.recoverInline(self)
-                        else:
-                            self._errHandler.reportMatch(self)
-                            self.consume()
-                        self.state = 140
-                        self.expression(4)
-                        pass
-
-             
-                self.state = 145
-                self._errHandler.sync(self)
-                _alt = self._interp.adaptivePredict(self._input,13,self._ctx)
-
         except RecognitionException as re:
             localctx.exception = re
             self._errHandler.reportError(self, re)
             self._errHandler.recover(self, re)
         finally:
-            self.unrollRecursionContexts(_parentctx)
+            self.exitRule()
         return localctx
 
 
@@ -1046,19 +1071,19 @@ class StateMachineParser ( Parser ):
     def atom(self):
 
         localctx = StateMachineParser.AtomContext(self, self._ctx, self.state)
-        self.enterRule(localctx, 22, self.RULE_atom)
+        self.enterRule(localctx, 24, self.RULE_atom)
         try:
-            self.state = 148
+            self.state = 143
             self._errHandler.sync(self)
             token = self._input.LA(1)
-            if token in [StateMachineParser.NUMBER]:
+            if token in [22]:
                 self.enterOuterAlt(localctx, 1)
-                self.state = 146
+                self.state = 141
                 self.number()
                 pass
-            elif token in [StateMachineParser.VARIABLE]:
+            elif token in [21]:
                 self.enterOuterAlt(localctx, 2)
-                self.state = 147
+                self.state = 142
                 self.variable()
                 pass
             else:
@@ -1098,10 +1123,10 @@ class StateMachineParser ( Parser ):
     def number(self):
 
         localctx = StateMachineParser.NumberContext(self, self._ctx, self.state)
-        self.enterRule(localctx, 24, self.RULE_number)
+        self.enterRule(localctx, 26, self.RULE_number)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 150
+            self.state = 145
             self.match(StateMachineParser.NUMBER)
         except RecognitionException as re:
             localctx.exception = re
@@ -1137,10 +1162,10 @@ class StateMachineParser ( Parser ):
     def variable(self):
 
         localctx = StateMachineParser.VariableContext(self, self._ctx, self.state)
-        self.enterRule(localctx, 26, self.RULE_variable)
+        self.enterRule(localctx, 28, self.RULE_variable)
         try:
             self.enterOuterAlt(localctx, 1)
-            self.state = 152
+            self.state = 147
             self.match(StateMachineParser.VARIABLE)
         except RecognitionException as re:
             localctx.exception = re
@@ -1152,29 +1177,5 @@ class StateMachineParser ( Parser ):
 
 
 
-    def sempred(self, localctx:RuleContext, ruleIndex:int, predIndex:int):
-        if self._predicates == None:
-            self._predicates = dict()
-        self._predicates[10] = self.expression_sempred
-        pred = self._predicates.get(ruleIndex, None)
-        if pred is None:
-            raise Exception("No predicate with index:" + str(ruleIndex))
-        else:
-            return pred(localctx, predIndex)
-
-    def expression_sempred(self, localctx:ExpressionContext, predIndex:int):
-            if predIndex == 0:
-                return self.precpred(self._ctx, 5)
-         
-
-            if predIndex == 1:
-                return self.precpred(self._ctx, 4)
-         
-
-            if predIndex == 2:
-                return self.precpred(self._ctx, 3)
-         
-
-
 
 
@@ -1,6 +1,6 @@
-# Generated from StateMachine.g4 by ANTLR 4.10.1
+# Generated from StateMachine.g4 by ANTLR 4.13.2
 from antlr4 import *
-if __name__ is not None and "." in __name__:
+if "." in __name__:
     from .StateMachineParser import StateMachineParser
 else:
     from StateMachineParser import StateMachineParser
@@ -64,6 +64,11 @@ class StateMachineVisitor(ParseTreeVisitor):
         return self.visitChildren(ctx)
 
 
+    # Visit a parse tree produced by StateMachineParser#primary_expression.
+    def visitPrimary_expression(self, ctx:StateMachineParser.Primary_expressionContext):
+        return self.visitChildren(ctx)
+
+
     # Visit a parse tree produced by StateMachineParser#atom.
     def visitAtom(self, ctx:StateMachineParser.AtomContext):
         return self.visitChildren(ctx)
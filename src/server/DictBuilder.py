@@ -6,12 +6,16 @@ from .LRP import (
     ExecuteAtomicStepResponse,
     GetAvailableStepsResponse,
     GetBreakpointTypesResponse,
+    GetChildrenResponse,
+    GetModelElementResponse,
     GetRuntimeStateResponse,
     GetStepLocationResponse,
     InitializeExecutionResponse,
     Location,
     ModelElement,
     ParseResponse,
+    ParseWorkspaceResponse,
+    SourceFileParseResult,
     Step,
 )
 
@@ -40,6 +44,9 @@ def from_model_element(model_element: ModelElement) -> dict:
     if model_element.label is not None:
         res["label"] = model_element.label
 
+    if model_element.childCounts is not None:
+        res["childCounts"] = model_element.childCounts
+
     return res
 
 
@@ -91,6 +98,29 @@ def from_parse_response(response: ParseResponse) -> dict:
     return {"astRoot": from_model_element(response.astRoot)}
 
 
+def from_get_model_element_response(response: GetModelElementResponse) -> dict:
+    return {"element": from_model_element(response.element)}
+
+
+def from_get_children_response(response: GetChildrenResponse) -> dict:
+    return {
+        "children": [from_model_element(child) for child in response.children],
+        "total": response.total,
+    }
+
+
+def from_parse_workspace_response(response: ParseWorkspaceResponse) -> dict:
+    return {
+        "results": [
+            from_source_file_parse_result(result) for result in response.results
+        ]
+    }
+
+
+def from_source_file_parse_result(result: SourceFileParseResult) -> dict:
+    return result.__dict__
+
+
 def from_initialize_execution_response(response: InitializeExecutionResponse) -> dict:
     return {}
 
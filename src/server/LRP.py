@@ -26,9 +26,12 @@ class ParseArguments(Arguments):
 
     Attributes:
         sourceFile (str): source file targeted by the request.
+        sourceText (str | None): text of the source file, e.g. an unsaved buffer, parsed instead of the content of the file. If None, the file is read.
+        depth (int | None): depth of the elements of the AST included in the response, 0 including only its root. If None, the whole AST is included.
     """
 
-    pass
+    sourceText: str | None = None
+    depth: int | None = None
 
 
 @dataclass
@@ -42,6 +45,103 @@ class ParseResponse(Response):
     astRoot: ModelElement
 
 
+@dataclass
+class GetModelElementArguments(Arguments):
+    """Arguments for the 'getModelElement' request.
+
+    Attributes:
+        sourceFile (str): source file targeted by the request.
+        elementId (str): identifier of the element of the AST to get.
+        depth (int | None): depth of the descendants of the element included in the response, 0 including none. If None, the whole subtree is included.
+    """
+
+    elementId: str
+    depth: int | None = None
+
+
+@dataclass
+class GetModelElementResponse(Response):
+    """Response to the 'getModelElement' request.
+
+    Attributes:
+        element (ModelElement): requested element.
+    """
+
+    element: ModelElement
+
+
+@dataclass
+class GetChildrenArguments(Arguments):
+    """Arguments for the 'getChildren' request.
+
+    Attributes:
+        sourceFile (str): source file targeted by the request.
+        elementId (str): identifier of the element of the AST whose children to get.
+        relation (str): containment relation of the children to get.
+        offset (int): index of the first child to get, at most the number of children.
+        limit (int | None): maximum number of children to get, not negative. If None, all children from offset are returned.
+        depth (int | None): depth of the descendants of the children included in the response, 0 including none. If None, whole subtrees are included.
+    """
+
+    elementId: str
+    relation: str
+    offset: int = 0
+    limit: int | None = None
+    depth: int | None = 0
+
+
+@dataclass
+class GetChildrenResponse(Response):
+    """Response to the 'getChildren' request.
+
+    Attributes:
+        children (list[ModelElement]): requested page of children.
+        total (int): total number of children in the relation.
+    """
+
+    children: list[ModelElement]
+    total: int
+
+
+@dataclass
+class ParseWorkspaceArguments:
+    """Arguments for the 'parseWorkspace' request.
+
+    Attributes:
+        sourceFiles (list[str]): source files to parse.
+    """
+
+    sourceFiles: list[str]
+
+
+@dataclass
+class ParseWorkspaceResponse(Response):
+    """Response to the 'parseWorkspace' request.
+
+    Attributes:
+        results (list[SourceFileParseResult]): result of the parsing of each source file.
+    """
+
+    results: list[SourceFileParseResult]
+
+
+@dataclass
+class SourceFileParseResult:
+    """Result of the parsing of a source file during a 'parseWorkspace' request.
+
+    Attributes:
+        sourceFile (str): parsed source file.
+        parseTime (float): time spent parsing the source file, in milliseconds.
+        cached (bool): true if the AST of the source file was already cached, false otherwise.
+        errors (list[str]): errors raised while parsing the source file. If non-empty, the AST may not have been built.
+    """
+
+    sourceFile: str
+    parseTime: float
+    cached: bool
+    errors: list[str] = field(default_factory=list)
+
+
 @dataclass
 class InitializeExecutionArguments(Arguments):
     """Arguments for the 'initializeExecution' LRP request.
@@ -156,6 +256,7 @@ class ModelElement:
         children (dict[str, ModelElement] | list[ModelElement]): containment relations with other elements.
         refs (dict[str, str | list[str]]): references to other elements.
         location (Location | None): location of the element in its original source file.
+        childCounts (dict[str, int] | None): number of children in each containment relation, only set if children are omitted from the element.
     """
 
     id: str
@@ -165,6 +266,7 @@ class ModelElement:
     refs: dict[str, str | list[str]]
     location: Location | None = None
     label: str | None = None
+    childCounts: dict[str, int] | None = None
 
 
 @dataclass
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from server.LRP import ModelElement
+
+
+class ModelElementIndex:
+    """Index of the elements of a tree of model elements by id, so that subtrees can be
+    served on demand instead of sending the whole tree at once.
+
+    Attributes:
+        elements (dict[str, ModelElement]): map of ids to their related element.
+    """
+
+    def __init__(self, root: ModelElement) -> None:
+        self.elements: dict[str, ModelElement] = {}
+
+        pending: list[ModelElement] = [root]
+        while len(pending) > 0:
+            element: ModelElement = pending.pop()
+            self.elements[element.id] = element
+
+            for children in element.children.values():
+                if isinstance(children, list):
+                    pending.extend(children)
+                else:
+                    pending.append(children)
+
+    def get(self, element_id: str) -> ModelElement | None:
+        return self.elements.get(element_id)
+
+
+def get_children(element: ModelElement, relation: str) -> list[ModelElement]:
+    """Returns the children of an element for a given containment relation.
+
+    Args:
+        element (ModelElement): element whose children to return.
+        relation (str): name of the containment relation.
+
+    Raises:
+        ValueError: raised if the element has no such containment relation.
+
+    Returns:
+        list[ModelElement]: children of the element, or its only child for single-valued relations.
+    """
+
+    if relation not in element.children:
+        raise ValueError(f"Element {element.id} has no {relation} relation.")
+
+    children: ModelElement | list[ModelElement] = element.children[relation]
+    return children if isinstance(children, list) else [children]
+
+
+def truncate(element: ModelElement, depth: int | None) -> ModelElement:
+    """Returns a copy of an element whose descendants deeper than a given depth are
+    omitted. Elements whose children are omitted report their number of children instead.
+
+    Args:
+        element (ModelElement): element to truncate.
+        depth (int | None): depth of the kept descendants, 0 keeping no children. If None, the element is returned as is.
+
+    Returns:
+        ModelElement: truncated element.
+    """
+
+    if depth is None:
+        return element
+
+    if depth == 0:
+        return ModelElement(
+            element.id,
+            element.types,
+            element.attributes,
+            {},
+            element.refs,
+            element.location,
+            element.label,
+            {
+                relation: len(children) if isinstance(children, list) else 1
+                for relation, children in element.children.items()
+            },
+        )
+
+    return ModelElement(
+        element.id,
+        element.types,
+        element.attributes,
+        {
+            relation: [truncate(child, depth - 1) for child in children]
+            if isinstance(children, list)
+            else truncate(children, depth - 1)
+            for relation, children in element.children.items()
+        },
+        element.refs,
+        element.location,
+        element.label,
+    )
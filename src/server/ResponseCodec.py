@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+@dataclass
+class EncodedResult:
+    """Result of a request already encoded in JSON, sent as is by ResponseCodec.
+
+    Attributes:
+        text (str): JSON encoding of the result.
+        encoding_time (float): time spent building and encoding the result, in seconds.
+    """
+
+    text: str
+    encoding_time: float
+
+
+@dataclass
+class EncodedResultMetrics:
+    """Metrics of the reuse of encoded results.
+
+    Attributes:
+        hits (int): number of requests answered with an already encoded result.
+        misses (int): number of requests whose result had to be encoded.
+        bytes_saved (int): number of bytes of JSON that did not have to be encoded again.
+        encoding_time_saved (float): time that encoding the reused results again would have taken, in seconds.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    bytes_saved: int = 0
+    encoding_time_saved: float = 0.0
+
+    def record_hit(self, result: EncodedResult) -> None:
+        self.hits += 1
+        self.bytes_saved += len(result.text)
+        self.encoding_time_saved += result.encoding_time
+
+
+def encode_result(build_result: Callable[[], Any]) -> EncodedResult:
+    """Builds the result of a request and encodes it in JSON, the way ResponseCodec
+    encodes other messages.
+
+    Args:
+        build_result (Callable[[], Any]): function building the result to encode.
+
+    Returns:
+        EncodedResult: the encoded result.
+    """
+
+    start: float = time.perf_counter()
+    text: str = json.dumps(build_result(), separators=(",", ":"), sort_keys=True)
+
+    return EncodedResult(text, time.perf_counter() - start)
+
+
+class ResponseCodec:
+    """JSON codec for the JSON-RPC server, which sends encoded results as is
+    instead of encoding them again."""
+
+    def loads(self, s: str, **kwargs: Any) -> Any:
+        return json.loads(s, **kwargs)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if isinstance(obj, list):
+            item_separator: str = kwargs.get("separators", (", ", ": "))[0]
+            return f"[{item_separator.join(self.dumps(item, **kwargs) for item in obj)}]"
+
+        if not isinstance(obj, dict) or not isinstance(obj.get("result"), EncodedResult):
+            return json.dumps(obj, **kwargs)
+
+        # The encoded result is spliced after the other members of the message.
+        separators: tuple[str, str] = kwargs.get("separators", (", ", ": "))
+        members: str = json.dumps(
+            {key: value for key, value in obj.items() if key != "result"}, **kwargs
+        )
+
+        return (
+            f"{members[:-1]}{separators[0] if len(members) > 2 else ''}"
+            f'"result"{separators[1]}{obj["result"].text}}}'
+        )
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 
 import server.LRP as lrpModule
 import statemachine_ast.StateMachine as stateMachineModule
 from server.ExposedTypes import breakpoints
 from server.ServerExceptions import UnknownBreakpointTypeError
-from server.Utils import generate_uuid
+from server.VariableStore import VariableStore
+
+# Ids of the model elements representing runtime states, which cannot be the id of an
+# element of the AST since state names start with an uppercase letter.
+RUNTIME_STATE_ID: str = "/runtimeState"
+VARIABLES_REGISTRY_ID: str = "/runtimeState/variables"
 
 
 class Runtime:
@@ -29,11 +34,14 @@ class Runtime:
         self.current_state: stateMachineModule.State = (
             state_machine.initial_state.get_nested_initial_state()
         )
-        self.variables: dict[str, float] = {}
+        self.variables: VariableStore = VariableStore(
+            state_machine.variables, state_machine.variable_slots
+        )
         self.expression_evaluator: ExpressionEvaluator = ExpressionEvaluator(self.variables)
         self.guard_evaluator: GuardEvaluator = GuardEvaluator(self.expression_evaluator, self.variables)
 
         self.transitions_fired: int = 0
+        self.created_steps: int = 0
 
         self.ongoing_composite_step: Step | None = None
         self.available_steps: dict[str, Step] | None = self._compute_available_steps()
@@ -74,7 +82,27 @@ class Runtime:
         return lrpModule.CheckBreakpointResponse(is_activated, message)
 
     def evaluate(self, expression: stateMachineModule.Expression) -> float:
-        return self.expression_evaluator.evaluate(expression)
+        return expression.compile()(self.variables)
+
+    def assign(self, assignment: stateMachineModule.Assignment) -> None:
+        """Executes an assignment, evaluating its optimized expression from the values of
+        variables by slot.
+
+        Args:
+            assignment (Assignment): assignment to execute.
+        """
+
+        self.variables.assign(assignment.slot, assignment.compile_slotted()(self.variables))
+
+    def new_step_id(self) -> str:
+        """Returns the id of a new step, unique for the runtime.
+
+        Returns:
+            str: the number of steps created before the new step.
+        """
+
+        self.created_steps += 1
+        return str(self.created_steps - 1)
     
     def _compute_available_steps(self) -> dict[str, Step]:
         if self.current_state.is_final:
@@ -101,31 +129,31 @@ class Runtime:
         return steps
 
     def _find_possible_events(self) -> list[str]:
-        available_transitions: list[stateMachineModule.Transition] = (
-            self._find_possible_transitions()
+        transitions_by_trigger: dict[str, list[stateMachineModule.Transition]] = (
+            self.current_state.transitions_by_trigger
         )
-        events: set[str] = set()
+        events: list[str] = []
 
-        for t in available_transitions:
-            events.add(t.trigger)
+        for trigger in self.current_state.available_triggers:
+            for transition in transitions_by_trigger[trigger]:
+                if self._is_enabled(transition):
+                    events.append(trigger)
+                    break
 
-        return list(events)
+        return events
 
     def _find_possible_transitions(
-        self, event: str | None = None
+        self, event: str
     ) -> list[stateMachineModule.Transition]:
-        available_transitions: list[stateMachineModule.Transition] = []
-        state: stateMachineModule.State | None = self.current_state
+        return [
+            transition
+            for transition in self.current_state.transitions_by_trigger.get(event, ())
+            if self._is_enabled(transition)
+        ]
 
-        while state is not None:
-            for transition in state.outgoing_transitions:
-                if event is None or event == transition.trigger:
-                    if transition.guard is None or self.guard_evaluator.evaluate(transition.guard):
-                        available_transitions.append(transition)
-
-            state = state.parent_state
-
-        return available_transitions
+    def _is_enabled(self, transition: stateMachineModule.Transition) -> bool:
+        guard: stateMachineModule.Guard | None = transition.guard
+        return guard is None or guard.compile_slotted()(self.variables)
 
 @dataclass
 class GuardEvaluator:
@@ -155,54 +183,82 @@ class ExpressionEvaluator:
     variables: dict[str, float]
 
     def evaluate(self, expression: stateMachineModule.Expression) -> float:
-        return expression.accept(self)
+        # Expressions are evaluated in postfix order with explicit stacks, so that long
+        # chains of operations never exceed the recursion limit. Operands and signs are
+        # pushed as markers to apply once the expressions they apply to are evaluated.
+        values: list[float] = []
+        pending: list[
+            stateMachineModule.Expression
+            | stateMachineModule.Operand
+            | stateMachineModule.Sign
+        ] = [expression]
+        minus: stateMachineModule.Sign = stateMachineModule.Sign.MINUS
+
+        while len(pending) > 0:
+            current = pending.pop()
+            current_type: type = type(current)
+
+            if current_type is stateMachineModule.NumberAtomicExpression:
+                values.append(-current.number if current.sign is minus else current.number)
+            elif current_type is stateMachineModule.VariableAtomicExpression:
+                value: float = self.variables[current.variable]
+                values.append(-value if current.sign is minus else value)
+            elif current_type is stateMachineModule.BinaryExpression:
+                pending.append(current.operand)
+                pending.append(current.right)
+                pending.append(current.left)
+            elif current_type is stateMachineModule.Operand:
+                evaluated_right: float = values.pop()
+                values.append(
+                    self._apply_operand(current, values.pop(), evaluated_right)
+                )
+            elif current_type is stateMachineModule.ParenthesizedExpression:
+                if current.sign is minus:
+                    pending.append(minus)
+                pending.append(current.contained_expression)
+            else:
+                # Minus sign of a parenthesized expression.
+                values.append(-values.pop())
+
+        return values.pop()
 
     def evaluate_binary_expression(
         self, expression: stateMachineModule.BinaryExpression
     ) -> float:
-        evaluated_left: float = expression.left.accept(self)
-        evaluated_right: float = expression.right.accept(self)
-        match expression.operand:
-            case stateMachineModule.Operand.POW:
-                return evaluated_left ^ evaluated_right
-            case stateMachineModule.Operand.TIMES:
-                return evaluated_left * evaluated_right
-            case stateMachineModule.Operand.DIV:
-                return evaluated_left / evaluated_right
-            case stateMachineModule.Operand.PLUS:
-                return evaluated_left + evaluated_right
-            case stateMachineModule.Operand.MINUS:
-                return evaluated_left - evaluated_right
+        return self.evaluate(expression)
 
     def evaluate_parenthesized_expression(
         self, expression: stateMachineModule.ParenthesizedExpression
     ) -> float:
-        unsigned_result: int = expression.contained_expression.accept(self)
-        return (
-            -unsigned_result
-            if expression.sign is stateMachineModule.Sign.MINUS
-            else unsigned_result
-        )
+        return self.evaluate(expression)
 
     def evaluate_variable_atomic_expression(
         self, expression: stateMachineModule.VariableAtomicExpression
     ) -> float:
-        unsigned_result: int = self.variables[expression.variable]
-        return (
-            -unsigned_result
-            if expression.sign is stateMachineModule.Sign.MINUS
-            else unsigned_result
-        )
+        return self.evaluate(expression)
 
     def evaluate_number_atomic_expression(
         self, expression: stateMachineModule.NumberAtomicExpression
     ) -> float:
-        unsigned_result: int = expression.number
-        return (
-            -unsigned_result
-            if expression.sign is stateMachineModule.Sign.MINUS
-            else unsigned_result
-        )
+        return self.evaluate(expression)
+
+    def _apply_operand(
+        self,
+        operand: stateMachineModule.Operand,
+        evaluated_left: float,
+        evaluated_right: float,
+    ) -> float:
+        match operand:
+            case stateMachineModule.Operand.POW:
+                return evaluated_left ^ evaluated_right
+            case stateMachineModule.Operand.TIMES:
+                return evaluated_left * evaluated_right
+            case stateMachineModule.Operand.DIV:
+                return evaluated_left / evaluated_right
+            case stateMachineModule.Operand.PLUS:
+                return evaluated_left + evaluated_right
+            case stateMachineModule.Operand.MINUS:
+                return evaluated_left - evaluated_right
 
 
 @dataclass
@@ -210,7 +266,7 @@ class Step:
     name: str
     is_composite: bool
     runtime: Runtime
-    id: str = field(default_factory=generate_uuid)
+    id: str = ""
     description: str | None = None
     parent_step: Step | None = None
     location: lrpModule.Location | None = None
@@ -269,7 +325,7 @@ class AtomicStep(Step):
             name,
             False,
             runtime,
-            generate_uuid() if id is None else id,
+            runtime.new_step_id() if id is None else id,
             description,
             parent_step,
             location,
@@ -297,7 +353,7 @@ class CompositeStep(Step):
             name,
             True,
             runtime,
-            generate_uuid() if id is None else id,
+            runtime.new_step_id() if id is None else id,
             description,
             parent_step,
             location,
@@ -312,15 +368,7 @@ class TransitionStep(CompositeStep):
         self, transition: stateMachineModule.Transition, runtime: Runtime
     ) -> None:
         target: str = "FINAL" if transition.target.is_final else transition.target.name
-        step_location: lrpModule.Location = lrpModule.Location(
-            transition.location.line,
-            transition.parser_ctx.stop.line,
-            transition.location.column,
-            transition.parser_ctx.stop.column
-            + len(transition.parser_ctx.stop.text)
-            + 1,
-        )
-
+        step_location: lrpModule.Location | None = transition.full_location
         super().__init__(
             f"{transition.source.name} --'{transition.trigger}'--> {target}",
             runtime,
@@ -384,15 +432,7 @@ class ActivateTransitionStep(AtomicStep):
         runtime: Runtime,
     ) -> None:
         target: str = "FINAL" if transition.target.is_final else transition.target.name
-        step_location: lrpModule.Location = lrpModule.Location(
-            transition.location.line,
-            transition.parser_ctx.stop.line,
-            transition.location.column,
-            transition.parser_ctx.stop.column
-            + len(transition.parser_ctx.stop.text)
-            + 1,
-        )
-
+        step_location: lrpModule.Location | None = transition.full_location
         super().__init__(
             f"{transition.source.name} --'{transition.trigger}'--> {target}",
             runtime,
@@ -434,9 +474,7 @@ class ExecuteAssignmentStep(AtomicStep):
         self.assignment = assignment
 
     def execute(self) -> None:
-        self.runtime.variables[self.assignment.variable] = self.runtime.evaluate(
-            self.assignment.expression
-        )
+        self.runtime.assign(self.assignment)
         self.runtime.executed_assignments += 1
         self._is_completed = True
 
@@ -451,8 +489,9 @@ class ExecuteAssignmentStep(AtomicStep):
 
 class StateChangeStep(AtomicStep):
     def __init__(self, parent_step: TransitionStep, runtime: Runtime) -> None:
-        self.source: stateMachineModule.State = runtime.current_transition.source
-        self.target: stateMachineModule.State = runtime.current_transition.target
+        self.transition: stateMachineModule.Transition = runtime.current_transition
+        self.source: stateMachineModule.State = self.transition.source
+        self.target: stateMachineModule.State = self.transition.target
         super().__init__(
             f"New state: {self.target.name}", runtime, parent_step=parent_step
         )
@@ -469,7 +508,7 @@ class StateChangeStep(AtomicStep):
     def check_breakpoint(self, type: str, entries: dict) -> str | None:
         if type == "stateReached":
             state: stateMachineModule.State | None = self._find_reached_state(
-                self.target, entries["s"]
+                entries["s"]
             )
             return (
                 f"State {state.name} is about to be reached."
@@ -479,7 +518,7 @@ class StateChangeStep(AtomicStep):
 
         if type == "stateExited":
             state: stateMachineModule.State | None = self._find_exited_state(
-                self.runtime.current_state, self.source, entries["s"]
+                entries["s"]
             )
             return (
                 f"State {state.name} is about to be exited."
@@ -488,41 +527,41 @@ class StateChangeStep(AtomicStep):
             )
 
     def _find_reached_state(
-        self, parent_state: stateMachineModule.State, state_id_to_match: str
+        self, state_id_to_match: str
     ) -> stateMachineModule.State | None:
-        if parent_state.id == state_id_to_match:
-            return parent_state
+        # States are only looked up when a breakpoint is hit, to report their name.
+        if state_id_to_match not in self.transition.entered_state_ids:
+            return None
 
-        current_state: stateMachineModule.State | None = (
-            parent_state.get_nested_initial_state()
+        return next(
+            state
+            for state in self.transition.get_entered_states()
+            if state.id == state_id_to_match
         )
 
-        while current_state is not parent_state and current_state is not None:
-            if current_state.id == state_id_to_match:
-                return current_state
-
-            current_state = current_state.parent_state
-
-        return None
-
     def _find_exited_state(
-        self,
-        current_state: stateMachineModule.State,
-        transition_source: stateMachineModule.State,
-        state_id_to_match: str,
+        self, state_id_to_match: str
     ) -> stateMachineModule.State | None:
-        if current_state.id == state_id_to_match:
-            return current_state
+        if state_id_to_match in self.transition.exited_state_ids:
+            return next(
+                state
+                for state in self.transition.get_exited_states()
+                if state.id == state_id_to_match
+            )
 
-        if (
-            current_state.id == transition_source.id
-            or current_state.parent_state is None
-        ):
+        # The states contained by the source, from the current state, are exited as well
+        # when the transition is fired from one of them. The source is found among the
+        # ancestors of the current state from the depths.
+        current_state: stateMachineModule.State = self.runtime.current_state
+        source_index: int = current_state.depth - self.source.depth
+        if source_index <= 0 or current_state.ancestors[source_index - 1] is not self.source:
             return None
 
-        return self._find_exited_state(
-            current_state.parent_state, transition_source, state_id_to_match
-        )
+        for state in (current_state, *current_state.ancestors[: source_index - 1]):
+            if state.id == state_id_to_match:
+                return state
+
+        return None
 
 
 class RuntimeState:
@@ -535,7 +574,8 @@ class RuntimeState:
 
     def __init__(self, runtime: Runtime) -> None:
         self.current_state = runtime.current_state
-        self.variables = runtime.variables
+        # Variables are presented by name to clients.
+        self.variables: dict[str, float] = dict(runtime.variables)
         self.current_event: str | None = runtime.current_event
         self.current_transition: stateMachineModule.Transition | None = runtime.current_transition
         self.transitions_fired: int = runtime.transitions_fired
@@ -551,7 +591,7 @@ class RuntimeState:
                 attributes["currentEvent"] = self.current_event
 
             return lrpModule.ModelElement(
-                generate_uuid(),
+                RUNTIME_STATE_ID,
                 ["RuntimeState"],
                 attributes,
                 {"variables": VariablesRegistry(self.variables).to_model_element()},
@@ -563,7 +603,7 @@ class RuntimeState:
             attributes["currentEvent"] = self.current_event
 
         return lrpModule.ModelElement(
-            generate_uuid(),
+            RUNTIME_STATE_ID,
             ["RuntimeState"],
             attributes,
             {"variables": VariablesRegistry(self.variables).to_model_element()},
@@ -577,5 +617,5 @@ class VariablesRegistry:
 
     def to_model_element(self) -> dict:
         return lrpModule.ModelElement(
-            generate_uuid(), ["VariablesRegistry"], self.variables, {}, {}
+            VARIABLES_REGISTRY_ID, ["VariablesRegistry"], self.variables, {}, {}
         )
@@ -1,5 +1,7 @@
 from bsonrpc import request, service_class
+from server.ResponseCodec import EncodedResult
 from server.ServiceHandler import ServiceHandler
+from statemachine_ast.SourceParser import ParsingStrategy
 
 from .DictBuilder import (
     from_check_breakpoint_response,
@@ -7,20 +9,25 @@ from .DictBuilder import (
     from_execute_atomic_step_response,
     from_get_available_steps_response,
     from_get_breakpoint_types_response,
+    from_get_children_response,
+    from_get_model_element_response,
     from_get_runtime_state_response,
     from_get_step_location_response,
     from_initialize_execution_response,
-    from_parse_response,
+    from_parse_workspace_response,
 )
 from .LRP import (
     CheckBreakpointArguments,
     EnterCompositeStepArguments,
     ExecuteAtomicStepArguments,
     GetAvailableStepsArguments,
+    GetChildrenArguments,
+    GetModelElementArguments,
     GetRuntimeStateArguments,
     GetStepLocationArguments,
     InitializeExecutionArguments,
     ParseArguments,
+    ParseWorkspaceArguments,
 )
 
 
@@ -33,13 +40,55 @@ class ServerFacade:
         service_handler (ServiceHandler): object handling LRP services.
     """
 
-    def __init__(self) -> None:
-        self.service_handler: ServiceHandler = ServiceHandler()
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        parsing_strategy: ParsingStrategy = ParsingStrategy.SLL_THEN_LL,
+        compact_ast: bool = True,
+        incremental_parsing: bool = True,
+        workers: int | None = None,
+    ) -> None:
+        self.service_handler: ServiceHandler = ServiceHandler(
+            cache_dir, parsing_strategy, compact_ast, incremental_parsing, workers
+        )
+
+    @request
+    def parse(self, args: dict) -> EncodedResult:
+        return self.service_handler.parse_encoded(
+            ParseArguments(args["sourceFile"], args.get("sourceText"), args.get("depth"))
+        )
+
+    @request
+    def getModelElement(self, args: dict) -> dict:
+        return from_get_model_element_response(
+            self.service_handler.get_model_element(
+                GetModelElementArguments(
+                    args["sourceFile"], args["elementId"], args.get("depth")
+                )
+            )
+        )
+
+    @request
+    def getChildren(self, args: dict) -> dict:
+        return from_get_children_response(
+            self.service_handler.get_children(
+                GetChildrenArguments(
+                    args["sourceFile"],
+                    args["elementId"],
+                    args["relation"],
+                    args.get("offset", 0),
+                    args.get("limit"),
+                    args.get("depth", 0),
+                )
+            )
+        )
 
     @request
-    def parse(self, args: dict) -> dict:
-        return from_parse_response(
-            self.service_handler.parse(ParseArguments(args["sourceFile"]))
+    def parseWorkspace(self, args: dict) -> dict:
+        return from_parse_workspace_response(
+            self.service_handler.parse_workspace(
+                ParseWorkspaceArguments(args["sourceFiles"])
+            )
         )
 
     @request
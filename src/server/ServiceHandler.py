@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from parser.StateMachineLexer import StateMachineLexer
-from parser.StateMachineParser import StateMachineParser
+import mmap
+import os
 
 import statemachine_ast.ASTRegistry as astRegistryModule
-from antlr4 import CommonTokenStream, FileStream
+from antlr4 import InputStream
 from server.ExposedTypes import breakpoints
 from server.LRP import (
     CheckBreakpointArguments,
@@ -16,6 +16,10 @@ from server.LRP import (
     GetAvailableStepsArguments,
     GetAvailableStepsResponse,
     GetBreakpointTypesResponse,
+    GetChildrenArguments,
+    GetChildrenResponse,
+    GetModelElementArguments,
+    GetModelElementResponse,
     GetRuntimeStateArguments,
     GetRuntimeStateResponse,
     GetStepLocationArguments,
@@ -24,10 +28,22 @@ from server.LRP import (
     InitializeExecutionResponse,
     ParseArguments,
     ParseResponse,
+    ParseWorkspaceArguments,
+    ParseWorkspaceResponse,
+    ModelElement,
+    SourceFileParseResult,
 )
+from server.DictBuilder import from_parse_response
+from server.ModelElementIndex import get_children, truncate
+from server.ResponseCodec import EncodedResult, EncodedResultMetrics, encode_result
 from server.Runtime import Runtime, RuntimeState
-from statemachine_ast.BuildASTVisitor import BuildASTVisitor
+from statemachine_ast.IncrementalParser import reparse_incrementally
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
 from statemachine_ast.StateMachine import StateMachine
+from statemachine_ast.WorkspaceParser import ParsedSource, parse_sources
+
+# Source files at least this large are memory-mapped instead of being read in a buffer.
+MMAP_THRESHOLD: int = 1 << 20
 
 
 class ServiceHandler:
@@ -36,14 +52,37 @@ class ServiceHandler:
     Attributes:
         runtimes (dict[str, Runtime]): map of source files to their runtime.
         registry (ASTRegistry): registry of all already parsed ASTs.
+        parsing_strategy (ParsingStrategy): strategy used to parse source files.
+        compact_ast (bool): if True, parse trees are released once ASTs are built.
+        incremental_parsing (bool): if True, only the states affected by the edits made to a source file since its last parse are parsed again.
+        workers (int | None): maximum number of processes used to parse workspaces. If None, one process per processor is used.
+        encoded_response_metrics (EncodedResultMetrics): metrics of the reuse of encoded responses to the 'parse' request.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        parsing_strategy: ParsingStrategy = ParsingStrategy.SLL_THEN_LL,
+        compact_ast: bool = True,
+        incremental_parsing: bool = True,
+        workers: int | None = None,
+    ) -> None:
         self.runtimes: dict[str, Runtime] = {}
-        self.registry: astRegistryModule.ASTRegistry = astRegistryModule.ASTRegistry()
+        self.registry: astRegistryModule.ASTRegistry = astRegistryModule.ASTRegistry(
+            cache_dir=cache_dir
+        )
+        self.parsing_strategy: ParsingStrategy = parsing_strategy
+        self.compact_ast = compact_ast
+        self.incremental_parsing = incremental_parsing
+        self.workers = workers
+        self.encoded_response_metrics: EncodedResultMetrics = EncodedResultMetrics()
 
     def parse(self, args: ParseArguments) -> ParseResponse:
         """Parses a file and stores the generated StateMachine in self.registry.
+        If a source text is given, it is parsed instead of the content of the file.
+        If this content was already parsed, the cached AST is reused.
+        If a depth is given, deeper elements are omitted from the response and can be
+        fetched later with the 'getModelElement' and 'getChildren' requests.
 
         Args:
             args (ParseArguments): arguments of the request.
@@ -52,19 +91,172 @@ class ServiceHandler:
             ParseResponse: response to the request.
         """
 
-        text_input = FileStream(args.sourceFile)
-        lexer = StateMachineLexer(text_input)
-        stream = CommonTokenStream(lexer)
-        parser = StateMachineParser(stream)
-        tree = parser.statemachine()
+        text, content_hash = self._read_source(args.sourceFile, args.sourceText)
+        cached_ast: astRegistryModule.CachedAST | None = self.registry.get_cached_ast(
+            content_hash
+        )
+
+        if cached_ast is None:
+            state_machine: StateMachine | None = self._parse_incrementally(
+                args.sourceFile, text
+            )
+            if state_machine is None:
+                state_machine = parse_source(
+                    InputStream(text), self.parsing_strategy, self.compact_ast
+                )
+
+            cached_ast = self.registry.cache_ast(
+                content_hash,
+                state_machine,
+                ParseResponse(state_machine.to_model_element()),
+            )
+
+        self._set_ast(args.sourceFile, cached_ast, text)
+
+        return cached_ast.get_response(args.depth)
+
+    def parse_encoded(self, args: ParseArguments) -> EncodedResult:
+        """Parses a file like the 'parse' request, but returns the response encoded in JSON.
+        The encoded response is kept along with the AST, so that clients parsing the same
+        content again are sent it as is.
+
+        Args:
+            args (ParseArguments): arguments of the request.
+
+        Returns:
+            EncodedResult: encoded response to the request.
+        """
+
+        response: ParseResponse = self.parse(args)
+        cached_ast: astRegistryModule.CachedAST = self.registry.loaded_asts[
+            args.sourceFile
+        ]
+
+        encoded_response: EncodedResult | None = cached_ast.encoded_responses.get(
+            args.depth
+        )
+        if encoded_response is None:
+            self.encoded_response_metrics.misses += 1
+            encoded_response = encode_result(lambda: from_parse_response(response))
+            cached_ast.encoded_responses[args.depth] = encoded_response
+        else:
+            self.encoded_response_metrics.record_hit(encoded_response)
+
+        return encoded_response
+
+    def parse_workspace(self, args: ParseWorkspaceArguments) -> ParseWorkspaceResponse:
+        """Parses several files in parallel and stores the generated StateMachines in self.registry.
+        Files whose content was already parsed reuse the cached AST.
+
+        Args:
+            args (ParseWorkspaceArguments): arguments of the request.
+
+        Returns:
+            ParseWorkspaceResponse: response to the request.
+        """
+
+        results: dict[str, SourceFileParseResult] = {}
+        texts: dict[str, str] = {}
+        content_hashes: dict[str, str] = {}
+
+        for source_file in args.sourceFiles:
+            try:
+                texts[source_file], content_hashes[source_file] = self._read_source(
+                    source_file
+                )
+            except OSError as error:
+                results[source_file] = SourceFileParseResult(
+                    source_file, 0, False, [str(error)]
+                )
+                continue
+
+            cached_ast: astRegistryModule.CachedAST | None = (
+                self.registry.get_cached_ast(content_hashes[source_file])
+            )
+
+            if cached_ast is not None:
+                self._set_ast(source_file, cached_ast, texts[source_file])
+                results[source_file] = SourceFileParseResult(source_file, 0, True)
+
+        parsed_sources: list[ParsedSource] = parse_sources(
+            {
+                source_file: text
+                for source_file, text in texts.items()
+                if source_file not in results
+            },
+            self.parsing_strategy,
+            self.workers,
+        )
+
+        for parsed_source in parsed_sources:
+            source_file: str = parsed_source.source_file
+            results[source_file] = SourceFileParseResult(
+                source_file, parsed_source.parse_time, False, parsed_source.errors
+            )
+
+            if parsed_source.state_machine is not None:
+                self._set_ast(
+                    source_file,
+                    self.registry.cache_ast(
+                        content_hashes[source_file],
+                        parsed_source.state_machine,
+                        ParseResponse(parsed_source.state_machine.to_model_element()),
+                    ),
+                    texts[source_file],
+                )
+
+        return ParseWorkspaceResponse(
+            [results[source_file] for source_file in args.sourceFiles]
+        )
+
+    def get_model_element(
+        self, args: GetModelElementArguments
+    ) -> GetModelElementResponse:
+        """Returns an element of the AST of a parsed file, with its descendants up to a given depth.
+
+        Args:
+            args (GetModelElementArguments): arguments of the request.
+
+        Returns:
+            GetModelElementResponse: response to the request.
+        """
+
+        return GetModelElementResponse(
+            truncate(self._get_model_element(args.sourceFile, args.elementId), args.depth)
+        )
 
-        visitor = BuildASTVisitor()
-        state_machine: StateMachine = visitor.visitStatemachine(tree)
-        self.registry.set_ast(args.sourceFile, state_machine)
-        if args.sourceFile in self.runtimes:
-            del self.runtimes[args.sourceFile]
+    def get_children(self, args: GetChildrenArguments) -> GetChildrenResponse:
+        """Returns a page of the children of an element of the AST of a parsed file.
 
-        return ParseResponse(state_machine.to_model_element())
+        Args:
+            args (GetChildrenArguments): arguments of the request.
+
+        Raises:
+            ValueError: raised if the offset or the limit is negative, or if the offset is past the last child.
+
+        Returns:
+            GetChildrenResponse: response to the request.
+        """
+
+        if args.offset < 0:
+            raise ValueError(f"Negative offset {args.offset}.")
+        if args.limit is not None and args.limit < 0:
+            raise ValueError(f"Negative limit {args.limit}.")
+
+        children: list[ModelElement] = get_children(
+            self._get_model_element(args.sourceFile, args.elementId), args.relation
+        )
+        # An offset at the end gives an empty page, e.g. for an element without children.
+        if args.offset > len(children):
+            raise ValueError(
+                f"Offset {args.offset} past the {len(children)} children of {args.elementId}."
+            )
+        end: int = len(children) if args.limit is None else args.offset + args.limit
+
+        return GetChildrenResponse(
+            [truncate(child, args.depth) for child in children[args.offset : end]],
+            len(children),
+        )
 
     def initialize_execution(
         self, args: InitializeExecutionArguments
@@ -230,6 +422,116 @@ class ServiceHandler:
 
         return GetStepLocationResponse(step.location)
 
+    def _read_source(
+        self, source_file: str, source_text: str | None = None
+    ) -> tuple[str, str]:
+        """Returns the text of a source file along with its content hash.
+        Large files are memory-mapped, so that they are decoded without being copied first.
+
+        Args:
+            source_file (str): source file to read.
+            source_text (str | None): text of the source file, if already known. In this case, the file is not read.
+
+        Returns:
+            tuple[str, str]: text of the source file and its content hash.
+        """
+
+        if source_text is not None:
+            return source_text, astRegistryModule.compute_content_hash(
+                source_text.encode("utf-8")
+            )
+
+        with open(source_file, "rb") as source:
+            if os.fstat(source.fileno()).st_size < MMAP_THRESHOLD:
+                content: bytes = source.read()
+                return content.decode("utf-8"), astRegistryModule.compute_content_hash(
+                    content
+                )
+
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                return str(mapping, "utf-8"), astRegistryModule.compute_content_hash(
+                    mapping
+                )
+
+    def _set_ast(
+        self, source_file: str, cached_ast: astRegistryModule.CachedAST, text: str
+    ) -> None:
+        """Stores the AST built for a source file and discards its runtime,
+        which was created from a previous version of the file.
+
+        Args:
+            source_file (str): parsed source file.
+            cached_ast (CachedAST): AST built from the source file.
+            text (str): text of the source file.
+        """
+
+        self.registry.set_ast(source_file, cached_ast, text)
+        if source_file in self.runtimes:
+            del self.runtimes[source_file]
+
+    def _get_model_element(self, source_file: str, element_id: str) -> ModelElement:
+        """Searches for an element of the AST of a parsed file.
+
+        Args:
+            source_file (str): parsed source file.
+            element_id (str): identifier of the element.
+
+        Raises:
+            ValueError: raised if the file was not parsed or has no element with this identifier.
+
+        Returns:
+            ModelElement: the element with the given identifier.
+        """
+
+        cached_ast: astRegistryModule.CachedAST | None = self.registry.loaded_asts.get(
+            source_file
+        )
+        if cached_ast is None:
+            raise ValueError(f"No AST for source file {source_file}.")
+
+        element: ModelElement | None = cached_ast.get_model_element_index().get(
+            element_id
+        )
+        if element is None:
+            raise ValueError(f"No element with id {element_id} in {source_file}.")
+
+        return element
+
+    def _parse_incrementally(self, source_file: str, text: str) -> StateMachine | None:
+        """Updates the state machine previously built for a source file to match its new text.
+
+        Args:
+            source_file (str): source file to parse.
+            text (str): new text of the source file.
+
+        Returns:
+            StateMachine | None: the updated state machine, or None if the source file must be parsed as a whole.
+        """
+
+        state_machine: StateMachine | None = self.registry.loaded_sources.get(
+            source_file
+        )
+        previous_text: str | None = self.registry.loaded_texts.get(source_file)
+
+        if (
+            not self.incremental_parsing
+            or state_machine is None
+            or previous_text is None
+            or self.registry.is_shared(source_file)
+        ):
+            return None
+
+        if not reparse_incrementally(
+            state_machine, previous_text, text, self.compact_ast
+        ):
+            return None
+
+        # The state machine was modified in place, so it no longer matches the previous text.
+        self.registry.uncache_ast(
+            astRegistryModule.compute_content_hash(previous_text.encode("utf-8"))
+        )
+        return state_machine
+
     def _check_runtime_exists(self, source_file: str) -> None:
         """Checks that a runtime exists for a given source file.
 
@@ -1,5 +0,0 @@
-import uuid
-
-
-def generate_uuid() -> str:
-    return str(uuid.uuid4())
\ No newline at end of file
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterator, Mapping
+
+
+class VariableStore(Mapping[str, float]):
+    """Values of the variables of a state machine, stored by slot in an array of doubles
+    rather than by name. Clients still read and assign variables by name, and iterate over
+    assigned variables in the order of their slots.
+
+    Unassigned variables are NaN, so that reading a number tells that the variable is
+    assigned without checking its flag, which is only checked for NaN values. Reading an
+    unassigned variable raises a KeyError, by name as from the guards and expressions
+    compiled to read variables by slot.
+
+    Attributes:
+        names (tuple[str, ...]): names of variables, by slot.
+        slots (dict[str, int]): slots of variables, by name.
+        values (array[float]): values of variables, by slot. Unassigned variables are NaN.
+        assigned (bytearray): 1 for assigned variables and 0 for others, by slot.
+    """
+
+    __slots__ = ("names", "slots", "values", "assigned")
+
+    def __init__(self, names: tuple[str, ...], slots: dict[str, int]) -> None:
+        self.names: tuple[str, ...] = names
+        self.slots: dict[str, int] = slots
+        self.values: array[float] = array("d", [float("nan")]) * len(names)
+        self.assigned: bytearray = bytearray(len(names))
+
+    def assign(self, slot: int, value: float) -> None:
+        """Assigns a value to a variable.
+
+        Args:
+            slot (int): slot of the variable.
+            value (float): value of the variable.
+        """
+
+        self.values[slot] = value
+        self.assigned[slot] = 1
+
+    def read(self, slot: int) -> float:
+        """Returns the value of a variable.
+
+        Args:
+            slot (int): slot of the variable.
+
+        Raises:
+            KeyError: raised with the name of the variable if it is not assigned.
+
+        Returns:
+            float: value of the variable.
+        """
+
+        if not self.assigned[slot]:
+            raise KeyError(self.names[slot])
+
+        return self.values[slot]
+
+    def __getitem__(self, name: str) -> float:
+        return self.read(self.slots[name])
+
+    def __setitem__(self, name: str, value: float) -> None:
+        self.assign(self.slots[name], value)
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, assigned in zip(self.names, self.assigned) if assigned)
+
+    def __len__(self) -> int:
+        return self.assigned.count(1)
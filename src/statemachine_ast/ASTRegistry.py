@@ -1,15 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import parser.StateMachineLexer as lexerModule
+import parser.StateMachineParser as parserModule
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from server.LRP import ParseResponse
+from server.ModelElementIndex import ModelElementIndex, truncate
+from server.ResponseCodec import EncodedResult
+
+from . import ASTSerializer
 from .StateMachine import StateMachine
 
+# Changes whenever the grammar is regenerated, so that cached ASTs built from
+# an older grammar are never reused.
+GRAMMAR_VERSION: str = hashlib.sha256(
+    repr((lexerModule.serializedATN(), parserModule.serializedATN())).encode()
+).hexdigest()
+
+
+def compute_content_hash(content: bytes | mmap.mmap) -> str:
+    """Computes the cache key of a source file content.
+
+    Args:
+        content (bytes | mmap): raw content of the source file, possibly memory-mapped.
+
+    Returns:
+        str: hash of the content, combined with the grammar version.
+    """
+
+    # Hashed in two steps so that the content is never copied.
+    content_hash = hashlib.sha256(GRAMMAR_VERSION.encode())
+    content_hash.update(content)
+
+    return content_hash.hexdigest()
+
+
+@dataclass
+class CachedAST:
+    """AST cached for a given source content.
+
+    Attributes:
+        state_machine (StateMachine): state machine built from the source content.
+        response (ParseResponse): response to the 'parse' LRP request for this state machine.
+        model_element_index (ModelElementIndex | None): index of the elements of the response by id. If None, the index was not built yet.
+        truncated_responses (dict[int, ParseResponse]): responses to the 'parse' LRP request truncated to a given depth, mapped to this depth.
+        encoded_responses (dict[int | None, EncodedResult]): encoded responses to the 'parse' LRP request mapped to their depth, None standing for the whole AST.
+    """
+
+    state_machine: StateMachine
+    response: ParseResponse
+    model_element_index: ModelElementIndex | None = field(default=None, repr=False)
+    truncated_responses: dict[int, ParseResponse] = field(
+        default_factory=dict, repr=False
+    )
+    encoded_responses: dict[int | None, EncodedResult] = field(
+        default_factory=dict, repr=False
+    )
+
+    def get_response(self, depth: int | None = None) -> ParseResponse:
+        """Returns the response to the 'parse' LRP request, truncated to a given depth.
+
+        Args:
+            depth (int | None): depth of the elements included in the response. If None, the whole AST is included.
+
+        Returns:
+            ParseResponse: response to the request.
+        """
+
+        if depth is None:
+            return self.response
+
+        response: ParseResponse | None = self.truncated_responses.get(depth)
+        if response is None:
+            response = ParseResponse(truncate(self.response.astRoot, depth))
+            self.truncated_responses[depth] = response
+
+        return response
+
+    def get_model_element_index(self) -> ModelElementIndex:
+        """Returns the index of the elements of the response by id, building it on first use.
+
+        Returns:
+            ModelElementIndex: index of the elements of the response.
+        """
+
+        if self.model_element_index is None:
+            self.model_element_index = ModelElementIndex(self.response.astRoot)
+
+        return self.model_element_index
+
 
 class ASTRegistry:
     """Stores the AST produced from each source file.
 
     Attributes:
         loaded_sources (dict[str, StateMachine]): dictionary of source files mapped to their parsed state machine.
+        loaded_texts (dict[str, str]): dictionary of source files mapped to the text their state machine was built from.
+        loaded_asts (dict[str, CachedAST]): dictionary of source files mapped to their cached AST.
+        cache (OrderedDict[str, CachedAST]): cached ASTs mapped to the hash of the content they were built from, from least to most recently used.
+        max_cached_asts (int): maximum number of cached ASTs.
+        cache_dir (Path | None): directory in which ASTs are persisted across restarts. If None, ASTs are only cached in memory.
+        cache_hits (int): number of lookups that found a cached AST in memory.
+        disk_cache_hits (int): number of lookups that found a cached AST in the cache directory.
+        cache_misses (int): number of lookups that found no cached AST.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, max_cached_asts: int = 64, cache_dir: str | None = None) -> None:
         self.loaded_sources: dict[str, StateMachine] = {}
+        self.loaded_texts: dict[str, str] = {}
+        self.loaded_asts: dict[str, CachedAST] = {}
+        self.cache: OrderedDict[str, CachedAST] = OrderedDict()
+        self.max_cached_asts = max_cached_asts
+        self.cache_dir: Path | None = None if cache_dir is None else Path(cache_dir)
+        self.cache_hits: int = 0
+        self.disk_cache_hits: int = 0
+        self.cache_misses: int = 0
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def set_ast(
+        self, source_file: str, cached_ast: CachedAST, source_text: str | None = None
+    ) -> None:
+        self.loaded_sources[source_file] = cached_ast.state_machine
+        self.loaded_asts[source_file] = cached_ast
+        if source_text is None:
+            self.loaded_texts.pop(source_file, None)
+        else:
+            self.loaded_texts[source_file] = source_text
+
+    def is_shared(self, source_file: str) -> bool:
+        """Checks whether the state machine of a source file is also the state machine
+        of another source file, which happens when both have the same content.
+
+        Args:
+            source_file (str): source file whose state machine to check.
+
+        Returns:
+            bool: True if the state machine is shared, False otherwise.
+        """
+
+        state_machine: StateMachine | None = self.loaded_sources.get(source_file)
+        return any(
+            other_state_machine is state_machine
+            for other_source_file, other_state_machine in self.loaded_sources.items()
+            if other_source_file != source_file
+        )
+
+    def get_cached_ast(self, content_hash: str) -> CachedAST | None:
+        """Searches for an AST built from a given source content,
+        first in memory and then in the cache directory.
+
+        Args:
+            content_hash (str): hash of the source content, as returned by compute_content_hash.
+
+        Returns:
+            CachedAST | None: the cached AST, or None if no AST was cached for this content.
+        """
+
+        cached_ast: CachedAST | None = self.cache.get(content_hash)
+        if cached_ast is None:
+            state_machine: StateMachine | None = self._load_ast(content_hash)
+            if state_machine is None:
+                self.cache_misses += 1
+                return None
+
+            self.disk_cache_hits += 1
+            return self._store_in_memory(
+                content_hash,
+                CachedAST(state_machine, ParseResponse(state_machine.to_model_element())),
+            )
+
+        self.cache_hits += 1
+        self.cache.move_to_end(content_hash)
+        return cached_ast
+
+    def cache_ast(
+        self, content_hash: str, state_machine: StateMachine, response: ParseResponse
+    ) -> CachedAST:
+        """Caches an AST built from a given source content.
+        The least recently used AST is evicted from memory if the cache is full.
+        If a cache directory is set, the AST is also persisted in it.
+
+        Args:
+            content_hash (str): hash of the source content, as returned by compute_content_hash.
+            state_machine (StateMachine): state machine built from the source content.
+            response (ParseResponse): response to the 'parse' LRP request for this state machine.
+
+        Returns:
+            CachedAST: the newly cached AST.
+        """
+
+        self._save_ast(content_hash, state_machine)
+
+        return self._store_in_memory(content_hash, CachedAST(state_machine, response))
+
+    def uncache_ast(self, content_hash: str) -> None:
+        """Removes the AST cached in memory for a given source content,
+        for instance because it was modified in place.
+
+        Args:
+            content_hash (str): hash of the source content, as returned by compute_content_hash.
+        """
+
+        self.cache.pop(content_hash, None)
+
+    def _store_in_memory(self, content_hash: str, cached_ast: CachedAST) -> CachedAST:
+        self.cache[content_hash] = cached_ast
+        self.cache.move_to_end(content_hash)
+
+        while len(self.cache) > self.max_cached_asts:
+            self.cache.popitem(last=False)
+
+        return cached_ast
+
+    def _load_ast(self, content_hash: str) -> StateMachine | None:
+        if self.cache_dir is None:
+            return None
+
+        try:
+            data: bytes = (self.cache_dir / f"{content_hash}.ast").read_bytes()
+        except OSError:
+            return None
+
+        return ASTSerializer.loads(data)
+
+    def _save_ast(self, content_hash: str, state_machine: StateMachine) -> None:
+        if self.cache_dir is None:
+            return
 
-    def set_ast(self, source_file: str, state_machine: StateMachine) -> None:
-        self.loaded_sources[source_file] = state_machine
+        # Written to a temporary file first so that concurrent readers never see
+        # a partially written AST.
+        path: Path = self.cache_dir / f"{content_hash}.ast"
+        temporary_path: Path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            temporary_path.write_bytes(ASTSerializer.dumps(state_machine))
+            os.replace(temporary_path, path)
+        except OSError:
+            temporary_path.unlink(missing_ok=True)
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import hashlib
+import marshal
+import sys
+from pathlib import Path
+
+from server.LRP import Location
+
+from .StateMachine import (
+    Assignment,
+    BinaryExpression,
+    Comparator,
+    CompositeState,
+    Expression,
+    Guard,
+    InitialState,
+    NumberAtomicExpression,
+    Operand,
+    ParenthesizedExpression,
+    Sign,
+    SimpleState,
+    State,
+    StateMachine,
+    Transition,
+    VariableAtomicExpression,
+    iter_postfix,
+)
+
+FORMAT_VERSION: int = 3
+
+# Changes whenever the AST classes or the way they are built or serialized
+# change, so that ASTs serialized by an older version of the code are never loaded.
+CODE_VERSION: str = hashlib.sha256(
+    b"".join(
+        Path(__file__).with_name(module_file).read_bytes()
+        for module_file in (
+            "StateMachine.py",
+            "BuildASTVisitor.py",
+            "FastParser.py",
+            "ASTSerializer.py",
+        )
+    )
+    + f"{FORMAT_VERSION}:{sys.version_info[:2]}".encode()
+).hexdigest()
+
+_SIMPLE_STATE: int = 0
+_COMPOSITE_STATE: int = 1
+
+_NUMBER_EXPRESSION: int = 0
+_VARIABLE_EXPRESSION: int = 1
+_PARENTHESIZED_EXPRESSION: int = 2
+_BINARY_EXPRESSION: int = 3
+
+
+def dumps(state_machine: StateMachine) -> bytes:
+    """Serializes a state machine into a compact binary form.
+    References to the parse tree are not serialized, nor are ids, which are derived from
+    the structure of the state machine when it is deserialized.
+
+    Args:
+        state_machine (StateMachine): state machine to serialize.
+
+    Returns:
+        bytes: serialized state machine, tagged with the current code version.
+    """
+
+    return marshal.dumps((CODE_VERSION, _encode_state_machine(state_machine)))
+
+
+def loads(data: bytes) -> StateMachine | None:
+    """Deserializes a state machine serialized by dumps.
+
+    Args:
+        data (bytes): serialized state machine.
+
+    Returns:
+        StateMachine | None: the deserialized state machine, or None if the data was
+        serialized by another version of the code or is corrupted.
+    """
+
+    try:
+        code_version, encoded_state_machine = marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+    if code_version != CODE_VERSION:
+        return None
+
+    return _decode_state_machine(encoded_state_machine)
+
+
+def _encode_state_machine(state_machine: StateMachine) -> tuple:
+    state_indexes: dict[int, int] = {}
+    encoded_states: list[tuple] = []
+    ordered_states: list[State] = []
+
+    def add_state(state: State, container_index: int | None) -> None:
+        state_indexes[id(state)] = len(ordered_states)
+        ordered_states.append(state)
+        encoded_states.append(
+            (
+                _COMPOSITE_STATE
+                if isinstance(state, CompositeState)
+                else _SIMPLE_STATE,
+                state.name,
+                state.is_final,
+                _encode_location(state.location),
+                container_index,
+            )
+        )
+
+    # States are listed in the order they were visited when the AST was built,
+    # so that transitions can be restored in the same order.
+    pending_states: list[tuple[State, int]] = [
+        (state, -1) for state in reversed(state_machine.states)
+    ]
+    while len(pending_states) > 0:
+        state, container_index = pending_states.pop()
+        add_state(state, container_index)
+        index: int = state_indexes[id(state)]
+        pending_states.extend(
+            (contained_state, index) for contained_state in reversed(state.states)
+        )
+
+    encoded_transitions: list[tuple] = []
+    for state in list(ordered_states):
+        for transition in state.outgoing_transitions:
+            if id(transition.target) not in state_indexes:
+                # Final pseudo states are not contained by any state.
+                add_state(transition.target, None)
+
+            encoded_transitions.append(_encode_transition(transition, state_indexes))
+
+    return (
+        state_machine.name,
+        _encode_location(state_machine.location),
+        encoded_states,
+        [_state_index(state.parent_state, state_indexes) for state in ordered_states],
+        [
+            _encode_initial_state(
+                state.initial_state if isinstance(state, CompositeState) else None,
+                state_indexes,
+            )
+            for state in ordered_states
+        ],
+        _encode_initial_state(state_machine.initial_state, state_indexes),
+        encoded_transitions,
+    )
+
+
+def _decode_state_machine(encoded_state_machine: tuple) -> StateMachine:
+    (
+        name,
+        location,
+        encoded_states,
+        parent_indexes,
+        encoded_initial_states,
+        encoded_initial_state,
+        encoded_transitions,
+    ) = encoded_state_machine
+
+    state_machine: StateMachine = StateMachine(name, _decode_location(location))
+
+    states: list[State] = []
+    for kind, state_name, is_final, state_location, container_index in encoded_states:
+        state: State = (
+            CompositeState(state_name, _decode_location(state_location))
+            if kind == _COMPOSITE_STATE
+            else SimpleState(
+                state_name,
+                is_final=is_final,
+                location=_decode_location(state_location),
+            )
+        )
+        states.append(state)
+
+        if container_index == -1:
+            state_machine.states.append(state)
+        elif container_index is not None:
+            states[container_index].states.append(state)
+
+    for state, parent_index in zip(states, parent_indexes):
+        state.parent_state = None if parent_index is None else states[parent_index]
+
+    for state, encoded_composite_initial_state in zip(states, encoded_initial_states):
+        if encoded_composite_initial_state is not None:
+            state.initial_state = _decode_initial_state(
+                encoded_composite_initial_state, states
+            )
+
+    if encoded_initial_state is not None:
+        state_machine.initial_state = _decode_initial_state(encoded_initial_state, states)
+
+    for encoded_transition in encoded_transitions:
+        transition: Transition = _decode_transition(encoded_transition, states)
+        transition.source.outgoing_transitions.append(transition)
+        transition.target.incoming_transitions.append(transition)
+
+    state_machine.complete()
+
+    return state_machine
+
+
+def _encode_initial_state(
+    initial_state: InitialState | None, state_indexes: dict[int, int]
+) -> tuple[int, int | None] | None:
+    # The parent is encoded on its own, since it is not always the parent of the target.
+    if initial_state is None:
+        return None
+
+    return (
+        state_indexes[id(initial_state.target)],
+        _state_index(initial_state.parent_state, state_indexes),
+    )
+
+
+def _decode_initial_state(
+    encoded_initial_state: tuple[int, int | None], states: list[State]
+) -> InitialState:
+    target_index, parent_index = encoded_initial_state
+    initial_state: InitialState = InitialState(states[target_index])
+    initial_state.parent_state = None if parent_index is None else states[parent_index]
+
+    return initial_state
+
+
+def _encode_transition(transition: Transition, state_indexes: dict[int, int]) -> tuple:
+    return (
+        state_indexes[id(transition.source)],
+        state_indexes[id(transition.target)],
+        transition.trigger,
+        None if transition.guard is None else _encode_guard(transition.guard),
+        [
+            (
+                assignment.variable,
+                _encode_expression(assignment.expression),
+                _encode_location(assignment.location),
+            )
+            for assignment in transition.assignments
+        ],
+        _encode_location(transition.location),
+        _encode_location(transition.full_location),
+    )
+
+
+def _decode_transition(encoded_transition: tuple, states: list[State]) -> Transition:
+    (
+        source_index,
+        target_index,
+        trigger,
+        guard,
+        encoded_assignments,
+        location,
+        full_location,
+    ) = encoded_transition
+
+    assignments: list[Assignment] = []
+    for variable, expression, assignment_location in encoded_assignments:
+        assignments.append(
+            Assignment(
+                variable,
+                _decode_expression(expression),
+                _decode_location(assignment_location),
+            )
+        )
+
+    return Transition(
+        states[source_index],
+        states[target_index],
+        trigger,
+        None if guard is None else _decode_guard(guard),
+        assignments,
+        _decode_location(location),
+        full_location=_decode_location(full_location),
+    )
+
+
+def _encode_guard(guard: Guard) -> tuple:
+    return (
+        guard.variable,
+        _encode_expression(guard.expression),
+        guard.comparator.value,
+    )
+
+
+def _decode_guard(encoded_guard: tuple) -> Guard:
+    variable, expression, comparator = encoded_guard
+
+    return Guard(variable, _decode_expression(expression), Comparator(comparator))
+
+
+def _encode_expression(expression: Expression) -> list[tuple]:
+    """Encodes an expression in postfix order, so that arbitrarily deep expressions
+    can be encoded and decoded without recursion."""
+
+    encoded_expression: list[tuple] = []
+
+    for current in iter_postfix(expression):
+        if isinstance(current, BinaryExpression):
+            encoded_expression.append((_BINARY_EXPRESSION, current.operand.value))
+        elif isinstance(current, ParenthesizedExpression):
+            encoded_expression.append(
+                (_PARENTHESIZED_EXPRESSION, _encode_sign(current.sign))
+            )
+        elif isinstance(current, NumberAtomicExpression):
+            encoded_expression.append(
+                (_NUMBER_EXPRESSION, current.number, _encode_sign(current.sign))
+            )
+        elif isinstance(current, VariableAtomicExpression):
+            encoded_expression.append(
+                (_VARIABLE_EXPRESSION, current.variable, _encode_sign(current.sign))
+            )
+
+    return encoded_expression
+
+
+def _decode_expression(encoded_expression: list[tuple]) -> Expression:
+    operands: list[Expression] = []
+
+    for item in encoded_expression:
+        kind: int = item[0]
+
+        if kind == _NUMBER_EXPRESSION:
+            operands.append(NumberAtomicExpression(item[1], _decode_sign(item[2])))
+        elif kind == _VARIABLE_EXPRESSION:
+            operands.append(VariableAtomicExpression(item[1], _decode_sign(item[2])))
+        elif kind == _PARENTHESIZED_EXPRESSION:
+            operands.append(
+                ParenthesizedExpression(operands.pop(), _decode_sign(item[1]))
+            )
+        elif kind == _BINARY_EXPRESSION:
+            right: Expression = operands.pop()
+            left: Expression = operands.pop()
+            operands.append(BinaryExpression(left, right, Operand(item[1])))
+
+    assert len(operands) == 1, "Malformed expression."
+    return operands[0]
+
+
+def _encode_sign(sign: Sign | None) -> str | None:
+    return None if sign is None else sign.value
+
+
+def _decode_sign(sign: str | None) -> Sign | None:
+    return None if sign is None else Sign(sign)
+
+
+def _encode_location(location: Location | None) -> tuple | None:
+    if location is None:
+        return None
+
+    return (location.line, location.endLine, location.column, location.endColumn)
+
+
+def _decode_location(location: tuple | None) -> Location | None:
+    return None if location is None else Location(*location)
+
+
+def _state_index(state: State | None, state_indexes: dict[int, int]) -> int | None:
+    return None if state is None else state_indexes[id(state)]
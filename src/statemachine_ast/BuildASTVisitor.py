@@ -1,7 +1,7 @@
 from parser.StateMachineParser import StateMachineParser
 from parser.StateMachineVisitor import StateMachineVisitor
 
-from antlr4 import Token
+from antlr4 import ParserRuleContext, Token
 from server.LRP import Location
 
 from .StateMachine import (
@@ -24,6 +24,64 @@ from .StateMachine import (
 )
 
 
+_SIGNS: dict[int, Sign] = {
+    StateMachineParser.PLUS: Sign.PLUS,
+    StateMachineParser.MINUS: Sign.MINUS,
+}
+_OPERANDS: dict[int, Operand] = {
+    StateMachineParser.PLUS: Operand.PLUS,
+    StateMachineParser.MINUS: Operand.MINUS,
+    StateMachineParser.TIMES: Operand.TIMES,
+    StateMachineParser.DIV: Operand.DIV,
+    StateMachineParser.POW: Operand.POW,
+}
+# Precedence of binary operators, all of them being left-associative.
+_PRECEDENCES: dict[int, int] = {
+    StateMachineParser.PLUS: 1,
+    StateMachineParser.MINUS: 1,
+    StateMachineParser.TIMES: 2,
+    StateMachineParser.DIV: 2,
+    StateMachineParser.POW: 3,
+}
+
+
+def _apply_precedence(operands: list[Expression], operators: list[Token]) -> Expression:
+    """Combines the operands and operators of an expression into binary expressions,
+    following the precedence of operators.
+
+    Args:
+        operands (list[Expression]): operands of the expression, in order.
+        operators (list[Token]): operators between consecutive operands.
+
+    Returns:
+        Expression: the combined expression.
+    """
+
+    values: list[Expression] = [operands[0]]
+    pending_operators: list[Token] = []
+
+    def reduce() -> None:
+        right: Expression = values.pop()
+        values.append(
+            BinaryExpression(values.pop(), right, _OPERANDS[pending_operators.pop().type])
+        )
+
+    for operator, operand in zip(operators, operands[1:]):
+        while (
+            len(pending_operators) > 0
+            and _PRECEDENCES[pending_operators[-1].type] >= _PRECEDENCES[operator.type]
+        ):
+            reduce()
+
+        pending_operators.append(operator)
+        values.append(operand)
+
+    while len(pending_operators) > 0:
+        reduce()
+
+    return values[0]
+
+
 class StateRegistry:
     """Registry of created states.
 
@@ -49,26 +107,59 @@ class BuildASTVisitor(StateMachineVisitor):
     Attributes:
         state_registry (StateRegistry): registry of created states.
         current_parent_state (State): parent state of the state currently being created.
+        compact (bool): if True, created elements keep no reference to the parse tree, so it can be released once the AST is built.
     """
 
+    def __init__(self, compact: bool = False) -> None:
+        super().__init__()
+        self.compact = compact
+
     # Visit a parse tree produced by StateMachineParser#statemachine.
     def visitStatemachine(self, ctx: StateMachineParser.StatemachineContext):
         state_machine: StateMachine = StateMachine(ctx.NAME().getText())
-        state_machine.parser_ctx = ctx
+        state_machine.parser_ctx = self._keep_ctx(ctx)
 
         # First pass to create empty states so references can be made easily
         empty_states_visitor: BasicBuildEmptyStatesVisitor = (
             BasicBuildEmptyStatesVisitor()
         )
         self.state_registry: StateRegistry = empty_states_visitor.visitStatemachine(ctx)
-        state_machine.initial_state = ctx.initial_state().accept(self)
+        self._set_initial_state(state_machine, ctx.initial_state())
 
         for state in ctx.states:
             self.current_state_parent: State | None = None
             state_machine.states.append(state.accept(self))
 
+        state_machine.complete()
+
         return state_machine
 
+    def build_states(
+        self,
+        ctxs: list[StateMachineParser.State_ruleContext],
+        state_registry: StateRegistry,
+    ) -> list[State]:
+        """Builds top-level states without building a whole state machine.
+        Empty states must have been created beforehand in the given registry,
+        along with any other state that transitions can reference.
+
+        Args:
+            ctxs (list[State_ruleContext]): top-level states to build.
+            state_registry (StateRegistry): registry of existing states.
+
+        Returns:
+            list[State]: built states.
+        """
+
+        self.state_registry = state_registry
+        states: list[State] = []
+
+        for state in ctxs:
+            self.current_state_parent = None
+            states.append(state.accept(self))
+
+        return states
+
     def visitInitial_state(self, ctx: StateMachineParser.Initial_stateContext):
         return InitialState(self.state_registry.get(ctx.target.text))
 
@@ -79,14 +170,10 @@ class BuildASTVisitor(StateMachineVisitor):
     def visitComposite_state(
         self, ctx: StateMachineParser.Composite_stateContext
     ) -> CompositeState:
-        state: CompositeState = self.state_registry.composite_states[
-            ctx.NAME().getText()
-        ]
-        state.parser_ctx = ctx
+        state: CompositeState = self._get_composite_state(ctx)
+        state.parser_ctx = self._keep_ctx(ctx)
 
-        state.initial_state = InitialState(
-            self.state_registry.get(ctx.initial_state().target.text)
-        )
+        self._set_initial_state(state, ctx.initial_state())
 
         self.current_transition_parent = state
         transitions: list[Transition] = [
@@ -104,8 +191,8 @@ class BuildASTVisitor(StateMachineVisitor):
     def visitSimple_state(
         self, ctx: StateMachineParser.Simple_stateContext
     ) -> SimpleState:
-        state: SimpleState = self.state_registry.simple_states[ctx.NAME().getText()]
-        state.parser_ctx = ctx
+        state: SimpleState = self._get_simple_state(ctx)
+        state.parser_ctx = self._keep_ctx(ctx)
         state.parent_state = self.current_state_parent
         self.current_transition_parent = state
 
@@ -132,6 +219,12 @@ class BuildASTVisitor(StateMachineVisitor):
             start_token.column + 1,
             end_token.column + len(end_token.text),
         )
+        full_location: Location = Location(
+            start_token.line,
+            ctx.stop.line,
+            start_token.column + 1,
+            ctx.stop.column + len(ctx.stop.text) + 1,
+        )
 
         if ctx.target.text == "FINAL":
             return Transition(
@@ -141,17 +234,19 @@ class BuildASTVisitor(StateMachineVisitor):
                 guard,
                 assignments,
                 location,
-                ctx,
+                self._keep_ctx(ctx),
+                full_location,
             )
         else:
             return Transition(
                 self.current_transition_parent,
-                self.state_registry.get(ctx.target.text),
+                self._find_target(ctx.target.text),
                 ctx.input_.text.strip("'"),
                 guard,
                 assignments,
                 location,
-                ctx,
+                self._keep_ctx(ctx),
+                full_location,
             )
 
     def visitGuard(self, ctx: StateMachineParser.GuardContext):
@@ -165,7 +260,7 @@ class BuildASTVisitor(StateMachineVisitor):
         self, ctx: StateMachineParser.Separated_assignmentContext
     ) -> Assignment:
         assignment: Assignment = ctx.assignment().accept(self)
-        assignment.parser_ctx = ctx
+        assignment.parser_ctx = self._keep_ctx(ctx)
         location: Location = Location(
             ctx.start.line, ctx.stop.line, ctx.start.column + 1, ctx.stop.column + 1
         )
@@ -177,60 +272,73 @@ class BuildASTVisitor(StateMachineVisitor):
         return Assignment(ctx.variable().getText(), ctx.expression().accept(self))
 
     def visitExpression(self, ctx: StateMachineParser.ExpressionContext) -> Expression:
-        if ctx.atom() is not None:
-            if ctx.atom().number() is not None:
-                return NumberAtomicExpression(
-                    float(ctx.atom().getText()), self._find_sign(ctx)
-                )
-            else:
-                return VariableAtomicExpression(
-                    ctx.atom().getText(), self._find_sign(ctx)
+        # Parenthesized expressions make deep parse trees, so expressions are built in
+        # postfix order with explicit stacks rather than recursively.
+        expressions: list[Expression] = []
+        pending: list[tuple[ParserRuleContext, bool]] = [(ctx, False)]
+
+        while len(pending) > 0:
+            current, operands_built = pending.pop()
+
+            if type(current) is StateMachineParser.Primary_expressionContext:
+                if current.atom() is not None:
+                    expressions.append(self._build_atomic_expression(current))
+                elif not operands_built:
+                    pending.append((current, True))
+                    pending.append((current.expression(), False))
+                else:
+                    expressions.append(ParenthesizedExpression(expressions.pop()))
+            elif not operands_built:
+                assert len(current.operands) == len(current.operators) + 1, (
+                    "Malformed expression."
                 )
 
-        if len(ctx.expression()) == 1:
-            return ParenthesizedExpression(ctx.expression()[0].accept(self))
+                pending.append((current, True))
+                pending.extend((operand, False) for operand in reversed(current.operands))
+            elif len(current.operands) > 1:
+                operands: list[Expression] = expressions[-len(current.operands) :]
+                del expressions[-len(current.operands) :]
+                expressions.append(_apply_precedence(operands, current.operators))
 
-        operand: Operand | None = self._find_operand(ctx)
-        assert (
-            len(ctx.expression()) == 2 and operand is not None
-        ), "Malformed expression."
-        return BinaryExpression(
-            ctx.expression()[0].accept(self), ctx.expression()[1].accept(self), operand
-        )
-
-    def _assign_transitions_to_states(self, transitions: list[Transition]) -> None:
-        for transition in transitions:
-            transition.source.outgoing_transitions.append(transition)
-            transition.target.incoming_transitions.append(transition)
+        return expressions.pop()
 
-    def _find_sign(self, ctx: StateMachineParser.ExpressionContext) -> Sign | None:
-        if ctx.PLUS() is not None:
-            return Sign.PLUS
+    def _build_atomic_expression(
+        self, ctx: StateMachineParser.Primary_expressionContext
+    ) -> Expression:
+        sign: Sign | None = None if ctx.sign is None else _SIGNS[ctx.sign.type]
 
-        if ctx.MINUS() is not None:
-            return Sign.MINUS
-
-        return None
+        if ctx.atom().number() is not None:
+            return NumberAtomicExpression(float(ctx.atom().getText()), sign)
+        else:
+            return VariableAtomicExpression(ctx.atom().getText(), sign)
 
-    def _find_operand(
-        self, ctx: StateMachineParser.ExpressionContext
-    ) -> Operand | None:
-        if ctx.PLUS() is not None:
-            return Operand.PLUS
+    def _keep_ctx(self, ctx: ParserRuleContext) -> ParserRuleContext | None:
+        return None if self.compact else ctx
 
-        if ctx.MINUS() is not None:
-            return Operand.MINUS
+    def _get_composite_state(
+        self, ctx: StateMachineParser.Composite_stateContext
+    ) -> CompositeState:
+        return self.state_registry.composite_states[ctx.NAME().getText()]
 
-        if ctx.TIMES() is not None:
-            return Operand.TIMES
+    def _get_simple_state(
+        self, ctx: StateMachineParser.Simple_stateContext
+    ) -> SimpleState:
+        return self.state_registry.simple_states[ctx.NAME().getText()]
 
-        if ctx.DIV() is not None:
-            return Operand.DIV
+    def _set_initial_state(
+        self,
+        owner: StateMachine | CompositeState,
+        ctx: StateMachineParser.Initial_stateContext,
+    ) -> None:
+        owner.initial_state = ctx.accept(self)
 
-        if ctx.POW() is not None:
-            return Operand.POW
+    def _find_target(self, name: str) -> State | None:
+        return self.state_registry.get(name)
 
-        return None
+    def _assign_transitions_to_states(self, transitions: list[Transition]) -> None:
+        for transition in transitions:
+            transition.source.outgoing_transitions.append(transition)
+            transition.target.incoming_transitions.append(transition)
 
     def _find_comparator(
         self, ctx: StateMachineParser.GuardContext
@@ -256,6 +364,132 @@ class BuildASTVisitor(StateMachineVisitor):
         return None
 
 
+class SinglePassBuildASTVisitor(BuildASTVisitor):
+    """Builds an instance of StateMachine from a StatemachineContext in a single pass.
+    States are created as they are visited, instead of during a preliminary pass over
+    the parse tree. References to states that are not created yet are recorded and
+    resolved once the whole parse tree is visited, so the built AST is the same as the
+    one built by BuildASTVisitor.
+
+    Attributes:
+        transitions (list[Transition]): created transitions, in the order of their declaration.
+        unresolved_initial_states (list[tuple[StateMachine | CompositeState, str]]): elements whose initial state targets a state that was not created yet, with the name of this state.
+    """
+
+    # Visit a parse tree produced by StateMachineParser#statemachine.
+    def visitStatemachine(self, ctx: StateMachineParser.StatemachineContext):
+        state_machine: StateMachine = StateMachine(ctx.NAME().getText())
+        state_machine.parser_ctx = self._keep_ctx(ctx)
+
+        self._start_pass(StateRegistry())
+        self._set_initial_state(state_machine, ctx.initial_state())
+
+        for state in ctx.states:
+            self.current_state_parent: State | None = None
+            state_machine.states.append(state.accept(self))
+
+        self._resolve_references()
+        state_machine.complete()
+
+        return state_machine
+
+    def build_states(
+        self,
+        ctxs: list[StateMachineParser.State_ruleContext],
+        state_registry: StateRegistry,
+    ) -> list[State]:
+        """Builds top-level states without building a whole state machine.
+        States are created in the given registry, which must contain any other state
+        that transitions can reference.
+
+        Args:
+            ctxs (list[State_ruleContext]): top-level states to build.
+            state_registry (StateRegistry): registry of existing states.
+
+        Raises:
+            DuplicatedNameError: raised if a state has the same name as an existing state.
+
+        Returns:
+            list[State]: built states.
+        """
+
+        self._start_pass(state_registry)
+        states: list[State] = super().build_states(ctxs, state_registry)
+        self._resolve_references()
+
+        return states
+
+    def _start_pass(self, state_registry: StateRegistry) -> None:
+        self.state_registry: StateRegistry = state_registry
+        self.transitions: list[Transition] = []
+        self.unresolved_initial_states: list[
+            tuple[StateMachine | CompositeState, str]
+        ] = []
+
+    def _get_composite_state(
+        self, ctx: StateMachineParser.Composite_stateContext
+    ) -> CompositeState:
+        return _create_composite_state(ctx, self.state_registry)
+
+    def _get_simple_state(
+        self, ctx: StateMachineParser.Simple_stateContext
+    ) -> SimpleState:
+        return _create_simple_state(ctx, self.state_registry)
+
+    def _set_initial_state(
+        self,
+        owner: StateMachine | CompositeState,
+        ctx: StateMachineParser.Initial_stateContext,
+    ) -> None:
+        target: State | None = self.state_registry.get(ctx.target.text)
+
+        if target is None:
+            self.unresolved_initial_states.append((owner, ctx.target.text))
+        else:
+            owner.initial_state = InitialState(target)
+
+    def _find_target(self, name: str) -> State | None:
+        target: State | None = self.state_registry.get(name)
+
+        return UnresolvedState(name) if target is None else target
+
+    def _assign_transitions_to_states(self, transitions: list[Transition]) -> None:
+        # Incoming transitions are assigned once targets are resolved, so that they are
+        # listed in the order of their declaration.
+        for transition in transitions:
+            transition.source.outgoing_transitions.append(transition)
+
+        self.transitions.extend(transitions)
+
+    def _resolve_references(self) -> None:
+        for owner, name in self.unresolved_initial_states:
+            initial_state: InitialState = InitialState(self.state_registry.get(name))
+            # As with BuildASTVisitor, the target had no parent yet when the initial
+            # state was declared.
+            initial_state.parent_state = None
+            owner.initial_state = initial_state
+
+        for transition in self.transitions:
+            if isinstance(transition.target, UnresolvedState):
+                transition.target = self.state_registry.get(transition.target.name)
+
+            transition.target.incoming_transitions.append(transition)
+
+
+class UnresolvedState:
+    """Placeholder for the target of a transition declared before its target state,
+    until references are resolved.
+
+    Attributes:
+        name (str): name of the target state.
+        is_final (bool): always False, since final states are not referenced by name.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.is_final = False
+
+
 class BasicBuildEmptyStatesVisitor(StateMachineVisitor):
     """Builds empty states from a StatemachineContext.
 
@@ -273,45 +507,84 @@ class BasicBuildEmptyStatesVisitor(StateMachineVisitor):
 
         return self.state_registry
 
+    def build_empty_states(
+        self,
+        ctxs: list[StateMachineParser.State_ruleContext],
+        state_registry: StateRegistry,
+    ) -> StateRegistry:
+        """Builds empty states from top-level states without visiting a whole state machine.
+
+        Args:
+            ctxs (list[State_ruleContext]): top-level states from which to build empty states.
+            state_registry (StateRegistry): registry of already existing states, to which empty states are added.
+
+        Raises:
+            DuplicatedNameError: raised if a state has the same name as an existing state.
+
+        Returns:
+            StateRegistry: the given registry.
+        """
+
+        self.state_registry = state_registry
+
+        for state in ctxs:
+            state.accept(self)
+
+        return self.state_registry
+
     def visitState_rule(self, ctx: StateMachineParser.State_ruleContext):
         ctx.getChild(0).accept(self)
 
     def visitSimple_state(self, ctx: StateMachineParser.Simple_stateContext):
-        start_token: Token = ctx.STATE().symbol
-        end_token: Token = ctx.NAME().symbol
-        location: Location = Location(
-            start_token.line,
-            end_token.line,
-            start_token.column + 1,
-            end_token.column + 1 + (end_token.stop - end_token.start),
-        )
+        _create_simple_state(ctx, self.state_registry)
 
-        if self.state_registry.get(ctx.NAME().getText()) is not None:
-            raise DuplicatedNameError(ctx.NAME().getText())
+    def visitComposite_state(self, ctx: StateMachineParser.Composite_stateContext):
+        _create_composite_state(ctx, self.state_registry)
 
-        self.state_registry.simple_states[ctx.NAME().getText()] = SimpleState(
-            ctx.NAME().getText(), location=location
-        )
+        for state in ctx.states:
+            state.accept(self)
 
-    def visitComposite_state(self, ctx: StateMachineParser.Composite_stateContext):
-        start_token: Token = ctx.COMPOSITE_STATE().symbol
-        end_token: Token = ctx.NAME().symbol
-        location: Location = Location(
-            start_token.line,
-            end_token.line,
-            start_token.column + 1,
-            end_token.column + 1 + (end_token.stop - end_token.start),
-        )
 
-        if self.state_registry.get(ctx.NAME().getText()) is not None:
-            raise DuplicatedNameError(ctx.NAME().getText())
+def _create_simple_state(
+    ctx: StateMachineParser.Simple_stateContext, state_registry: StateRegistry
+) -> SimpleState:
+    start_token: Token = ctx.STATE().symbol
+    end_token: Token = ctx.NAME().symbol
+    location: Location = Location(
+        start_token.line,
+        end_token.line,
+        start_token.column + 1,
+        end_token.column + 1 + (end_token.stop - end_token.start),
+    )
 
-        self.state_registry.composite_states[ctx.NAME().getText()] = CompositeState(
-            ctx.NAME().getText(), location
-        )
+    if state_registry.get(ctx.NAME().getText()) is not None:
+        raise DuplicatedNameError(ctx.NAME().getText())
 
-        for state in ctx.states:
-            state.accept(self)
+    state: SimpleState = SimpleState(ctx.NAME().getText(), location=location)
+    state_registry.simple_states[ctx.NAME().getText()] = state
+
+    return state
+
+
+def _create_composite_state(
+    ctx: StateMachineParser.Composite_stateContext, state_registry: StateRegistry
+) -> CompositeState:
+    start_token: Token = ctx.COMPOSITE_STATE().symbol
+    end_token: Token = ctx.NAME().symbol
+    location: Location = Location(
+        start_token.line,
+        end_token.line,
+        start_token.column + 1,
+        end_token.column + 1 + (end_token.stop - end_token.start),
+    )
+
+    if state_registry.get(ctx.NAME().getText()) is not None:
+        raise DuplicatedNameError(ctx.NAME().getText())
+
+    state: CompositeState = CompositeState(ctx.NAME().getText(), location)
+    state_registry.composite_states[ctx.NAME().getText()] = state
+
+    return state
 
 
 class DuplicatedNameError(ValueError):
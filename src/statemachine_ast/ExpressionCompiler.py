@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import statemachine_ast.StateMachine as stateMachineModule
+from server.VariableStore import VariableStore
+
+# Maximum nesting of generated expressions, beyond which subexpressions are assigned to
+# local variables. The Python compiler rejects deeply nested expressions, which long
+# chains of operations would otherwise produce.
+_MAX_NESTING: int = 50
+
+# Python operators by value of comparators. Operators are the values of operands, POW
+# being evaluated with ^ as by ExpressionEvaluator. Values are used rather than enum
+# members, since this module is imported while StateMachine is being initialized.
+_COMPARISONS: dict[str, str] = {
+    "=": "==",
+    "!=": "!=",
+    "<": "<",
+    "<=": "<=",
+    ">": ">",
+    ">=": ">=",
+}
+# Numbers too large for a float are infinite, and folded constants may be NaN.
+_NAMESPACE: dict[str, float] = {"inf": float("inf"), "nan": float("nan")}
+
+
+def compile_expression(
+    expression: stateMachineModule.Expression,
+    slots: dict[str, int] | None = None,
+) -> Callable[[dict[str, float]], float] | Callable[[VariableStore], float]:
+    """Compiles an expression into a function evaluating it, with the same result and
+    the same errors as ExpressionEvaluator.
+
+    Args:
+        expression (Expression): expression to compile.
+        slots (dict[str, int] | None): slots of variables by name, if the function reads
+            variables by slot from a VariableStore rather than by name.
+
+    Returns:
+        Callable[[dict[str, float]], float] | Callable[[VariableStore], float]: function
+        evaluating the expression from the values of variables, by name or by slot.
+    """
+
+    statements, result = _generate(expression, slots)
+    statements.append(f"return {result}")
+
+    return _define(statements, slots is not None)
+
+
+def compile_guard(
+    guard: stateMachineModule.Guard, slots: dict[str, int] | None = None
+) -> Callable[[dict[str, float]], bool] | Callable[[VariableStore], bool]:
+    """Compiles a guard into a function evaluating it, with the same result and the same
+    errors as GuardEvaluator. The optimized expression of the guard is compiled.
+
+    Args:
+        guard (Guard): guard to compile.
+        slots (dict[str, int] | None): slots of variables by name, if the function reads
+            variables by slot from a VariableStore rather than by name.
+
+    Returns:
+        Callable[[dict[str, float]], bool] | Callable[[VariableStore], bool]: function
+        evaluating the guard from the values of variables, by name or by slot.
+    """
+
+    # The expression is evaluated before the variable is read, as by GuardEvaluator.
+    statements, result = _generate(guard.optimized_expression, slots)
+    statements.append(f"value = {result}")
+    statements.append(
+        f"return {_read(guard.variable, slots)} {_COMPARISONS[guard.comparator.value]} value"
+    )
+
+    return _define(statements, slots is not None)
+
+
+def _generate(
+    expression: stateMachineModule.Expression, slots: dict[str, int] | None
+) -> tuple[list[str], str]:
+    # Code is generated in postfix order, so that long chains of operations never
+    # exceed the recursion limit. Each generated operand comes with its nesting.
+    statements: list[str] = []
+    operands: list[tuple[str, int]] = []
+    minus: stateMachineModule.Sign = stateMachineModule.Sign.MINUS
+    # Subexpressions found several times are evaluated once, into a local variable.
+    repeated: set[int] = _find_repeated_subexpressions(expression)
+    names: dict[int, str] = {}
+    pending: list[tuple[stateMachineModule.Expression, bool]] = [(expression, False)]
+
+    while len(pending) > 0:
+        current, expanded = pending.pop()
+        current_type: type = type(current)
+
+        if id(current) in names:
+            operands.append((names[id(current)], 0))
+            continue
+
+        if current_type is stateMachineModule.NumberAtomicExpression:
+            number: float = -current.number if current.sign is minus else current.number
+            operands.append((f"({number!r})", 0))
+        elif current_type is stateMachineModule.VariableAtomicExpression:
+            variable: str = _read(current.variable, slots)
+            operands.append((f"(-{variable})" if current.sign is minus else variable, 0))
+        elif not expanded:
+            pending.append((current, True))
+            if current_type is stateMachineModule.BinaryExpression:
+                pending.append((current.right, False))
+                pending.append((current.left, False))
+            else:
+                pending.append((current.contained_expression, False))
+            continue
+        elif current_type is stateMachineModule.BinaryExpression:
+            right, right_nesting = operands.pop()
+            left, left_nesting = operands.pop()
+            operands.append(
+                (
+                    f"({left} {current.operand.value} {right})",
+                    max(left_nesting, right_nesting) + 1,
+                )
+            )
+        elif current.sign is minus:
+            contained, nesting = operands.pop()
+            operands.append((f"(-{contained})", nesting + 1))
+
+        if id(current) in repeated or operands[-1][1] >= _MAX_NESTING:
+            _assign_operands(statements, operands)
+            names[id(current)] = operands[-1][0]
+
+    return statements, operands.pop()[0]
+
+
+def _read(variable: str, slots: dict[str, int] | None) -> str:
+    if slots is None:
+        return f"variables[{variable!r}]"
+
+    # Only NaN values, which unassigned variables are, are read again from the store,
+    # which raises a KeyError for unassigned variables, as when they are read by name.
+    slot: int = slots[variable]
+    return f"(v if (v := values[{slot}]) == v else variables.read({slot}))"
+
+
+def _find_repeated_subexpressions(expression: stateMachineModule.Expression) -> set[int]:
+    # Identical subexpressions are the same object once optimized. Atomic expressions
+    # are cheap enough to evaluate again.
+    found: set[int] = set()
+    repeated: set[int] = set()
+    pending: list[stateMachineModule.Expression] = [expression]
+
+    while len(pending) > 0:
+        current: stateMachineModule.Expression = pending.pop()
+        current_type: type = type(current)
+
+        if (
+            current_type is stateMachineModule.NumberAtomicExpression
+            or current_type is stateMachineModule.VariableAtomicExpression
+        ):
+            continue
+
+        # The subexpressions of repeated expressions are not searched again, since
+        # repeated expressions are evaluated once.
+        if id(current) in found:
+            repeated.add(id(current))
+        elif current_type is stateMachineModule.BinaryExpression:
+            found.add(id(current))
+            pending.append(current.right)
+            pending.append(current.left)
+        else:
+            found.add(id(current))
+            pending.append(current.contained_expression)
+
+    return repeated
+
+
+def _assign_operands(statements: list[str], operands: list[tuple[str, int]]) -> None:
+    # Operands are assigned to local variables in order, since operands to the left are
+    # evaluated first by the interpreter, and may raise other errors.
+    for index, (operand, _) in enumerate(operands):
+        if not operand.isidentifier():
+            name: str = f"t{len(statements)}"
+            statements.append(f"{name} = {operand}")
+            operands[index] = (name, 0)
+
+
+def _define(
+    statements: list[str], slotted: bool
+) -> Callable[[dict[str, float]], float | bool] | Callable[[VariableStore], float | bool]:
+    if slotted:
+        statements = ["values = variables.values", *statements]
+    source: str = "def evaluate(variables):\n" + "".join(
+        f"    {statement}\n" for statement in statements
+    )
+    namespace: dict[str, float] = dict(_NAMESPACE)
+    exec(compile(source, "<expression>", "exec"), namespace)
+
+    return namespace["evaluate"]
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import operator
+from typing import Callable, Hashable
+
+import statemachine_ast.StateMachine as stateMachineModule
+
+# Operations by value of operands, applied as by ExpressionEvaluator, POW included. Values
+# are used rather than enum members, since this module is imported while StateMachine is
+# being initialized.
+_OPERATIONS: dict[str, Callable[[float, float], float]] = {
+    "^": operator.xor,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "+": operator.add,
+    "-": operator.sub,
+}
+
+
+class ExpressionOptimizer:
+    """Optimizes expressions into equivalent expressions that are faster to evaluate.
+    Constant subexpressions are folded, signs and parentheses are simplified, and
+    identical subexpressions are shared between all the expressions optimized by the
+    same optimizer, so that they are compiled once.
+
+    Optimized expressions give the same results and raise the same errors as the
+    original ones. Operations are therefore only folded when they are constant and do
+    not raise, and never reordered, since floating-point operations are not associative.
+
+    Original expressions are left unchanged, so that their values can still be
+    displayed. Subexpressions that cannot be optimized are shared with them.
+
+    Attributes:
+        shared_expressions (dict[Hashable, Expression]): optimized expressions by key,
+            identical expressions having the same key.
+    """
+
+    __slots__ = ("shared_expressions",)
+
+    def __init__(self) -> None:
+        self.shared_expressions: dict[Hashable, stateMachineModule.Expression] = {}
+
+    def optimize(
+        self, expression: stateMachineModule.Expression
+    ) -> stateMachineModule.Expression:
+        """Optimizes an expression.
+
+        Args:
+            expression (Expression): expression to optimize.
+
+        Returns:
+            Expression: optimized expression, possibly shared with other expressions.
+        """
+
+        # Expressions are optimized in postfix order with an explicit stack, so that long
+        # chains of operations never exceed the recursion limit, and operands are
+        # optimized first. Atomic expressions, the most common, are optimized inline.
+        optimized: list[stateMachineModule.Expression] = []
+        pending: list[tuple[stateMachineModule.Expression, bool]] = [(expression, False)]
+        shared_expressions: dict[Hashable, stateMachineModule.Expression] = (
+            self.shared_expressions
+        )
+        minus: stateMachineModule.Sign = stateMachineModule.Sign.MINUS
+
+        while len(pending) > 0:
+            current, expanded = pending.pop()
+            current_type: type = type(current)
+
+            if current_type is stateMachineModule.NumberAtomicExpression:
+                number: float = -current.number if current.sign is minus else current.number
+                # The representation distinguishes 0.0 from -0.0, and NaN from itself.
+                key: Hashable = ("number", repr(number))
+                shared: stateMachineModule.Expression | None = shared_expressions.get(key)
+                if shared is None:
+                    shared = shared_expressions[key] = (
+                        current
+                        if current.sign is None
+                        else stateMachineModule.NumberAtomicExpression(number)
+                    )
+                optimized.append(shared)
+            elif current_type is stateMachineModule.VariableAtomicExpression:
+                optimized.append(self._variable(current, current.sign is minus))
+            elif not expanded:
+                pending.append((current, True))
+                if current_type is stateMachineModule.BinaryExpression:
+                    pending.append((current.right, False))
+                    pending.append((current.left, False))
+                else:
+                    pending.append((current.contained_expression, False))
+            elif current_type is stateMachineModule.BinaryExpression:
+                right: stateMachineModule.Expression = optimized.pop()
+                optimized.append(self._binary(current, optimized.pop(), right))
+            elif current.sign is minus:
+                optimized.append(self._negate(optimized.pop()))
+
+            # Parentheses without sign are removed, leaving their optimized contained
+            # expression as is.
+
+        return optimized.pop()
+
+    def _number(self, number: float) -> stateMachineModule.NumberAtomicExpression:
+        key: Hashable = ("number", repr(number))
+        if key not in self.shared_expressions:
+            self.shared_expressions[key] = stateMachineModule.NumberAtomicExpression(number)
+
+        return self.shared_expressions[key]
+
+    def _variable(
+        self,
+        expression: stateMachineModule.VariableAtomicExpression,
+        negated: bool,
+    ) -> stateMachineModule.VariableAtomicExpression:
+        key: Hashable = ("variable", expression.variable, negated)
+        if key not in self.shared_expressions:
+            sign: stateMachineModule.Sign | None = (
+                stateMachineModule.Sign.MINUS if negated else None
+            )
+            if expression.sign is not sign:
+                expression = stateMachineModule.VariableAtomicExpression(
+                    expression.variable, sign
+                )
+            self.shared_expressions[key] = expression
+
+        return self.shared_expressions[key]
+
+    def _binary(
+        self,
+        expression: stateMachineModule.BinaryExpression,
+        left: stateMachineModule.Expression,
+        right: stateMachineModule.Expression,
+    ) -> stateMachineModule.Expression:
+        operand: str = expression.operand.value
+        if (
+            type(left) is stateMachineModule.NumberAtomicExpression
+            and type(right) is stateMachineModule.NumberAtomicExpression
+        ):
+            # Operations that raise are left to evaluation, which raises the same error.
+            try:
+                return self._number(_OPERATIONS[operand](left.number, right.number))
+            except (ArithmeticError, TypeError):
+                pass
+
+        # Operands are shared, so that identical operands are the same expression.
+        key: Hashable = ("binary", operand, id(left), id(right))
+        if key not in self.shared_expressions:
+            if left is not expression.left or right is not expression.right:
+                expression = stateMachineModule.BinaryExpression(
+                    left, right, expression.operand
+                )
+            self.shared_expressions[key] = expression
+
+        return self.shared_expressions[key]
+
+    def _negate(
+        self, expression: stateMachineModule.Expression
+    ) -> stateMachineModule.Expression:
+        expression_type: type = type(expression)
+
+        if expression_type is stateMachineModule.NumberAtomicExpression:
+            return self._number(-expression.number)
+        if expression_type is stateMachineModule.VariableAtomicExpression:
+            return self._variable(expression, expression.sign is None)
+        if expression_type is stateMachineModule.ParenthesizedExpression:
+            # Only negated parentheses are left, and negating twice gives the same value.
+            return expression.contained_expression
+
+        key: Hashable = ("negated", id(expression))
+        if key not in self.shared_expressions:
+            self.shared_expressions[key] = stateMachineModule.ParenthesizedExpression(
+                expression, stateMachineModule.Sign.MINUS
+            )
+
+        return self.shared_expressions[key]
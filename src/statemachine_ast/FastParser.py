@@ -0,0 +1,365 @@
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+from server.LRP import Location
+
+from .BuildASTVisitor import UnresolvedState
+from .StateMachine import (
+    Assignment,
+    BinaryExpression,
+    Comparator,
+    CompositeState,
+    Expression,
+    Guard,
+    InitialState,
+    NumberAtomicExpression,
+    Operand,
+    ParenthesizedExpression,
+    Sign,
+    SimpleState,
+    State,
+    StateMachine,
+    Transition,
+    VariableAtomicExpression,
+)
+
+# Alternatives are ordered so that the first matching one is also the one chosen by the
+# ANTLR lexer, which picks the longest match and the first rule in case of a tie.
+_TOKEN: re.Pattern = re.compile(
+    r"""
+    (?P<WS>[ \t\r\n]+)
+    | (?P<COMPOSITE_STATE>composite\ state)
+    | (?P<WORD>[a-zA-Z_][a-zA-Z_0-9]*)
+    | (?P<TEXT>'[a-zA-Z]+')
+    | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+    | (?P<SYMBOL>->|!=|<=|>=|[{};:\[\]<>()+\-*/=.^])
+    """,
+    re.VERBOSE,
+)
+_NAME: re.Pattern = re.compile(r"[A-Z][a-zA-Z]*")
+_KEYWORDS: dict[str, str] = {
+    "StateMachine": "STATEMACHINE",
+    "state": "STATE",
+    "INITIAL": "INITIAL",
+    "FINAL": "FINAL",
+}
+
+_SIGNS: dict[str, Sign] = {"+": Sign.PLUS, "-": Sign.MINUS}
+_OPERANDS: dict[str, Operand] = {
+    "+": Operand.PLUS,
+    "-": Operand.MINUS,
+    "*": Operand.TIMES,
+    "/": Operand.DIV,
+    "^": Operand.POW,
+}
+# Precedence of binary operators, all of them being left-associative.
+_PRECEDENCES: dict[str, int] = {"+": 1, "-": 1, "*": 2, "/": 2, "^": 3}
+_COMPARATORS: dict[str, Comparator] = {
+    "=": Comparator.EQ,
+    "!=": Comparator.NOT_EQ,
+    "<": Comparator.INF,
+    "<=": Comparator.INF_EQ,
+    ">": Comparator.SUP,
+    ">=": Comparator.SUP_EQ,
+}
+
+
+class FastParserError(ValueError):
+    """Raised when the fast parser cannot build the AST of a source text, either because
+    of a syntax error or because the AST would be invalid. The ANTLR parser must then be
+    used instead, so that errors are reported the usual way."""
+
+
+class _Token(NamedTuple):
+    kind: str
+    text: str
+    line: int
+    column: int
+
+
+def parse_text(text: str) -> StateMachine:
+    """Parses a source text with a hand-written recursive descent parser and builds the
+    corresponding StateMachine directly, without building a parse tree.
+    The built AST is the same as the one built by the ANTLR parser, elements having the
+    same locations, but no reference to a parse tree.
+
+    Args:
+        text (str): source text to parse.
+
+    Raises:
+        FastParserError: raised if the source text has errors.
+
+    Returns:
+        StateMachine: state machine built from the source text.
+    """
+
+    return _Parser(_tokenize(text)).parse_statemachine()
+
+
+def _tokenize(text: str) -> list[_Token]:
+    tokens: list[_Token] = []
+    line: int = 1
+    line_start: int = 0
+    position: int = 0
+
+    while position < len(text):
+        match: re.Match | None = _TOKEN.match(text, position)
+        if match is None:
+            raise FastParserError(
+                f"line {line}:{position - line_start} token recognition error"
+            )
+
+        kind: str = match.lastgroup
+        value: str = match.group()
+        if kind == "WS":
+            newlines: int = value.count("\n")
+            if newlines > 0:
+                line += newlines
+                line_start = position + value.rindex("\n") + 1
+        else:
+            if kind == "WORD":
+                kind = _KEYWORDS.get(value) or (
+                    "NAME" if _NAME.fullmatch(value) else "VARIABLE"
+                )
+            elif kind == "SYMBOL":
+                kind = value
+
+            tokens.append(_Token(kind, value, line, position - line_start))
+
+        position = match.end()
+
+    tokens.append(_Token("EOF", "<EOF>", line, position - line_start))
+
+    return tokens
+
+
+class _Parser:
+    """Recursive descent parser following the rules of StateMachine.g4, building AST
+    elements in the same order as SinglePassBuildASTVisitor."""
+
+    def __init__(self, tokens: list[_Token]) -> None:
+        self.tokens = tokens
+        self.position: int = 0
+        self.states: dict[str, State] = {}
+        self.transitions: list[Transition] = []
+        self.initial_states: list[tuple[StateMachine | CompositeState, str]] = []
+
+    def parse_statemachine(self) -> StateMachine:
+        self._expect("STATEMACHINE")
+        state_machine: StateMachine = StateMachine(self._expect("NAME").text)
+        self._expect("{")
+        self._parse_initial_state(state_machine)
+        state_machine.states = self._parse_states(None)
+        self._expect("}")
+        self._expect("EOF")
+
+        self._resolve_references()
+        state_machine.complete()
+
+        return state_machine
+
+    def _parse_initial_state(self, owner: StateMachine | CompositeState) -> None:
+        self._expect("INITIAL")
+        self._expect("->")
+        target: str = self._expect("NAME").text
+        self._expect(";")
+
+        if target in self.states:
+            owner.initial_state = InitialState(self.states[target])
+        else:
+            self.initial_states.append((owner, target))
+
+    def _parse_states(self, parent_state: CompositeState | None) -> list[State]:
+        states: list[State] = [self._parse_state(parent_state)]
+        while self._peek().kind in ("STATE", "COMPOSITE_STATE"):
+            states.append(self._parse_state(parent_state))
+
+        return states
+
+    def _parse_state(self, parent_state: CompositeState | None) -> State:
+        keyword: _Token = self._next()
+        if keyword.kind not in ("STATE", "COMPOSITE_STATE"):
+            raise self._error(keyword)
+
+        name: _Token = self._expect("NAME")
+        location: Location = Location(
+            keyword.line,
+            name.line,
+            keyword.column + 1,
+            name.column + len(name.text),
+        )
+        if name.text in self.states:
+            raise FastParserError(f"State name {name.text} is duplicated.")
+
+        state: State
+        if keyword.kind == "STATE":
+            state = SimpleState(name.text, parent_state, location=location)
+        else:
+            # Composite states have no parent, as with the ANTLR parser.
+            state = CompositeState(name.text, location)
+        self.states[name.text] = state
+
+        self._expect("{")
+        while self._peek().kind == "->":
+            self._parse_transition(state, parent_state)
+
+        if isinstance(state, CompositeState):
+            if self._peek().kind != "INITIAL":
+                raise self._error(self._peek())
+
+            self._parse_initial_state(state)
+            state.states = self._parse_states(state)
+        self._expect("}")
+
+        return state
+
+    def _parse_transition(
+        self, source: State, parent_state: CompositeState | None
+    ) -> None:
+        start: _Token = self._expect("->")
+        target: _Token = self._next()
+        if target.kind not in ("NAME", "FINAL"):
+            raise self._error(target)
+
+        self._expect(":")
+        trigger: str = self._expect("TEXT").text.strip("'")
+
+        guard: Guard | None = None
+        if self._peek().kind == "[":
+            self._next()
+            guard = self._parse_guard()
+            self._expect("]")
+
+        assignments: list[Assignment] = []
+        if self._peek().kind == "/":
+            self._next()
+            self._expect("{")
+            while self._peek().kind == "VARIABLE":
+                assignments.append(self._parse_assignment())
+            self._expect("}")
+        stop: _Token = self._expect(";")
+
+        location: Location = Location(
+            start.line,
+            target.line,
+            start.column + 1,
+            target.column + len(target.text),
+        )
+        full_location: Location = Location(
+            start.line,
+            stop.line,
+            start.column + 1,
+            stop.column + len(stop.text) + 1,
+        )
+
+        transition: Transition = Transition(
+            source,
+            SimpleState(parent_state=parent_state, is_final=True)
+            if target.kind == "FINAL"
+            else self.states.get(target.text) or UnresolvedState(target.text),
+            trigger,
+            guard,
+            assignments,
+            location,
+            None,
+            full_location,
+        )
+        # Incoming transitions are assigned once targets are resolved, so that they are
+        # listed in the order of their declaration.
+        self.transitions.append(transition)
+        source.outgoing_transitions.append(transition)
+
+    def _parse_guard(self) -> Guard:
+        variable: str = self._expect("VARIABLE").text
+        comparator: _Token = self._next()
+        if comparator.kind not in _COMPARATORS:
+            raise self._error(comparator)
+
+        return Guard(variable, self._parse_expression(1), _COMPARATORS[comparator.kind])
+
+    def _parse_assignment(self) -> Assignment:
+        variable: _Token = self._expect("VARIABLE")
+        self._expect("=")
+        assignment: Assignment = Assignment(variable.text, self._parse_expression(1))
+        stop: _Token = self._expect(";")
+        assignment.location = Location(
+            variable.line, stop.line, variable.column + 1, stop.column + 1
+        )
+
+        return assignment
+
+    def _parse_expression(self, min_precedence: int) -> Expression:
+        left: Expression = self._parse_primary()
+
+        while _PRECEDENCES.get(self._peek().kind, 0) >= min_precedence:
+            operator: str = self._next().kind
+            right: Expression = self._parse_expression(_PRECEDENCES[operator] + 1)
+            left = BinaryExpression(left, right, _OPERANDS[operator])
+
+        return left
+
+    def _parse_primary(self) -> Expression:
+        token: _Token = self._next()
+        if token.kind == "(":
+            expression: Expression = self._parse_expression(1)
+            self._expect(")")
+            return ParenthesizedExpression(expression)
+
+        sign: Sign | None = None
+        if token.kind in _SIGNS:
+            sign = _SIGNS[token.kind]
+            token = self._next()
+
+        if token.kind == "NUMBER":
+            return NumberAtomicExpression(float(token.text), sign)
+
+        if token.kind == "VARIABLE":
+            return VariableAtomicExpression(token.text, sign)
+
+        raise self._error(token)
+
+    def _resolve_references(self) -> None:
+        for owner, name in self.initial_states:
+            if name not in self.states:
+                raise FastParserError(f"State {name} does not exist.")
+
+            initial_state: InitialState = InitialState(self.states[name])
+            # As with the ANTLR parser, the target had no parent yet when the initial
+            # state was declared.
+            initial_state.parent_state = None
+            owner.initial_state = initial_state
+
+        for transition in self.transitions:
+            if isinstance(transition.target, UnresolvedState):
+                if transition.target.name not in self.states:
+                    raise FastParserError(
+                        f"State {transition.target.name} does not exist."
+                    )
+
+                transition.target = self.states[transition.target.name]
+
+            transition.target.incoming_transitions.append(transition)
+
+    def _peek(self) -> _Token:
+        return self.tokens[self.position]
+
+    def _next(self) -> _Token:
+        token: _Token = self.tokens[self.position]
+        if token.kind != "EOF":
+            self.position += 1
+
+        return token
+
+    def _expect(self, kind: str) -> _Token:
+        token: _Token = self._next()
+        if token.kind != kind:
+            raise self._error(token)
+
+        return token
+
+    def _error(self, token: _Token) -> FastParserError:
+        return FastParserError(
+            f"line {token.line}:{token.column} unexpected input {token.text}"
+        )
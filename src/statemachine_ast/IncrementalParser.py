@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import re
+from bisect import bisect_right
+from parser.StateMachineParser import StateMachineParser
+from typing import Iterator
+
+from antlr4 import BailErrorStrategy, CommonTokenStream, InputStream, PredictionMode, Token
+from antlr4.error.ErrorListener import ErrorListener
+from antlr4.error.Errors import ParseCancellationException
+from server.LRP import Location
+
+from .BuildASTVisitor import SinglePassBuildASTVisitor, StateRegistry
+from .RegexLexer import RegexLexer
+from .StateMachine import CompositeState, InitialState, State, StateMachine, Transition
+
+# Braces and semicolons never appear inside other tokens, so they can be matched on the
+# raw text to find the boundaries of top-level states without lexing the whole file.
+_DELIMITERS: re.Pattern = re.compile(r"[{};]")
+
+
+def reparse_incrementally(
+    state_machine: StateMachine, old_text: str, new_text: str, compact: bool = False
+) -> bool:
+    """Updates a state machine built from a source text to match a new version of this text.
+    Only the top-level states affected by the edit are parsed again, and the other
+    elements of the state machine keep their identity. Since ids are derived from the
+    paths of elements, all elements get the same ids as after a full parse.
+
+    The state machine is left untouched if the edit cannot be handled incrementally,
+    for instance if it modifies the header of the state machine or introduces errors,
+    in which case the new text must be parsed as a whole.
+
+    Args:
+        state_machine (StateMachine): state machine built from old_text.
+        old_text (str): source text from which state_machine was built.
+        new_text (str): new version of the source text.
+        compact (bool): if True, rebuilt elements keep no reference to the parse tree.
+
+    Returns:
+        bool: True if the state machine was updated, False otherwise.
+    """
+
+    if old_text == new_text:
+        return True
+
+    blocks: list[tuple[int, int]] | None = _find_top_level_blocks(old_text)
+    if blocks is None or len(blocks) != len(state_machine.states):
+        return False
+
+    # Bounds of the edited text, as the common prefix and suffix of both versions.
+    prefix: int = _common_prefix_length(old_text, new_text)
+    suffix: int = _common_suffix_length(old_text, new_text, prefix)
+    edit_end: int = len(old_text) - suffix
+    if prefix < blocks[0][0] or edit_end > blocks[-1][1]:
+        return False
+
+    block_ends: list[int] = [end for _, end in blocks]
+    first: int = min(bisect_right(block_ends, prefix), len(blocks) - 1)
+    last: int = min(bisect_right(block_ends, max(prefix, edit_end - 1)), len(blocks) - 1)
+
+    region_start: int = blocks[first][0]
+    old_region_end: int = blocks[last][1]
+    new_region_end: int = old_region_end + len(new_text) - len(old_text)
+
+    ctxs: list[StateMachineParser.State_ruleContext] | None = _parse_states(
+        new_text, region_start, new_region_end
+    )
+    if ctxs is None or len(ctxs) == 0:
+        return False
+
+    replaced_states: list[State] = state_machine.states[first : last + 1]
+    kept_states: list[State] = (
+        state_machine.states[:first] + state_machine.states[last + 1 :]
+    )
+
+    state_registry: StateRegistry = StateRegistry()
+    for state in _walk_states(kept_states):
+        if isinstance(state, CompositeState):
+            state_registry.composite_states[state.name] = state
+        else:
+            state_registry.simple_states[state.name] = state
+
+    # Any error is reported by the subsequent full parse. The builder adds the transitions
+    # of new states to the incoming transitions of the kept states they target, which are
+    # restored from the unchanged state machine when the edit is rejected.
+    try:
+        new_states: list[State] = SinglePassBuildASTVisitor(compact).build_states(
+            ctxs, state_registry
+        )
+    except Exception:
+        _rebuild_incoming_transitions(state_machine)
+        return False
+
+    retargeted_elements: list[tuple[Transition | InitialState, State]] | None = (
+        _resolve_kept_references(state_machine, kept_states, replaced_states, state_registry)
+    )
+    if retargeted_elements is None:
+        _rebuild_incoming_transitions(state_machine)
+        return False
+
+    # Initial states keep their parent state, which is restored as built.
+    for element, target in retargeted_elements:
+        element.target = target
+
+    _shift_locations(
+        state_machine.states[last + 1 :],
+        _position(old_text, old_region_end),
+        _position(new_text, new_region_end),
+    )
+    state_machine.states[first : last + 1] = new_states
+    _rebuild_incoming_transitions(state_machine)
+    state_machine.complete()
+
+    return True
+
+
+def _find_top_level_blocks(text: str) -> list[tuple[int, int]] | None:
+    """Finds the spans of the top-level states of a source text.
+    Each span starts where the previous one ends, the first one starts after the
+    initial state of the state machine and the last one ends before its closing brace,
+    so that any edit made between them falls into exactly one span."""
+
+    depth: int = 0
+    header_end: int | None = None
+    block_ends: list[int] = []
+
+    for delimiter in _DELIMITERS.finditer(text):
+        match delimiter.group():
+            case "{":
+                depth += 1
+            case "}":
+                depth -= 1
+                if depth == 1:
+                    block_ends.append(delimiter.end())
+                elif depth == 0:
+                    if header_end is None or len(block_ends) == 0:
+                        return None
+
+                    spans: list[tuple[int, int]] = []
+                    start: int = header_end
+                    for end in block_ends[:-1]:
+                        spans.append((start, end))
+                        start = end
+                    spans.append((start, delimiter.start()))
+                    return spans
+            case ";":
+                if depth == 1:
+                    if header_end is not None:
+                        return None
+
+                    header_end = delimiter.end()
+
+    return None
+
+
+def _parse_states(
+    text: str, start: int, end: int
+) -> list[StateMachineParser.State_ruleContext] | None:
+    lexer = RegexLexer(InputStream(text[start:end]))
+    lexer.line, lexer.column = _position(text, start)
+    lexer.removeErrorListeners()
+    lexer.addErrorListener(_BailErrorListener())
+    stream = CommonTokenStream(lexer)
+    parser = StateMachineParser(stream)
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    parser.removeErrorListeners()
+
+    ctxs: list[StateMachineParser.State_ruleContext] = []
+    try:
+        while stream.LA(1) != Token.EOF:
+            ctxs.append(parser.state_rule())
+    except ParseCancellationException:
+        return None
+
+    return ctxs
+
+
+class _BailErrorListener(ErrorListener):
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        raise ParseCancellationException(msg)
+
+
+def _resolve_kept_references(
+    state_machine: StateMachine,
+    kept_states: list[State],
+    replaced_states: list[State],
+    state_registry: StateRegistry,
+) -> list[tuple[Transition | InitialState, State]] | None:
+    """Resolves again by name the states referenced by kept elements among the replaced
+    states, without modifying the kept elements.
+
+    Returns:
+        list[tuple[Transition | InitialState, State]] | None: transitions and initial
+        states to retarget along with their new target, or None if a referenced state
+        no longer exists.
+    """
+
+    replaced_ids: set[int] = {id(state) for state in _walk_states(replaced_states)}
+    elements: list[Transition | InitialState] = []
+    if state_machine.initial_state is not None:
+        elements.append(state_machine.initial_state)
+    for state in _walk_states(kept_states):
+        elements.extend(state.outgoing_transitions)
+        if isinstance(state, CompositeState) and state.initial_state is not None:
+            elements.append(state.initial_state)
+
+    retargeted_elements: list[tuple[Transition | InitialState, State]] = []
+    for element in elements:
+        if id(element.target) in replaced_ids:
+            target: State | None = state_registry.get(element.target.name)
+            if target is None:
+                return None
+
+            retargeted_elements.append((element, target))
+
+    return retargeted_elements
+
+
+def _walk_states(states: list[State]) -> Iterator[State]:
+    # States are walked with an explicit stack, so that deeply nested composite states
+    # never exceed the recursion limit.
+    pending: list[State] = list(reversed(states))
+    while len(pending) > 0:
+        state: State = pending.pop()
+        yield state
+        pending.extend(reversed(state.states))
+
+
+def _shift_locations(
+    states: list[State], old_position: tuple[int, int], new_position: tuple[int, int]
+) -> None:
+    old_line, old_column = old_position
+    line_delta: int = new_position[0] - old_line
+    column_delta: int = new_position[1] - old_column
+
+    def shift(location: Location | None) -> Location | None:
+        if location is None:
+            return None
+
+        return Location(
+            location.line + line_delta,
+            location.endLine + line_delta,
+            location.column + (column_delta if location.line == old_line else 0),
+            location.endColumn + (column_delta if location.endLine == old_line else 0),
+        )
+
+    if line_delta == 0 and column_delta == 0:
+        return
+
+    for state in _walk_states(states):
+        state.location = shift(state.location)
+        for transition in state.outgoing_transitions:
+            transition.location = shift(transition.location)
+            transition.full_location = shift(transition.full_location)
+            for assignment in transition.assignments:
+                assignment.location = shift(assignment.location)
+
+
+def _rebuild_incoming_transitions(state_machine: StateMachine) -> None:
+    # Incoming transitions are listed in the same order as after a full parse.
+    states: list[State] = list(_walk_states(state_machine.states))
+    for state in states:
+        state.incoming_transitions = []
+        for transition in state.outgoing_transitions:
+            transition.target.incoming_transitions = []
+
+    for state in states:
+        for transition in state.outgoing_transitions:
+            transition.target.incoming_transitions.append(transition)
+
+
+def _position(text: str, offset: int) -> tuple[int, int]:
+    """Returns the line and column of an offset, as computed by the ANTLR lexer."""
+
+    return text.count("\n", 0, offset) + 1, offset - (text.rfind("\n", 0, offset) + 1)
+
+
+def _common_prefix_length(a: str, b: str) -> int:
+    low: int = 0
+    high: int = min(len(a), len(b))
+
+    while low < high:
+        middle: int = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
+
+
+def _common_suffix_length(a: str, b: str, prefix: int) -> int:
+    low: int = 0
+    high: int = min(len(a), len(b)) - prefix
+
+    while low < high:
+        middle: int = (low + high + 1) // 2
+        if a[len(a) - middle : len(a) - low] == b[len(b) - middle : len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
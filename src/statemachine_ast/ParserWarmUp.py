@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from antlr4 import InputStream
+
+from .SourceParser import ParsingStrategy, SyntaxErrorCollector, parse_source
+
+# Directory of the representative state machines parsed by default to warm up parsers.
+CORPUS_DIR: Path = Path(__file__).parent / "corpus"
+
+
+def warm_up(
+    strategy: ParsingStrategy = ParsingStrategy.SLL_THEN_LL, corpus_dir: str | None = None
+) -> int:
+    """Parses the source files of a corpus, so that the prediction caches of the ANTLR
+    parser, which are shared by all parsers of the process, are filled before the first
+    source file is parsed.
+
+    Args:
+        strategy (ParsingStrategy): strategy used to parse source files.
+        corpus_dir (str | None): directory of the source files to parse. If None, the bundled corpus is parsed.
+
+    Returns:
+        int: number of parsed source files.
+    """
+
+    # The hand-written parser hands source files with errors over to the ANTLR parser.
+    strategies: list[ParsingStrategy] = (
+        [strategy, ParsingStrategy.SLL_THEN_LL]
+        if strategy is ParsingStrategy.FAST
+        else [strategy]
+    )
+    source_files: list[Path] = sorted(
+        (CORPUS_DIR if corpus_dir is None else Path(corpus_dir)).glob("*.sm")
+    )
+
+    for source_file in source_files:
+        text: str = source_file.read_text(encoding="utf-8")
+        for corpus_strategy in strategies:
+            try:
+                parse_source(
+                    InputStream(text), corpus_strategy, True, SyntaxErrorCollector()
+                )
+            except Exception:
+                # Invalid source files still warm up the parser until their first error.
+                pass
+
+    return len(source_files)
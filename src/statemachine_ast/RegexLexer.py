@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import re
+from parser.StateMachineLexer import StateMachineLexer
+from parser.StateMachineParser import StateMachineParser
+
+from antlr4 import InputStream, Token
+from antlr4.Token import CommonToken
+from antlr4.CommonTokenFactory import CommonTokenFactory
+from antlr4.Lexer import TokenSource
+from antlr4.Recognizer import Recognizer
+
+# Alternatives are ordered so that the first matching one is also the one chosen by the
+# ANTLR lexer, which picks the longest match and the first rule in case of a tie.
+_TOKEN: re.Pattern = re.compile(
+    r"""
+    [ \t\r\n]*
+    (?:
+        (?P<COMPOSITE_STATE>composite\ state)
+        | (?P<WORD>[a-zA-Z_][a-zA-Z_0-9]*)
+        | (?P<TEXT>'[a-zA-Z]+')
+        | (?P<NUMBER>[0-9]+(?:\.[0-9]+)?)
+        | (?P<SYMBOL>->|!=|<=|>=|[{};:\[\]<>()+\-*/=.^])
+        | (?P<EOF>\Z)
+    )
+    """,
+    re.VERBOSE,
+)
+_NAME: re.Pattern = re.compile(r"[A-Z][a-zA-Z]*")
+
+_KEYWORD_TYPES: dict[str, int] = {
+    "StateMachine": StateMachineLexer.STATEMACHINE,
+    "state": StateMachineLexer.STATE,
+    "INITIAL": StateMachineLexer.INITIAL,
+    "FINAL": StateMachineLexer.FINAL,
+}
+_SYMBOL_TYPES: dict[str, int] = {
+    literal[1:-1]: token_type
+    for token_type, literal in enumerate(StateMachineParser.literalNames)
+    if literal.startswith("'")
+}
+
+
+class RegexLexer(Recognizer, TokenSource):
+    """Lexer emitting the same tokens as StateMachineLexer, with the same types and
+    locations, but matching them with a single regular expression instead of running
+    the ANTLR lexer simulator. It can replace StateMachineLexer as the token source of a
+    CommonTokenStream.
+
+    Since StateMachineLexer is the reference for error recovery, the remainder of the
+    input is handed over to it from the first character that cannot start a token.
+
+    Attributes:
+        line (int): line of the next character to lex, starting from 1.
+        column (int): column of the next character to lex, starting from 0.
+    """
+
+    def __init__(self, input: InputStream) -> None:
+        super().__init__()
+        self._input = input
+        self._text: str = str(input)
+        self._factory = CommonTokenFactory.DEFAULT
+        self._source: tuple[TokenSource, InputStream] = (self, input)
+        self._position: int = input.index
+        self._delegate: StateMachineLexer | None = None
+        self.line: int = 1
+        self.column: int = 0
+
+    @property
+    def inputStream(self) -> InputStream:
+        return self._input
+
+    def getInputStream(self) -> InputStream:
+        return self._input
+
+    def getSourceName(self) -> str:
+        return self._input.getSourceName()
+
+    def getLine(self) -> int:
+        return self.line
+
+    def getCharPositionInLine(self) -> int:
+        return self.column
+
+    def nextToken(self) -> Token:
+        if self._delegate is not None:
+            return self._delegate.nextToken()
+
+        text: str = self._text
+        position: int = self._position
+        match: re.Match | None = _TOKEN.match(text, position)
+        if match is None:
+            return self._hand_over()
+
+        start: int = match.start(match.lastindex)
+        if start > position:
+            last_newline: int = text.rfind("\n", position, start)
+            if last_newline < 0:
+                self.column += start - position
+            else:
+                self.line += text.count("\n", position, start)
+                self.column = start - last_newline - 1
+
+        kind: str = match.lastgroup
+        end: int = match.end()
+        if kind == "EOF":
+            self._position = start
+            self._input.seek(start)
+            token_type: int = Token.EOF
+        elif kind == "SYMBOL":
+            token_type = _SYMBOL_TYPES[match.group(kind)]
+        elif kind == "WORD":
+            word: str = match.group(kind)
+            token_type = _KEYWORD_TYPES.get(word) or (
+                StateMachineLexer.NAME
+                if _NAME.fullmatch(word)
+                else StateMachineLexer.VARIABLE
+            )
+        else:
+            token_type = getattr(StateMachineLexer, kind)
+
+        # Tokens take their line and column from their source, as with CommonTokenFactory.
+        token: CommonToken = CommonToken(
+            self._source, token_type, Token.DEFAULT_CHANNEL, start, end - 1
+        )
+
+        self._position = end
+        self.column += end - start
+        return token
+
+    def _hand_over(self) -> Token:
+        # Whitespaces before the offending character are skipped by StateMachineLexer.
+        self._delegate = StateMachineLexer(self._input)
+        self._delegate._listeners = self._listeners
+        self._delegate._factory = self._factory
+        self._input.seek(self._position)
+        self._delegate.line = self.line
+        self._delegate.column = self.column
+
+        return self._delegate.nextToken()
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from enum import Enum
+from parser.StateMachineParser import StateMachineParser
+
+from antlr4 import BailErrorStrategy, CommonTokenStream, InputStream, PredictionMode
+from antlr4.error.ErrorListener import ConsoleErrorListener, ErrorListener
+from antlr4.error.ErrorStrategy import DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+
+from .BuildASTVisitor import SinglePassBuildASTVisitor
+from .FastParser import FastParserError, parse_text
+from .RegexLexer import RegexLexer
+from .StateMachine import StateMachine
+
+
+class ParsingStrategy(Enum):
+    """Strategy used to parse source texts.
+
+    Attributes:
+        LL: ANTLR parser with full LL prediction only.
+        SLL_THEN_LL: ANTLR parser with faster SLL prediction first, then full LL prediction if SLL prediction fails.
+        FAST: hand-written parser first, then ANTLR parser as with SLL_THEN_LL if the source text has errors, so that they are reported the usual way. ASTs built by the hand-written parser never keep parse trees.
+    """
+
+    LL = "ll"
+    SLL_THEN_LL = "sll-ll"
+    FAST = "fast"
+
+
+def parse_source(
+    text_input: InputStream,
+    strategy: ParsingStrategy = ParsingStrategy.SLL_THEN_LL,
+    compact: bool = False,
+    error_listener: ErrorListener = ConsoleErrorListener.INSTANCE,
+) -> StateMachine:
+    """Parses a source text and builds the corresponding StateMachine.
+
+    Args:
+        text_input (InputStream): source text to parse.
+        strategy (ParsingStrategy): strategy used to parse the source text.
+        compact (bool): if True, the built AST keeps no reference to the parse tree.
+        error_listener (ErrorListener): listener notified of syntax errors. By default, errors are printed to the console.
+
+    Returns:
+        StateMachine: state machine built from the source text.
+    """
+
+    if strategy is ParsingStrategy.FAST:
+        try:
+            return parse_text(str(text_input))
+        except FastParserError:
+            strategy = ParsingStrategy.SLL_THEN_LL
+
+    lexer = RegexLexer(text_input)
+    lexer.removeErrorListeners()
+    lexer.addErrorListener(error_listener)
+    stream = CommonTokenStream(lexer)
+    parser = StateMachineParser(stream)
+
+    if strategy is ParsingStrategy.SLL_THEN_LL:
+        tree = _parse_with_sll(parser)
+        if tree is None:
+            parser.reset()
+            tree = _parse_with_ll(parser, error_listener)
+    else:
+        tree = _parse_with_ll(parser, error_listener)
+
+    visitor = SinglePassBuildASTVisitor(compact)
+    return visitor.visitStatemachine(tree)
+
+
+def _parse_with_sll(
+    parser: StateMachineParser,
+) -> StateMachineParser.StatemachineContext | None:
+    # Errors are not reported during this stage, since the input is parsed again with
+    # full LL prediction, which reports them, as soon as SLL prediction fails.
+    parser._interp.predictionMode = PredictionMode.SLL
+    parser._errHandler = BailErrorStrategy()
+    parser.removeErrorListeners()
+
+    try:
+        return parser.statemachine()
+    except ParseCancellationException:
+        return None
+
+
+def _parse_with_ll(
+    parser: StateMachineParser, error_listener: ErrorListener
+) -> StateMachineParser.StatemachineContext:
+    parser._interp.predictionMode = PredictionMode.LL
+    parser._errHandler = DefaultErrorStrategy()
+    parser.removeErrorListeners()
+    parser.addErrorListener(error_listener)
+
+    return parser.statemachine()
+
+
+class SyntaxErrorCollector(ErrorListener):
+    """Error listener collecting syntax errors instead of printing them.
+
+    Attributes:
+        errors (list[str]): messages of the collected errors, formatted as by the default console listener.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.errors: list[str] = []
+
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        self.errors.append(f"line {line}:{column} {msg}")
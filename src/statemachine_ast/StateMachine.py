@@ -1,20 +1,28 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any
+from typing import Any, Callable, Iterator
 
+import statemachine_ast.ExpressionCompiler as expressionCompilerModule
+import statemachine_ast.ExpressionOptimizer as expressionOptimizerModule
 from antlr4 import ParserRuleContext
 from server.LRP import Location, ModelElement
 from server.Runtime import ExpressionEvaluator
-from server.Utils import generate_uuid
+from server.VariableStore import VariableStore
 
+# Id of state machines, from which the ids of their elements are derived.
+ROOT_ID: str = "/"
 
-@dataclass
+
+# AST classes declare slots, since large ASTs are made of many small elements that
+# would each carry a dictionary otherwise.
+@dataclass(slots=True)
 class ASTElement:
     types: list[str]
-    id: str = field(default_factory=generate_uuid)
+    # Assigned once the whole state machine is built, see StateMachine.assign_ids.
+    id: str = ""
     location: Location | None = None
     parser_ctx: ParserRuleContext | None = None
 
@@ -30,8 +38,12 @@ class StateMachine(ASTElement):
         name (str): name of the state machine.
         initial_state (InitialState): initial state of the state machine.
         states (list[State]): list of the states directly contained in the state machine.
+        variables (tuple[str, ...]): names of the variables read or assigned by the state machine, by slot, in the order of their first appearance.
+        variable_slots (dict[str, int]): slots of the variables of the state machine, by name.
     """
 
+    __slots__ = ("name", "initial_state", "states", "variables", "variable_slots")
+
     def __init__(
         self,
         name: str,
@@ -42,6 +54,162 @@ class StateMachine(ASTElement):
         self.name = name
         self.initial_state: InitialState | None = None
         self.states: list[State] = []
+        self.variables: tuple[str, ...] = ()
+        self.variable_slots: dict[str, int] = {}
+
+    def complete(self) -> None:
+        """Assigns ids to the elements of the state machine, resolves its states and the
+        state changes of its transitions, indexes transitions by trigger, optimizes
+        their expressions and assigns slots to variables. Must be called once all the
+        states and transitions are created, and again whenever they change."""
+
+        self.assign_ids()
+        self.resolve_states()
+        self.index_triggers()
+        self.optimize_expressions()
+        self.assign_slots()
+
+    def assign_ids(self) -> None:
+        """Assigns to each element of the state machine an id made of its path from the
+        state machine, so that the same source text always gives the same ids. States
+        are designated by their name, which is unique, transitions by their trigger and
+        target, so that adding or removing a transition keeps the ids of the others, and
+        the elements of transitions by their position. Transitions of a state sharing
+        their trigger and target are told apart by their position among them. The state
+        machine itself has ROOT_ID, so that its ids do not change when it is renamed."""
+
+        self.id = ROOT_ID
+        pending: list[tuple[State, str]] = [(state, "") for state in reversed(self.states)]
+
+        while len(pending) > 0:
+            state, parent_id = pending.pop()
+            state.id = f"{parent_id}/{state.name}"
+            occurrences: dict[str, int] = {}
+            for transition in state.outgoing_transitions:
+                target: str = "FINAL" if transition.target.is_final else transition.target.name
+                path: str = f"{transition.trigger}->{target}"
+                occurrence: int = occurrences.get(path, 0)
+                occurrences[path] = occurrence + 1
+                if occurrence > 0:
+                    path = f"{path}#{occurrence}"
+
+                transition.assign_ids(f"{state.id}/transitions/{path}")
+
+            pending.extend((contained, state.id) for contained in reversed(state.states))
+
+    def resolve_states(self) -> None:
+        """Resolves the ancestors, the depth and the nested initial state of each state
+        of the state machine, final pseudo states included, and the states exited and
+        entered by each transition, so that the runtime looks them up instead of walking
+        the state machine."""
+
+        # States are resolved from the top, so that the states containing other states
+        # are resolved before them. Final pseudo states are contained by the state
+        # containing the source of their transition.
+        pending: list[tuple[State, State | None]] = [
+            (state, None) for state in reversed(self.states)
+        ]
+
+        while len(pending) > 0:
+            state, container = pending.pop()
+            state.resolve_ancestors(container)
+            for transition in state.outgoing_transitions:
+                if transition.target.is_final:
+                    transition.target.resolve_ancestors(container)
+
+            pending.extend((contained, state) for contained in reversed(state.states))
+
+        # Nested initial states are resolved once all the states are created, since
+        # initial states may target any state, and state changes once they are resolved.
+        states: list[State] = []
+        remaining: list[State] = list(self.states)
+        while len(remaining) > 0:
+            state = remaining.pop()
+            if isinstance(state, CompositeState):
+                state.resolve_nested_initial_state()
+
+            states.append(state)
+            remaining.extend(state.states)
+
+        for state in states:
+            for transition in state.outgoing_transitions:
+                transition.resolve_state_changes()
+
+    def index_triggers(self) -> None:
+        """Indexes by trigger the transitions that can be fired from each state of the
+        state machine."""
+
+        # States are indexed from the top, so that parent states are indexed before the
+        # states they contain.
+        pending: list[State] = list(reversed(self.states))
+
+        while len(pending) > 0:
+            state: State = pending.pop()
+            state.index_triggers()
+            pending.extend(reversed(state.states))
+
+    def optimize_expressions(self) -> None:
+        """Optimizes the expressions of the guards and assignments of the state machine,
+        which are evaluated in their optimized form. Identical subexpressions are shared
+        across the whole state machine."""
+
+        optimizer: expressionOptimizerModule.ExpressionOptimizer = (
+            expressionOptimizerModule.ExpressionOptimizer()
+        )
+        pending: list[State] = list(self.states)
+
+        while len(pending) > 0:
+            state: State = pending.pop()
+            pending.extend(state.states)
+
+            for transition in state.outgoing_transitions:
+                if transition.guard is not None:
+                    transition.guard.optimized_expression = optimizer.optimize(
+                        transition.guard.expression
+                    )
+                    transition.guard._compiled = None
+                for assignment in transition.assignments:
+                    assignment.optimized_expression = optimizer.optimize(
+                        assignment.expression
+                    )
+                    assignment._compiled = None
+
+    def assign_slots(self) -> None:
+        """Assigns to each variable of the state machine a slot, so that runtimes store
+        the values of variables in an array rather than by name, and compiles guards and
+        assignments reading and assigning variables by slot."""
+
+        guards: list[Guard] = []
+        assignments: list[Assignment] = []
+        pending: list[State] = list(reversed(self.states))
+        while len(pending) > 0:
+            state: State = pending.pop()
+            pending.extend(reversed(state.states))
+
+            for transition in state.outgoing_transitions:
+                if transition.guard is not None:
+                    guards.append(transition.guard)
+                assignments.extend(transition.assignments)
+
+        # Optimized expressions only read variables read by the original ones.
+        slots: dict[str, int] = {}
+        for element in [*guards, *assignments]:
+            for expression in iter_postfix(element.expression):
+                if type(expression) is VariableAtomicExpression:
+                    slots.setdefault(expression.variable, len(slots))
+            slots.setdefault(element.variable, len(slots))
+
+        self.variables = tuple(slots)
+        self.variable_slots = slots
+        # Functions compiled with former slots are discarded, since the elements of
+        # state machines are kept when their source is parsed again incrementally.
+        for guard in guards:
+            guard.variable_slots = slots
+            guard._compiled_slotted = None
+        for assignment in assignments:
+            assignment.slot = slots[assignment.variable]
+            assignment.variable_slots = slots
+            assignment._compiled_slotted = None
 
     def to_model_element(self) -> ModelElement:
         return to_model_element(
@@ -66,8 +234,25 @@ class State(ASTElement):
         outgoing_transitions (list[Transition]): list of transitions going out of the state.
         incoming_transitions (list[Transition]): list of transitions coming in the state.
         states (list[State]): list of the states directly contained by the state.
+        transitions_by_trigger (dict[str, list[Transition]] | None): transitions going out of the state or of its parent states, by trigger, those of the state coming first. None until the state machine is indexed.
+        available_triggers (tuple[str, ...]): triggers of the transitions that can be fired from the state, in the order of their first declaration.
+        ancestors (tuple[State, ...]): states containing the state, from the innermost one to the top-level. Empty until the state machine is resolved.
+        depth (int): number of ancestors of the state.
     """
 
+    __slots__ = (
+        "name",
+        "parent_state",
+        "is_final",
+        "outgoing_transitions",
+        "incoming_transitions",
+        "states",
+        "transitions_by_trigger",
+        "available_triggers",
+        "ancestors",
+        "depth",
+    )
+
     def __init__(
         self,
         name: str | None = None,
@@ -88,16 +273,51 @@ class State(ASTElement):
         self.outgoing_transitions: list[Transition] = []
         self.incoming_transitions: list[Transition] = []
         self.states: list[State] = []
+        self.transitions_by_trigger: dict[str, list[Transition]] | None = None
+        self.available_triggers: tuple[str, ...] = ()
+        self.ancestors: tuple[State, ...] = ()
+        self.depth: int = 0
+
+    def index_triggers(self) -> None:
+        """Indexes by trigger the transitions going out of the state or of its parent
+        states, which must be indexed beforehand."""
+
+        index: dict[str, list[Transition]] = {}
+        for transition in self.outgoing_transitions:
+            index.setdefault(transition.trigger, []).append(transition)
+
+        if self.parent_state is not None:
+            if len(index) == 0:
+                # Indexes are never modified, so they can be shared.
+                index = self.parent_state.transitions_by_trigger
+            else:
+                for trigger, transitions in self.parent_state.transitions_by_trigger.items():
+                    index.setdefault(trigger, []).extend(transitions)
+
+        self.transitions_by_trigger = index
+        self.available_triggers = tuple(index)
+
+    def resolve_ancestors(self, container: State | None) -> None:
+        """Resolves the ancestors and the depth of the state from the state containing it,
+        whose ancestors must be resolved beforehand. Ancestors follow the containment of
+        states rather than parent_state, which builders leave unset on composite states.
+
+        Args:
+            container (State | None): state containing the state, None at the top-level.
+        """
+
+        if container is None:
+            self.ancestors = ()
+        else:
+            self.ancestors = (container, *container.ancestors)
+        self.depth = len(self.ancestors)
 
     @abstractmethod
     def get_nested_initial_state(self) -> State:
         return self
 
     def get_depth(self) -> int:
-        if self.parent_state is None:
-            return 0
-        else:
-            return self.parent_state.get_depth() + 1
+        return self.depth
 
     def to_model_element(
         self,
@@ -133,6 +353,8 @@ class State(ASTElement):
 class SimpleState(State):
     """State that contains no other states."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         name: str | None = None,
@@ -157,8 +379,11 @@ class CompositeState(State):
 
     Attributes:
         initial_state (InitialState): initial state of the composite state.
+        nested_initial_state (State | None): simple state reached when entering the composite state, following initial states. None until the state machine is resolved, or if no simple state is reached.
     """
 
+    __slots__ = ("initial_state", "nested_initial_state")
+
     def __init__(
         self,
         name: str,
@@ -167,12 +392,30 @@ class CompositeState(State):
     ):
         super().__init__(name, None, False, location, ["CompositeState"], parser_ctx)
         self.initial_state: InitialState | None = None
+        self.nested_initial_state: State | None = None
+
+    def resolve_nested_initial_state(self) -> None:
+        """Resolves the simple state reached when entering the composite state, by
+        following initial states."""
+
+        # Initial states are followed iteratively, so that deeply nested composite
+        # states never exceed the recursion limit, and cycles are detected.
+        visited: set[int] = set()
+        state: State | None = self
+        while isinstance(state, CompositeState):
+            if state.initial_state is None or id(state) in visited:
+                state = None
+            else:
+                visited.add(id(state))
+                state = state.initial_state.target
+
+        self.nested_initial_state = state
 
     def get_nested_initial_state(self) -> State:
-        if self.initial_state is None:
+        if self.nested_initial_state is None:
             raise ValueError("No initial state.")
 
-        return self.initial_state.get_nested_initial_state()
+        return self.nested_initial_state
 
     def to_model_element(self) -> ModelElement:
         if self.initial_state is None:
@@ -193,6 +436,8 @@ class InitialState:
         parent_state (State): composite state containing the initial pseudo state. For initial states at the top-level, this attribute is None.
     """
 
+    __slots__ = ("target", "parent_state")
+
     def __init__(self, target: State) -> None:
         self.target = target
         self.parent_state = target.parent_state
@@ -208,8 +453,23 @@ class Transition(ASTElement):
         source (State): source state of the transition.
         target (State): target state of the transition.
         trigger (str): event required to fire the transition.
+        full_location (Location | None): location of the whole transition declaration, including its guard and assignments.
+        exited_state_ids (frozenset[str]): ids of the states exited when firing the transition from its source. Empty until the state machine is resolved.
+        entered_state_ids (frozenset[str]): ids of the states entered when firing the transition. Empty until the state machine is resolved.
     """
 
+    __slots__ = (
+        "source",
+        "target",
+        "trigger",
+        "guard",
+        "assignments",
+        "full_location",
+        "label",
+        "exited_state_ids",
+        "entered_state_ids",
+    )
+
     def __init__(
         self,
         source: State,
@@ -219,6 +479,7 @@ class Transition(ASTElement):
         assignments: list[Assignment] | None = None,
         location: Location | None = None,
         parser_ctx: ParserRuleContext | None = None,
+        full_location: Location | None = None,
     ):
         super().__init__(["Transition"], location=location, parser_ctx=parser_ctx)
         self.source = source
@@ -226,7 +487,100 @@ class Transition(ASTElement):
         self.trigger = trigger
         self.guard = guard
         self.assignments = assignments
+        self.full_location = full_location
         self.label = f"{source.name} -> {target.name}"
+        self.exited_state_ids: frozenset[str] = frozenset()
+        self.entered_state_ids: frozenset[str] = frozenset()
+
+    def assign_ids(self, id: str) -> None:
+        """Assigns an id to the transition, and ids derived from it to its guard, its
+        assignments and its final target state, if any.
+
+        Args:
+            id (str): id of the transition.
+        """
+
+        self.id = id
+        if self.guard is not None:
+            self.guard.id = f"{id}/guard"
+
+        for index, assignment in enumerate(self.assignments):
+            assignment.id = f"{id}/assignments/{index}"
+
+        if self.target.is_final:
+            self.target.id = f"{id}/target"
+
+    def resolve_state_changes(self) -> None:
+        """Resolves the ids of the states exited and entered when firing the transition,
+        from the resolved ancestors and nested initial states of its source and target."""
+
+        self.exited_state_ids = frozenset(state.id for state in self.get_exited_states())
+        self.entered_state_ids = frozenset(state.id for state in self.get_entered_states())
+
+    def get_exited_states(self) -> tuple[State, ...]:
+        """Returns the states exited when firing the transition from its source, i.e. the
+        source and its ancestors below the least common ancestor of the source and the
+        target. States contained by the source are exited as well when the transition is
+        fired from one of them.
+
+        Returns:
+            tuple[State, ...]: exited states, from the source to the top.
+        """
+
+        exited_states: tuple[State, ...] = (self.source, *self.source.ancestors)
+        common_ancestor: State | None = self._find_common_ancestor()
+        if common_ancestor is None:
+            return exited_states
+
+        return exited_states[: self.source.depth - common_ancestor.depth]
+
+    def get_entered_states(self) -> tuple[State, ...]:
+        """Returns the states entered when firing the transition, i.e. the target, its
+        ancestors below the least common ancestor of the source and the target, and the
+        states entered by following initial states from the target.
+
+        Returns:
+            tuple[State, ...]: entered states, from the nested initial state of the
+            target to the top.
+        """
+
+        entered_states: tuple[State, ...] = (self.target, *self.target.ancestors)
+        common_ancestor: State | None = self._find_common_ancestor()
+        if common_ancestor is not None:
+            entered_states = entered_states[: self.target.depth - common_ancestor.depth]
+
+        # Composite states without nested initial state are reported by the runtime when
+        # the transition is fired.
+        nested_initial_state: State | None = (
+            self.target.nested_initial_state
+            if isinstance(self.target, CompositeState)
+            else self.target
+        )
+        if nested_initial_state is None or nested_initial_state is self.target:
+            return entered_states
+
+        nested_states: tuple[State, ...] = (
+            nested_initial_state,
+            *nested_initial_state.ancestors,
+        )
+        target_index: int = nested_initial_state.depth - self.target.depth
+        if (
+            0 <= target_index < len(nested_states)
+            and nested_states[target_index] is self.target
+        ):
+            nested_states = nested_states[:target_index]
+
+        return nested_states + entered_states
+
+    def _find_common_ancestor(self) -> State | None:
+        # Least common proper ancestor, so that a transition from a state to itself
+        # exits and enters the state.
+        target_ancestors: set[int] = {id(ancestor) for ancestor in self.target.ancestors}
+        for ancestor in self.source.ancestors:
+            if id(ancestor) in target_ancestors:
+                return ancestor
+
+        return None
 
     def to_model_element(self) -> ModelElement:
         refs: dict = {}
@@ -248,11 +602,47 @@ class Transition(ASTElement):
 
 
 class Guard(ASTElement):
+    __slots__ = (
+        "variable",
+        "expression",
+        "comparator",
+        "optimized_expression",
+        "variable_slots",
+        "_compiled",
+        "_compiled_slotted",
+    )
+
     def __init__(self, variable: str, expression: Expression, comparator: Comparator):
         super().__init__(["Guard"])
         self.variable = variable
         self.expression = expression
         self.comparator = comparator
+        # Expression evaluated instead of the displayed one, once optimized.
+        self.optimized_expression: Expression = expression
+        # Slots of variables, once assigned by the state machine.
+        self.variable_slots: dict[str, int] = {}
+        self._compiled: Callable[[dict[str, float]], bool] | None = None
+        self._compiled_slotted: Callable[[VariableStore], bool] | None = None
+
+    def compile(self) -> Callable[[dict[str, float]], bool]:
+        """Compiles the guard into a function evaluating it from the values of variables.
+        The function is compiled on the first call and then cached."""
+
+        if self._compiled is None:
+            self._compiled = expressionCompilerModule.compile_guard(self)
+
+        return self._compiled
+
+    def compile_slotted(self) -> Callable[[VariableStore], bool]:
+        """Compiles the guard into a function evaluating it from the values of variables
+        stored by slot. The function is compiled on the first call and then cached."""
+
+        if self._compiled_slotted is None:
+            self._compiled_slotted = expressionCompilerModule.compile_guard(
+                self, self.variable_slots
+            )
+
+        return self._compiled_slotted
 
     def to_model_element(self) -> ModelElement:
         return to_model_element(
@@ -268,6 +658,17 @@ class Guard(ASTElement):
 
 
 class Assignment(ASTElement):
+    __slots__ = (
+        "variable",
+        "expression",
+        "label",
+        "optimized_expression",
+        "slot",
+        "variable_slots",
+        "_compiled",
+        "_compiled_slotted",
+    )
+
     def __init__(
         self,
         variable: str,
@@ -279,6 +680,40 @@ class Assignment(ASTElement):
         self.variable = variable
         self.expression = expression
         self.label = f"{variable} = {expression.value()}"
+        # Expression evaluated instead of the displayed one, once optimized.
+        self.optimized_expression: Expression = expression
+        # Slot of the variable and slots of variables, once assigned by the state machine.
+        self.slot: int = -1
+        self.variable_slots: dict[str, int] = {}
+        self._compiled: Callable[[dict[str, float]], float] | None = None
+        self._compiled_slotted: Callable[[VariableStore], float] | None = None
+
+    def compile(self) -> Callable[[dict[str, float]], float]:
+        """Compiles the optimized expression of the assignment into a function evaluating
+        it from the values of variables. The function is compiled on the first call and
+        then cached."""
+
+        # The function is cached by the assignment rather than by its optimized
+        # expression, which may be shared by many assignments: calling the same few
+        # functions from every transition is slower than a function per assignment.
+        if self._compiled is None:
+            self._compiled = expressionCompilerModule.compile_expression(
+                self.optimized_expression
+            )
+
+        return self._compiled
+
+    def compile_slotted(self) -> Callable[[VariableStore], float]:
+        """Compiles the optimized expression of the assignment into a function evaluating
+        it from the values of variables stored by slot. The function is compiled on the first
+        call and then cached."""
+
+        if self._compiled_slotted is None:
+            self._compiled_slotted = expressionCompilerModule.compile_expression(
+                self.optimized_expression, self.variable_slots
+            )
+
+        return self._compiled_slotted
 
     def to_model_element(self) -> ModelElement:
         return to_model_element(
@@ -291,6 +726,8 @@ class Assignment(ASTElement):
 
 
 class Expression:
+    __slots__ = ("_compiled",)
+
     @abstractmethod
     def value(self) -> str:
         pass
@@ -299,34 +736,44 @@ class Expression:
     def accept(self, evaluator: ExpressionEvaluator) -> float:
         pass
 
+    def compile(self) -> Callable[[dict[str, float]], float]:
+        """Compiles the expression into a function evaluating it from the values of
+        variables. The function is compiled on the first call and then cached."""
 
-@dataclass
+        # The slot is left unset until then, since dataclasses do not initialize it.
+        try:
+            return self._compiled
+        except AttributeError:
+            self._compiled = expressionCompilerModule.compile_expression(self)
+            return self._compiled
+
+
+@dataclass(slots=True)
 class BinaryExpression(Expression):
     left: Expression
     right: Expression
     operand: Operand
 
     def value(self) -> str:
-        return f"{self.left.value()} {self.operand.value} {self.right.value()}"
+        return _format_expression(self)
 
     def accept(self, evaluator: ExpressionEvaluator) -> float:
         return evaluator.evaluate_binary_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class ParenthesizedExpression(Expression):
     contained_expression: Expression
     sign: Sign | None = None
 
     def value(self) -> str:
-        sign_value: str = "" if self.sign is None else self.sign
-        return f"{sign_value}({self.contained_expression.value()})"
+        return _format_expression(self)
 
     def accept(self, evaluator: ExpressionEvaluator) -> float:
         return evaluator.evaluate_parenthesized_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class NumberAtomicExpression(Expression):
     number: float
     sign: Sign | None = None
@@ -339,7 +786,7 @@ class NumberAtomicExpression(Expression):
         return evaluator.evaluate_number_atomic_expression(self)
 
 
-@dataclass
+@dataclass(slots=True)
 class VariableAtomicExpression(Expression):
     variable: str
     sign: Sign | None = None
@@ -352,6 +799,62 @@ class VariableAtomicExpression(Expression):
         return evaluator.evaluate_variable_atomic_expression(self)
 
 
+def iter_postfix(expression: Expression) -> Iterator[Expression]:
+    """Iterates over an expression and its subexpressions in postfix order, each
+    expression coming after its operands. An explicit stack is used instead of recursion,
+    so that long chains of operations, which make deep trees, never exceed the recursion
+    limit.
+
+    Args:
+        expression (Expression): expression to iterate over.
+
+    Yields:
+        Expression: the subexpressions of the expression, then the expression itself.
+    """
+
+    pending: list[tuple[Expression, bool]] = [(expression, False)]
+
+    while len(pending) > 0:
+        current, expanded = pending.pop()
+
+        if isinstance(current, BinaryExpression) and not expanded:
+            pending.append((current, True))
+            pending.append((current.right, False))
+            pending.append((current.left, False))
+        elif isinstance(current, ParenthesizedExpression) and not expanded:
+            pending.append((current, True))
+            pending.append((current.contained_expression, False))
+        else:
+            yield current
+
+
+def _format_expression(expression: Expression) -> str:
+    # Pieces are joined once at the end, since concatenating the values of operands
+    # would take quadratic time on long chains of operations.
+    pieces: list[str] = []
+    pending: list[Expression | str] = [expression]
+
+    while len(pending) > 0:
+        current: Expression | str = pending.pop()
+        current_type: type = type(current)
+
+        if current_type is str:
+            pieces.append(current)
+        elif current_type is BinaryExpression:
+            pending.append(current.right)
+            pending.append(f" {current.operand.value} ")
+            pending.append(current.left)
+        elif current_type is ParenthesizedExpression:
+            sign_value: str = "" if current.sign is None else current.sign
+            pieces.append(f"{sign_value}(")
+            pending.append(")")
+            pending.append(current.contained_expression)
+        else:
+            pieces.append(current.value())
+
+    return "".join(pieces)
+
+
 class Comparator(Enum):
     EQ = "="
     NOT_EQ = "!="
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+from antlr4 import InputStream
+
+from . import ASTSerializer
+from .SourceParser import ParsingStrategy, SyntaxErrorCollector, parse_source
+from .StateMachine import StateMachine
+
+
+@dataclass
+class ParsedSource:
+    """Result of the parsing of a source file in a worker process.
+
+    Attributes:
+        source_file (str): parsed source file.
+        state_machine (StateMachine | None): state machine built from the source file, or None if it could not be built.
+        parse_time (float): time spent parsing the source file and building its AST, in milliseconds.
+        errors (list[str]): errors raised while parsing the source file.
+    """
+
+    source_file: str
+    state_machine: StateMachine | None
+    parse_time: float
+    errors: list[str] = field(default_factory=list)
+
+
+def parse_sources(
+    sources: dict[str, str],
+    strategy: ParsingStrategy = ParsingStrategy.SLL_THEN_LL,
+    max_workers: int | None = None,
+) -> list[ParsedSource]:
+    """Parses several source texts in parallel across a pool of processes.
+    ASTs are sent back from the worker processes in the compact form produced by
+    ASTSerializer, so they never contain parse trees.
+
+    Args:
+        sources (dict[str, str]): source files mapped to their text.
+        strategy (ParsingStrategy): strategy used to parse the source texts.
+        max_workers (int | None): maximum number of worker processes. If None, one process per processor is used.
+
+    Returns:
+        list[ParsedSource]: result of the parsing of each source file, in the same order as sources.
+    """
+
+    if len(sources) == 0:
+        return []
+
+    workers: int = min(max_workers or os.cpu_count() or 1, len(sources))
+    if workers == 1:
+        # Not worth starting a process whose parser caches are cold.
+        return [
+            _to_parsed_source(*_parse_source(source_file, text, strategy))
+            for source_file, text in sources.items()
+        ]
+
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(
+            _parse_source,
+            sources.keys(),
+            sources.values(),
+            [strategy] * len(sources),
+        )
+
+        return [_to_parsed_source(*result) for result in results]
+
+
+def _to_parsed_source(
+    source_file: str, serialized_ast: bytes | None, parse_time: float, errors: list[str]
+) -> ParsedSource:
+    return ParsedSource(
+        source_file,
+        None if serialized_ast is None else ASTSerializer.loads(serialized_ast),
+        parse_time,
+        errors,
+    )
+
+
+def _parse_source(
+    source_file: str, text: str, strategy: ParsingStrategy
+) -> tuple[str, bytes | None, float, list[str]]:
+    start: float = time.perf_counter()
+    error_collector: SyntaxErrorCollector = SyntaxErrorCollector()
+
+    try:
+        state_machine: StateMachine = parse_source(
+            InputStream(text), strategy, True, error_collector
+        )
+        serialized_ast: bytes | None = ASTSerializer.dumps(state_machine)
+    except Exception as error:
+        serialized_ast = None
+        error_collector.errors.append(str(error))
+
+    return (
+        source_file,
+        serialized_ast,
+        (time.perf_counter() - start) * 1000,
+        error_collector.errors,
+    )
@@ -0,0 +1,9 @@
+"""Configuration shared by the tests.
+
+Tests are run from the root of the project, e.g. `python3 -m pytest tests`.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
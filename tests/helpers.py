@@ -0,0 +1,236 @@
+"""Helpers shared by the tests."""
+
+import math
+import random
+from typing import Any, Callable
+
+from antlr4 import InputStream
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import Expression, Guard, State, StateMachine, Transition
+
+# Imported after StateMachine, which imports Runtime while it is being initialized.
+from server.Runtime import Runtime, Step  # noqa: E402, I001
+
+VARIABLES: list[str] = ["va", "vb", "vc", "vd", "ve"]
+
+
+def parse(source: str) -> StateMachine:
+    return parse_source(InputStream(source), ParsingStrategy.FAST)
+
+
+def parse_expression(expression: str) -> Expression:
+    """Returns the expression assigned by a state machine with a single assignment."""
+
+    state_machine: StateMachine = parse(
+        f"StateMachine E {{ INITIAL -> A; state A {{ -> A : 'step' / {{ va = {expression}; }}; }} }}"
+    )
+    return transitions(state_machine)[0].assignments[0].expression
+
+
+def parse_guard(guard: str) -> Guard:
+    """Returns the guard of a state machine with a single guarded transition."""
+
+    state_machine: StateMachine = parse(
+        f"StateMachine G {{ INITIAL -> A; state A {{ -> A : 'step' [{guard}]; }} }}"
+    )
+    return transitions(state_machine)[0].guard
+
+
+def transitions(state_machine: StateMachine) -> list[Transition]:
+    """Returns the transitions of a state machine, states being walked from the top."""
+
+    result: list[Transition] = []
+    pending: list[State] = list(reversed(state_machine.states))
+    while len(pending) > 0:
+        state: State = pending.pop()
+        result.extend(state.outgoing_transitions)
+        pending.extend(reversed(state.states))
+
+    return result
+
+
+def states(state_machine: StateMachine) -> list[State]:
+    """Returns the states of a state machine, walked from the top."""
+
+    result: list[State] = []
+    pending: list[State] = list(reversed(state_machine.states))
+    while len(pending) > 0:
+        state: State = pending.pop()
+        result.append(state)
+        pending.extend(reversed(state.states))
+
+    return result
+
+
+def link_composite_parents(state_machine: StateMachine) -> StateMachine:
+    """Sets the parent state of composite states, which builders leave unset, so that
+    states inherit the transitions of all the states containing them, and indexes the
+    state machine again."""
+
+    for state in states(state_machine):
+        for contained_state in state.states:
+            contained_state.parent_state = state
+    state_machine.index_triggers()
+
+    return state_machine
+
+
+def outcome(function: Callable[[], Any]) -> Any:
+    """Returns the result of a function, or the type of the error it raises."""
+
+    try:
+        result: Any = function()
+    except Exception as error:
+        return type(error)
+
+    return "nan" if isinstance(result, float) and math.isnan(result) else result
+
+
+def random_expression(rng: random.Random, size: int) -> str:
+    if size <= 1 or rng.random() < 0.15:
+        atom: str = (
+            rng.choice(VARIABLES)
+            if rng.random() < 0.5
+            else rng.choice(["0", "1", "2.5", "10", "1" + "0" * 400])
+        )
+        return rng.choice(["", "", "-", "+"]) + atom
+
+    if rng.random() < 0.2:
+        return f"({random_expression(rng, size - 1)})"
+
+    left_size: int = rng.randint(1, size - 1)
+    return (
+        f"{random_expression(rng, left_size)} {rng.choice('+-*/')}"
+        f" {random_expression(rng, size - left_size)}"
+    )
+
+
+def random_source(rng: random.Random, transitions: int) -> str:
+    """Generates a state machine whose transitions have random guards and assignments."""
+
+    lines: list[str] = ["StateMachine Random {", "INITIAL -> A;", "state A {"]
+    for _ in range(transitions):
+        expression: str = random_expression(rng, rng.randint(1, 12))
+        guard: str = f"{rng.choice(VARIABLES)} {rng.choice(['=', '!=', '<', '<=', '>', '>='])}"
+        lines.append(
+            f"-> A : 'step' [{guard} {expression}]"
+            f" / {{ {rng.choice(VARIABLES)} = {random_expression(rng, rng.randint(1, 12))}; }};"
+        )
+    lines.append("} }")
+
+    return "\n".join(lines)
+
+
+def random_hierarchy_source(rng: random.Random, size: int) -> str:
+    """Generates a state machine whose states are nested at random in composite states,
+    every state having a few outgoing transitions, some of them guarded, to random states
+    at any level or to final states. Triggers are shared by the transitions of different
+    states."""
+
+    # Names cannot contain digits, which are spelled with letters.
+    names: list[str] = [
+        "N" + "".join(chr(ord("a") + int(digit)) for digit in str(index))
+        for index in range(size)
+    ]
+    children: dict[str | None, list[str]] = {None: [names[0]]}
+    for name in names[1:]:
+        parent: str | None = rng.choice([None, *[n for n in children if n is not None]])
+        children.setdefault(parent, []).append(name)
+        if rng.random() < 0.4:
+            children[name] = []
+
+    def transitions(indent: str) -> list[str]:
+        lines: list[str] = []
+        for _ in range(rng.randint(0, 4)):
+            guard: str = ""
+            if rng.random() < 0.4:
+                guard = f" [x {rng.choice(['<', '>='])} {rng.randint(0, 30)}]"
+            target: str = "FINAL" if rng.random() < 0.02 else rng.choice(names)
+            lines.append(
+                f"{indent}-> {target} : '{rng.choice(['go', 'up', 'down', 'tick'])}'{guard}"
+                " / { x = x + 1; };"
+            )
+        return lines
+
+    def state(name: str, indent: str) -> list[str]:
+        if len(children.get(name, [])) == 0:
+            return [f"{indent}state {name} {{", *transitions(indent + "    "), f"{indent}}}"]
+
+        return [
+            f"{indent}composite state {name} {{",
+            *transitions(indent + "    "),
+            f"{indent}    INITIAL -> {rng.choice(children[name])};",
+            *[line for child in children[name] for line in state(child, indent + "    ")],
+            f"{indent}}}",
+        ]
+
+    lines: list[str] = [
+        "StateMachine Random {",
+        "    INITIAL -> Start;",
+        f"    state Start {{ -> {names[0]} : 'start' / {{ x = 0; }}; }}",
+    ]
+    for name in children[None]:
+        lines.extend(state(name, "    "))
+    lines.append("}")
+
+    return "\n".join(lines) + "\n"
+
+
+def random_variables(rng: random.Random) -> dict[str, float]:
+    # Some variables are left unassigned, so that evaluations can raise KeyError.
+    return {
+        variable: rng.choice([0.0, -1.0, 2.0, 0.5, 1e308, rng.uniform(-100, 100)])
+        for variable in VARIABLES
+        if rng.random() < 0.9
+    }
+
+
+def run(
+    runtime_class: type, state_machine: StateMachine, steps: int, seed: int = 0
+) -> list[list[str]]:
+    """Executes steps chosen at random, and returns the names of the steps available
+    before each of them."""
+
+    rng: random.Random = random.Random(seed)
+    runtime: Runtime = runtime_class(state_machine)
+    offered_steps: list[list[str]] = []
+
+    for _ in range(steps):
+        available_steps: list[Step] = sorted(
+            runtime.available_steps.values(), key=lambda step: step.name
+        )
+        offered_steps.append([step.name for step in available_steps])
+        if len(available_steps) == 0:
+            break
+
+        step: Step = rng.choice(available_steps)
+        if step.is_composite:
+            runtime.enter_composite_step(step.id)
+        else:
+            runtime.execute_atomic_step(step.id)
+
+    return offered_steps
+
+
+class ScanningRuntime(Runtime):
+    """Runtime looking up transitions by scanning the transitions of the current state
+    and of its parent states, as before transitions were indexed."""
+
+    def _find_possible_events(self) -> list[str]:
+        return list(dict.fromkeys(t.trigger for t in self._find_possible_transitions()))
+
+    def _find_possible_transitions(self, event: str | None = None) -> list[Transition]:
+        available_transitions: list[Transition] = []
+        state: State | None = self.current_state
+
+        while state is not None:
+            for transition in state.outgoing_transitions:
+                if event is None or event == transition.trigger:
+                    if transition.guard is None or self.guard_evaluator.evaluate(
+                        transition.guard
+                    ):
+                        available_transitions.append(transition)
+
+            state = state.parent_state
+
+        return available_transitions
@@ -0,0 +1,51 @@
+import random
+
+import pytest
+from helpers import (
+    ScanningRuntime,
+    link_composite_parents,
+    parse,
+    random_hierarchy_source,
+    run,
+    states,
+)
+from server.Runtime import Runtime
+from statemachine_ast.StateMachine import State, StateMachine, Transition
+
+
+def climb(state: State) -> dict[str, list[Transition]]:
+    """Returns the transitions going out of a state and of its parent states by trigger,
+    found by climbing from the state to its parent states."""
+
+    climbed: dict[str, list[Transition]] = {}
+    current: State | None = state
+    while current is not None:
+        for transition in current.outgoing_transitions:
+            climbed.setdefault(transition.trigger, []).append(transition)
+        current = current.parent_state
+
+    return climbed
+
+
+@pytest.fixture(params=[(seed, linked) for seed in range(20) for linked in (False, True)])
+def state_machine(request: pytest.FixtureRequest) -> StateMachine:
+    seed, linked = request.param
+    state_machine: StateMachine = parse(random_hierarchy_source(random.Random(seed), 60))
+
+    return link_composite_parents(state_machine) if linked else state_machine
+
+
+def test_effective_transitions_are_those_found_by_climbing(state_machine: StateMachine):
+    for state in states(state_machine):
+        climbed: dict[str, list[Transition]] = climb(state)
+
+        # Triggers keep the order of their first declaration, from the state up.
+        assert list(state.transitions_by_trigger.items()) == list(climbed.items())
+        assert state.available_triggers == tuple(climbed)
+
+
+def test_runtimes_offer_the_same_steps_as_climbing(state_machine: StateMachine):
+    for seed in range(3):
+        assert run(Runtime, state_machine, 200, seed) == run(
+            ScanningRuntime, state_machine, 200, seed
+        )
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+from helpers import (
+    VARIABLES,
+    outcome,
+    parse,
+    parse_expression,
+    parse_guard,
+    random_source,
+    random_variables,
+    transitions,
+)
+from server.Runtime import ExpressionEvaluator, GuardEvaluator
+from statemachine_ast.StateMachine import Expression, Guard, StateMachine
+
+
+@pytest.mark.parametrize(
+    ("expression", "variables", "expected"),
+    [
+        ("va + vb * 2", {"va": 1.0, "vb": 2.0}, 5.0),
+        ("va - vb - vc", {"va": 1.0, "vb": 2.0, "vc": 3.0}, -4.0),
+        ("va / (vb - 3) * -2", {"va": 1.0, "vb": 1.0}, 1.0),
+        ("va - -vb", {"va": 1.0, "vb": 2.0}, 3.0),
+        ("1" + "0" * 400 + " - va", {"va": 1.0}, float("inf")),
+        ("1" + "0" * 400 + " - 1" + "0" * 400, {}, "nan"),
+        ("va / 0", {"va": 1.0}, ZeroDivisionError),
+        ("va ^ 2", {"va": 3.0}, TypeError),
+        ("vz + 1 / 0", {}, KeyError),
+        # Operands are evaluated from left to right, raising the first error.
+        ("1 / 0 + vz", {}, ZeroDivisionError),
+        ("va * (vb / 0 + vz)", {"va": 1.0, "vb": 1.0}, ZeroDivisionError),
+    ],
+)
+def test_compiled_expression_matches_interpreter(
+    expression: str, variables: dict[str, float], expected: object
+):
+    parsed: Expression = parse_expression(expression)
+
+    assert outcome(lambda: parsed.compile()(variables)) == expected
+    assert outcome(lambda: ExpressionEvaluator(variables).evaluate(parsed)) == expected
+
+
+@pytest.mark.parametrize(
+    ("guard", "variables", "expected"),
+    [
+        ("va < vb + 1", {"va": 1.0, "vb": 0.5}, True),
+        ("va >= vb * 2", {"va": 1.0, "vb": 1.0}, False),
+        ("va = vb", {"va": 2.0, "vb": 2.0}, True),
+        ("va != vb", {"va": 2.0, "vb": 2.0}, False),
+        ("va <= vb / 0", {"va": 2.0, "vb": 2.0}, ZeroDivisionError),
+        ("vz > 1", {}, KeyError),
+        # The expression is evaluated before the variable is read.
+        ("vz < 1 / 0", {}, ZeroDivisionError),
+    ],
+)
+def test_compiled_guard_matches_interpreter(
+    guard: str, variables: dict[str, float], expected: object
+):
+    parsed: Guard = parse_guard(guard)
+    evaluator: GuardEvaluator = GuardEvaluator(ExpressionEvaluator(variables), variables)
+
+    assert outcome(lambda: parsed.compile()(variables)) == expected
+    assert outcome(lambda: evaluator.evaluate(parsed)) == expected
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        " + ".join(f"{VARIABLES[i % len(VARIABLES)]} * {i}" for i in range(10000)),
+        " - ".join(["vb"] * 10000),
+        "(" * 100 + "vb" + ")" * 100,
+        # Nested to the right, so that local variables must be assigned in order.
+        "".join(f"va / {i + 1} - (" for i in range(300)) + "vb" + ")" * 300,
+    ],
+    ids=["sum", "difference", "parentheses", "right nested"],
+)
+def test_long_expressions_compile(expression: str):
+    parsed: Expression = parse_expression(expression)
+    variables: dict[str, float] = {variable: 1.5 for variable in VARIABLES}
+
+    assert parsed.compile()(variables) == ExpressionEvaluator(variables).evaluate(parsed)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_expressions_match_interpreter(seed: int):
+    rng: random.Random = random.Random(seed)
+    state_machine: StateMachine = parse(random_source(rng, 100))
+
+    for transition in transitions(state_machine):
+        for _ in range(10):
+            variables: dict[str, float] = random_variables(rng)
+            expression_evaluator: ExpressionEvaluator = ExpressionEvaluator(variables)
+            guard_evaluator: GuardEvaluator = GuardEvaluator(expression_evaluator, variables)
+            guard: Guard = transition.guard
+            assert outcome(lambda: guard.compile()(variables)) == outcome(
+                lambda: guard_evaluator.evaluate(guard)
+            ), guard.expression.value()
+
+            for assignment in transition.assignments:
+                assert outcome(lambda: assignment.expression.compile()(variables)) == outcome(
+                    lambda: expression_evaluator.evaluate(assignment.expression)
+                ), assignment.expression.value()
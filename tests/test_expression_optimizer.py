@@ -0,0 +1,166 @@
+import random
+
+import pytest
+from helpers import (
+    outcome,
+    parse,
+    parse_expression,
+    random_expression,
+    random_source,
+    random_variables,
+    run,
+    transitions,
+)
+from server.Runtime import ExpressionEvaluator, GuardEvaluator, Runtime
+from statemachine_ast.ExpressionOptimizer import ExpressionOptimizer
+from statemachine_ast.StateMachine import (
+    Assignment,
+    BinaryExpression,
+    Expression,
+    NumberAtomicExpression,
+    StateMachine,
+)
+
+# Guards and assignments with constant and repeated subexpressions.
+CONSTANTS_SOURCE: str = """StateMachine Constants {
+    INITIAL -> Start;
+    state Start { -> A : 'start' / { va = 1; vb = 2; vc = 3; }; }
+    state A {
+        -> B : 'go' [va < vb * 2 / 3 + 4 * 5 - 6] / { va = va + 2 * 3 - 1; vb = (vc - 1 / 4) * (vc - 1 / 4) / 10; };
+        -> A : 'tick' [vc >= va * 7 / 3] / { vc = vc + 1; };
+        -> Start : 'reset';
+    }
+    state B {
+        -> A : 'go' [va < vb * 2 / 3 + 4 * 5 - 6] / { vb = vb - 2 * 3; };
+        -> B : 'tick' [vb != vc * 9] / { va = (va - 1 / 4) * (va - 1 / 4) / 10; };
+    }
+}
+"""
+
+
+def optimize(expression: str) -> Expression:
+    return ExpressionOptimizer().optimize(parse_expression(expression))
+
+
+@pytest.mark.parametrize(
+    ("expression", "optimized"),
+    [
+        ("va + 2 * 3 - 1", "va + 6.0 - 1.0"),
+        ("(2 + 3) * va", "5.0 * va"),
+        ("-2 * 3 + va", "-6.0 + va"),
+        ("((va))", "va"),
+        ("va / (1 - 1)", "va / 0.0"),
+        # Operations raising errors are left to evaluation.
+        ("1 / 0 + va", "1.0 / 0.0 + va"),
+    ],
+)
+def test_constants_are_folded(expression: str, optimized: str):
+    assert optimize(expression).value() == optimized
+
+
+def test_operations_are_not_reordered():
+    # Floating-point additions are not associative, so 2 + 3 is not folded.
+    optimized: Expression = optimize("va + 2 + 3")
+
+    assert isinstance(optimized, BinaryExpression)
+    assert isinstance(optimized.left, BinaryExpression)
+    assert optimized.value() == "va + 2.0 + 3.0"
+
+
+def test_identical_subexpressions_are_shared():
+    optimizer: ExpressionOptimizer = ExpressionOptimizer()
+    product: Expression = optimizer.optimize(parse_expression("(va - 1) * (va - 1)"))
+    other: Expression = optimizer.optimize(parse_expression("vb + (va - 1)"))
+
+    assert product.left is product.right
+    assert other.right is product.left
+
+
+def test_original_expressions_are_left_unchanged(monkeypatch: pytest.MonkeyPatch):
+    state_machine: StateMachine = parse(CONSTANTS_SOURCE)
+    assignment: Assignment = transitions(state_machine)[1].assignments[0]
+
+    assert assignment.expression.value() == "va + 2.0 * 3.0 - 1.0"
+    assert assignment.optimized_expression.value() == "va + 6.0 - 1.0"
+    assert isinstance(assignment.optimized_expression.left.right, NumberAtomicExpression)
+
+    monkeypatch.setattr(StateMachine, "optimize_expressions", lambda state_machine: None)
+    assert [
+        assignment.expression
+        for transition in transitions(state_machine)
+        for assignment in transition.assignments
+    ] == [
+        assignment.expression
+        for transition in transitions(parse(CONSTANTS_SOURCE))
+        for assignment in transition.assignments
+    ]
+
+
+def test_assignments_sharing_an_expression_are_compiled_separately():
+    state_machine: StateMachine = parse(
+        "StateMachine Shared {\n"
+        "    INITIAL -> A;\n"
+        "    state A { -> B : 'go' / { va = vb + 2 * 3; }; }\n"
+        "    state B { -> A : 'go' / { va = vb + 6; }; }\n"
+        "}\n"
+    )
+    first, second = (transition.assignments[0] for transition in transitions(state_machine))
+
+    assert first.optimized_expression is second.optimized_expression
+    assert first.compile() is not second.compile()
+    assert first.compile() is first.compile()
+    assert first.compile()({"vb": 1.0}) == second.compile()({"vb": 1.0}) == 7.0
+
+
+def right_nested_source(rng: random.Random, depth: int) -> str:
+    expression: str = random_expression(rng, 3)
+    for _ in range(depth):
+        expression = f"{random_expression(rng, 3)} {rng.choice('+-*/')} ({expression})"
+
+    return (
+        "StateMachine Nested { INITIAL -> A; state A {"
+        f" -> A : 'step' [va < {expression}] / {{ va = {expression}; }}; }} }}"
+    )
+
+
+@pytest.mark.parametrize(
+    "source",
+    [random_source(random.Random(seed), 100) for seed in range(5)]
+    + [right_nested_source(random.Random(depth), depth) for depth in (10, 60, 200)]
+    + [CONSTANTS_SOURCE],
+    ids=[f"random {seed}" for seed in range(5)]
+    + [f"nested {depth}" for depth in (10, 60, 200)]
+    + ["constants"],
+)
+def test_optimized_expressions_match_original_ones(source: str):
+    rng: random.Random = random.Random(0)
+    state_machine: StateMachine = parse(source)
+
+    for transition in transitions(state_machine):
+        for _ in range(10):
+            variables: dict[str, float] = random_variables(rng)
+            expression_evaluator: ExpressionEvaluator = ExpressionEvaluator(variables)
+            guard_evaluator: GuardEvaluator = GuardEvaluator(expression_evaluator, variables)
+            guard = transition.guard
+            if guard is not None:
+                assert outcome(lambda: guard.compile()(variables)) == outcome(
+                    lambda: guard_evaluator.evaluate(guard)
+                ), guard.expression.value()
+
+            for assignment in transition.assignments:
+                assert outcome(
+                    lambda: assignment.compile()(variables)
+                ) == outcome(
+                    lambda: expression_evaluator.evaluate(assignment.expression)
+                ), assignment.expression.value()
+
+
+def test_runtime_offers_the_same_steps_with_optimized_expressions(
+    monkeypatch: pytest.MonkeyPatch,
+):
+    optimized: StateMachine = parse(CONSTANTS_SOURCE)
+    monkeypatch.setattr(StateMachine, "optimize_expressions", lambda state_machine: None)
+    unoptimized: StateMachine = parse(CONSTANTS_SOURCE)
+
+    for seed in range(5):
+        assert run(Runtime, optimized, 500, seed) == run(Runtime, unoptimized, 500, seed)
@@ -0,0 +1,82 @@
+from antlr4 import InputStream
+from statemachine_ast.IncrementalParser import _walk_states, reparse_incrementally
+from statemachine_ast.SourceParser import ParsingStrategy, parse_source
+from statemachine_ast.StateMachine import CompositeState, SimpleState, State, StateMachine
+
+SOURCE: str = """StateMachine Machine {
+    INITIAL -> Y;
+    state Y { -> X : 'a'; }
+    state X { -> Y : 'b'; }
+}
+"""
+
+
+def parse(text: str) -> StateMachine:
+    return parse_source(InputStream(text), ParsingStrategy.FAST)
+
+
+def references(state_machine: StateMachine) -> list:
+    """Returns the identity of every state and transition referenced by the state machine."""
+
+    states: list[State] = list(_walk_states(state_machine.states))
+    return [id(state_machine.initial_state.target)] + [
+        (
+            id(state),
+            [(id(t), id(t.target)) for t in state.outgoing_transitions],
+            [id(t) for t in state.incoming_transitions],
+        )
+        for state in states
+    ]
+
+
+def test_rejected_edit_of_a_referenced_state_leaves_the_state_machine_untouched():
+    state_machine: StateMachine = parse(SOURCE)
+    before: list = references(state_machine)
+
+    # The renamed state targets Y, but the transition of Y to X can no longer be resolved.
+    assert not reparse_incrementally(
+        state_machine, SOURCE, SOURCE.replace("state X", "state Z")
+    )
+    assert references(state_machine) == before
+
+
+def test_edit_rejected_by_the_builder_leaves_the_state_machine_untouched():
+    state_machine: StateMachine = parse(SOURCE)
+    before: list = references(state_machine)
+
+    # The transition to Y is resolved before the transition to an unknown state.
+    assert not reparse_incrementally(
+        state_machine, SOURCE, SOURCE.replace("'b'; }", "'b'; -> W : 'c'; }")
+    )
+    assert references(state_machine) == before
+
+
+def test_initial_state_of_kept_composite_state_is_retargeted():
+    source: str = """StateMachine Outside {
+    INITIAL -> A;
+    composite state A {
+        INITIAL -> X;
+        state Y { -> X : 'b'; }
+    }
+    state X { -> Y : 'a'; }
+}
+"""
+    edited: str = source.replace("'a'", "'c'")
+    state_machine: StateMachine = parse(source)
+
+    assert reparse_incrementally(state_machine, source, edited)
+    composite: State = state_machine.states[0]
+    assert composite.initial_state.target is state_machine.states[1]
+    assert composite.nested_initial_state is state_machine.states[1]
+    assert state_machine.states[1].outgoing_transitions[0].trigger == "c"
+
+
+def test_walk_states_handles_deeply_nested_states():
+    states: list[State] = [CompositeState(f"S{depth}") for depth in range(5000)]
+    for container, state in zip(states, states[1:]):
+        container.states.append(state)
+    states[-1].states.append(SimpleState("Leaf"))
+
+    walked: list[State] = list(_walk_states(states[:1]))
+
+    assert [state.name for state in walked] == [f"S{depth}" for depth in range(5000)] + ["Leaf"]
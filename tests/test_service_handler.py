@@ -0,0 +1,54 @@
+import pytest
+
+from server.LRP import GetChildrenArguments, GetChildrenResponse, ParseArguments
+from server.ServiceHandler import ServiceHandler
+
+SOURCE: str = """StateMachine Paging {
+    INITIAL -> A;
+    state A { -> B : 'go'; }
+    state B { -> C : 'go'; }
+    state C { -> A : 'go'; }
+}
+"""
+
+
+@pytest.fixture
+def handler() -> ServiceHandler:
+    handler: ServiceHandler = ServiceHandler(incremental_parsing=False)
+    handler.parse(ParseArguments("paging.sm", SOURCE, depth=0))
+
+    return handler
+
+
+def get_states(handler: ServiceHandler, offset: int, limit: int | None) -> GetChildrenResponse:
+    return handler.get_children(
+        GetChildrenArguments("paging.sm", "/", "states", offset, limit)
+    )
+
+
+@pytest.mark.parametrize(
+    ("offset", "limit", "expected"),
+    [
+        (0, None, ["/A", "/B", "/C"]),
+        (0, 2, ["/A", "/B"]),
+        (2, 2, ["/C"]),
+        (1, 0, []),
+        (3, None, []),
+        (3, 5, []),
+    ],
+)
+def test_pages_report_the_total_number_of_children(
+    handler: ServiceHandler, offset: int, limit: int | None, expected: list[str]
+):
+    response: GetChildrenResponse = get_states(handler, offset, limit)
+
+    assert [child.id for child in response.children] == expected
+    assert response.total == 3
+
+
+@pytest.mark.parametrize(("offset", "limit"), [(-1, None), (-1, 2), (0, -1), (4, None), (4, 1)])
+def test_invalid_pages_are_rejected(
+    handler: ServiceHandler, offset: int, limit: int | None
+):
+    with pytest.raises(ValueError):
+        get_states(handler, offset, limit)
@@ -0,0 +1,73 @@
+import pytest
+from helpers import ScanningRuntime, link_composite_parents, parse, run, states
+from server.Runtime import Runtime
+from statemachine_ast.StateMachine import StateMachine
+
+# Simple states without outgoing transitions share the index of their parent state.
+NESTED_SOURCE: str = """StateMachine Nested {
+    INITIAL -> Start;
+    state Start { -> Outer : 'start' / { x = 0; }; }
+    composite state Outer {
+        -> Start : 'reset';
+        -> Outer : 'tick' [x >= 3] / { x = 0; };
+        INITIAL -> A;
+        state A {
+            -> B : 'tick' / { x = x + 1; };
+            -> Inner : 'go' [x < 2];
+        }
+        state B { }
+        composite state Inner {
+            -> A : 'tick' [x < 5] / { x = x + 2; };
+            -> A : 'back';
+            INITIAL -> C;
+            state C {
+                -> D : 'tick' [x >= 1] / { x = x + 1; };
+                -> D : 'tick' [x < 4];
+            }
+            state D { }
+        }
+    }
+}
+"""
+
+
+@pytest.fixture(params=["parsed", "linked"])
+def state_machine(request: pytest.FixtureRequest) -> StateMachine:
+    state_machine: StateMachine = parse(NESTED_SOURCE)
+    if request.param == "linked":
+        link_composite_parents(state_machine)
+
+    return state_machine
+
+
+def test_states_without_transitions_share_the_index_of_their_parent_state(
+    state_machine: StateMachine,
+):
+    for state in states(state_machine):
+        if len(state.outgoing_transitions) == 0 and state.parent_state is not None:
+            assert state.transitions_by_trigger is state.parent_state.transitions_by_trigger
+
+
+@pytest.mark.parametrize("x", [0, 1, 2, 3, 4, 5])
+def test_lookups_match_scanning_the_parent_states(state_machine: StateMachine, x: int):
+    indexed: Runtime = Runtime(state_machine)
+    scanning: ScanningRuntime = ScanningRuntime(state_machine)
+    for runtime in (indexed, scanning):
+        runtime.variables["x"] = x
+
+    for state in states(state_machine):
+        indexed.current_state = scanning.current_state = state
+        events: list[str] = indexed._find_possible_events()
+
+        assert sorted(events) == sorted(scanning._find_possible_events())
+        for event in [*events, "unknown"]:
+            assert indexed._find_possible_transitions(
+                event
+            ) == scanning._find_possible_transitions(event)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_runtimes_offer_the_same_steps(state_machine: StateMachine, seed: int):
+    assert run(Runtime, state_machine, 300, seed) == run(
+        ScanningRuntime, state_machine, 300, seed
+    )
@@ -0,0 +1,172 @@
+import math
+import random
+from typing import Any, Callable
+
+import pytest
+from helpers import (
+    VARIABLES,
+    parse,
+    random_expression,
+    random_source,
+    random_variables,
+    transitions,
+)
+from server.Runtime import ExpressionEvaluator, GuardEvaluator, Runtime, Step
+from server.VariableStore import VariableStore
+from statemachine_ast.StateMachine import Assignment, Guard, StateMachine, Transition
+
+
+class NameRuntime(Runtime):
+    """Runtime storing variables by name in a dictionary, and evaluating guards and
+    assignments by name, as before variables were stored by slot."""
+
+    def __init__(self, state_machine: StateMachine) -> None:
+        super().__init__(state_machine)
+        self.variables: dict[str, float] = {}
+
+    def assign(self, assignment: Assignment) -> None:
+        self.variables[assignment.variable] = assignment.compile()(self.variables)
+
+    def _is_enabled(self, transition: Transition) -> bool:
+        return transition.guard is None or transition.guard.compile()(self.variables)
+
+
+def outcome(function: Callable[[], Any]) -> Any:
+    """Returns the result of a function, or the type and arguments of the error it raises."""
+
+    try:
+        result: Any = function()
+    except Exception as error:
+        return type(error), error.args
+
+    return repr(result)
+
+
+def store(
+    variables: dict[str, float], slots: dict[str, int] | None = None
+) -> VariableStore:
+    """Returns a store holding the given variables, whose slots default to the order of
+    VARIABLES."""
+
+    if slots is None:
+        slots = {name: slot for slot, name in enumerate(VARIABLES)}
+    result: VariableStore = VariableStore(tuple(slots), slots)
+    for name, value in variables.items():
+        result[name] = value
+
+    return result
+
+
+def progressive_source(rng: random.Random, transitions: int, initialized: list[str]) -> str:
+    """Generates a state machine whose first transition only assigns the initialized
+    variables, whose guards only read va, and whose assignments read any variable, so
+    that runs may read unassigned variables after some steps."""
+
+    initialization: str = " ".join(f"{variable} = {rng.randint(-3, 3)};" for variable in initialized)
+    lines: list[str] = [
+        "StateMachine Progressive {",
+        "INITIAL -> Start;",
+        f"state Start {{ -> A : 'start' / {{ {initialization} }}; }}",
+        "state A {",
+    ]
+    for _ in range(transitions):
+        guard: str = ""
+        if rng.random() < 0.5:
+            guard = f" [va {rng.choice(['<', '>=', '!='])} {rng.randint(-5, 5)}]"
+        assignments: str = " ".join(
+            f"{rng.choice(VARIABLES)} = {random_expression(rng, rng.randint(1, 6))};"
+            for _ in range(rng.randint(1, 2))
+        )
+        lines.append(f"-> A : 'ev{rng.choice('abc')}'{guard} / {{ {assignments} }};")
+    lines.append("} }")
+
+    return "\n".join(lines)
+
+
+def run(runtime_class: type, state_machine: StateMachine, steps: int, seed: int) -> Any:
+    """Executes steps chosen at random, and returns the names of the steps available
+    before each of them and the variables."""
+
+    rng: random.Random = random.Random(seed)
+    runtime: Runtime = runtime_class(state_machine)
+    offered_steps: list[list[str]] = []
+    for _ in range(steps):
+        available_steps: list[Step] = sorted(
+            runtime.available_steps.values(), key=lambda step: step.name
+        )
+        offered_steps.append([step.name for step in available_steps])
+        if len(available_steps) == 0:
+            break
+
+        step: Step = rng.choice(available_steps)
+        if step.is_composite:
+            runtime.enter_composite_step(step.id)
+        else:
+            runtime.execute_atomic_step(step.id)
+
+    # Representations tell NaN apart, which is not equal to itself.
+    return offered_steps, {name: repr(value) for name, value in runtime.variables.items()}
+
+
+def test_unassigned_variables_are_missing():
+    variables: VariableStore = store({"vc": 1.0, "va": float("nan")})
+
+    assert list(variables) == ["va", "vc"]
+    assert len(variables) == 2
+    assert {name: repr(value) for name, value in variables.items()} == {
+        "va": "nan",
+        "vc": "1.0",
+    }
+    assert math.isnan(variables["va"])
+    assert math.isnan(variables.values[VARIABLES.index("vb")])
+    with pytest.raises(KeyError) as error:
+        variables["vb"]
+    assert error.value.args == ("vb",)
+    assert "vb" not in variables
+    assert "vz" not in variables
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_slotted_functions_match_interpreter(seed: int):
+    rng: random.Random = random.Random(seed)
+    state_machine: StateMachine = parse(random_source(rng, 100))
+
+    for transition in transitions(state_machine):
+        for _ in range(10):
+            variables: dict[str, float] = random_variables(rng)
+            # Assigned NaN values are read from the store rather than raising.
+            if rng.random() < 0.2:
+                variables[rng.choice(VARIABLES)] = float("nan")
+            slotted: VariableStore = store(
+                {
+                    name: value
+                    for name, value in variables.items()
+                    if name in state_machine.variable_slots
+                },
+                state_machine.variable_slots,
+            )
+            expression_evaluator: ExpressionEvaluator = ExpressionEvaluator(variables)
+            guard_evaluator: GuardEvaluator = GuardEvaluator(expression_evaluator, variables)
+            guard: Guard = transition.guard
+            assert outcome(lambda: guard.compile_slotted()(slotted)) == outcome(
+                lambda: guard_evaluator.evaluate(guard)
+            ), guard.expression.value()
+
+            for assignment in transition.assignments:
+                assert outcome(
+                    lambda: assignment.compile_slotted()(slotted)
+                ) == outcome(
+                    lambda: expression_evaluator.evaluate(assignment.expression)
+                ), assignment.expression.value()
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("initialized", [["va"], VARIABLES])
+def test_runtimes_match_runtimes_storing_variables_by_name(seed: int, initialized: list[str]):
+    state_machine: StateMachine = parse(
+        progressive_source(random.Random(seed), 20, initialized)
+    )
+
+    assert outcome(lambda: run(Runtime, state_machine, 100, seed)) == outcome(
+        lambda: run(NameRuntime, state_machine, 100, seed)
+    )